@@ -1,13 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List, Dict, Any
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import and_, case, func, or_, select
+from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
+import base64
+import csv
+import io
+import json
+import os
 
-from database.database import get_db
+from database.database import SessionLocal, get_db
 from database.models import User, Exam, Submission, CheatingEvent, SystemLog
 from services.auth_service import get_current_user
+from services.blob_store import blob_store
+from services.dashboard_stats import dashboard_stats
 from api.routes.auth import oauth2_scheme
+from utils.pagination import keyset_page
 
 router = APIRouter()
 
@@ -18,31 +27,32 @@ async def get_dashboard_stats(
 ):
     """
     Get admin dashboard statistics
+    (in-memory counters, see services/dashboard_stats.py)
     """
     user = get_current_user(token, db)
     if user.role != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
     
-    # Calculate statistics
-    total_users = db.query(User).count()
-    total_students = db.query(User).filter(User.role == "student").count()
-    total_teachers = db.query(User).filter(User.role == "teacher").count()
-    total_admins = db.query(User).filter(User.role == "admin").count()
+    counts = dashboard_stats.snapshot(db)
+    total_users = counts["users"]
+    total_students = counts["students"]
+    total_teachers = counts["teachers"]
+    total_admins = counts["admins"]
     
-    total_exams = db.query(Exam).count()
-    active_exams = db.query(Exam).filter(Exam.is_active == True).count()
+    total_exams = counts["exams"]
+    active_exams = counts["active_exams"]
     
-    total_submissions = db.query(Submission).count()
-    completed_submissions = db.query(Submission).filter(Submission.status == "completed").count()
+    total_submissions = counts["submissions"]
+    completed_submissions = counts["completed"]
     
-    cheating_cases = db.query(Submission).filter(Submission.cheating_count > 0).count()
-    today = datetime.utcnow().date()
-    today_submissions = db.query(Submission).filter(
-        func.date(Submission.started_at) == today
-    ).count()
+    cheating_cases = counts["cheating"]
+    today_submissions = counts["today"]
     
-    # Get recent activities
-    recent_logs = db.query(SystemLog).order_by(SystemLog.timestamp.desc()).limit(10).all()
+    # Get recent activities (newest first off ix_system_logs_timestamp;
+    # users come in the same query)
+    recent_logs = db.query(SystemLog).options(joinedload(SystemLog.user)).order_by(
+        SystemLog.timestamp.desc()
+    ).limit(10).all()
     
     return {
         "users": {
@@ -78,19 +88,105 @@ async def get_dashboard_stats(
         ]
     }
 
+# ===================== LISTING HELPERS =====================
+# Listing endpoints return one page as a plain list; the cursor for the next
+# page (if any) comes back in the X-Next-Cursor header. /users and /exams
+# without limit or cursor return the whole list (the admin UI loads it once).
+ADMIN_PAGE_SIZE = int(os.getenv("ADMIN_PAGE_SIZE", "100"))
+ADMIN_MAX_PAGE_SIZE = int(os.getenv("ADMIN_MAX_PAGE_SIZE", "1000"))
+
+# created_at is the insert time, so ids are in the same order (and indexed)
+USER_SORTS = {"id": User.id, "name": User.name, "email": User.email, "created_at": User.id}
+EXAM_SORTS = {"id": Exam.id, "title": Exam.title, "created_at": Exam.id}
+CASE_SORTS = {
+    "id": Submission.id,
+    "cheating_count": Submission.cheating_count,
+    # in-progress submissions have no submitted_at yet
+    "submitted_at": func.coalesce(Submission.submitted_at, Submission.started_at),
+}
+
+
+def require_admin(token: str, db: Session):
+    user = get_current_user(token, db)
+    if user.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return user
+
+
+def column_value(row, column):
+    return getattr(row, column.key)
+
+
+def paginate(query, sorts, sort, order, cursor, limit, response, key=column_value):
+    """Keyset page of `query`; sets X-Next-Cursor on the response (limit None: every row)"""
+    if sort not in sorts:
+        raise HTTPException(status_code=400, detail=f"sort must be one of: {', '.join(sorts)}")
+    if order not in ("asc", "desc"):
+        raise HTTPException(status_code=400, detail="order must be asc or desc")
+    id_column = sorts["id"]
+    try:
+        rows, next_cursor = keyset_page(
+            query, sorts[sort], id_column, cursor, order == "desc", limit,
+            lambda row: (key(row, sorts[sort]), key(row, id_column))
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return rows
+
+
+def starts_with(column, prefix):
+    """Case-insensitive prefix match as a range on lower(column), so an expression index serves it"""
+    prefix = prefix.lower()
+    return and_(func.lower(column) >= prefix, func.lower(column) < prefix + "\U0010ffff")
+
+
+def flag(condition):
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+
 @router.get("/users")
 async def get_all_users(
+    response: Response,
+    role: Optional[str] = None,
+    status: Optional[str] = None,
+    search: Optional[str] = None,
+    sort: str = "id",
+    order: str = "asc",
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=ADMIN_MAX_PAGE_SIZE),
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db)
 ):
     """
     Get all users with detailed information
+    (filter by role / status / name or email prefix, sort by id, name, email or created_at;
+    pages of `limit` when limit or cursor is given)
     """
-    user = get_current_user(token, db)
-    if user.role != "admin":
-        raise HTTPException(status_code=403, detail="Admin access required")
-    
-    users = db.query(User).all()
+    require_admin(token, db)
+    if cursor and limit is None:
+        limit = ADMIN_PAGE_SIZE
+    
+    query = db.query(User)
+    if role:
+        query = query.filter(User.role == role)
+    if status:
+        query = query.filter(User.status == status)
+    if search:
+        query = query.filter(or_(starts_with(User.name, search), starts_with(User.email, search)))
+    users = paginate(query, USER_SORTS, sort, order, cursor, limit, response)
+    
+    # Exam / submission counts for the whole page in one grouped query each
+    ids = [u.id for u in users]
+    exam_counts = dict(
+        db.query(Exam.teacher_id, func.count(Exam.id))
+        .filter(Exam.teacher_id.in_(ids)).group_by(Exam.teacher_id).all()
+    ) if ids else {}
+    submission_counts = dict(
+        db.query(Submission.student_id, func.count(Submission.id))
+        .filter(Submission.student_id.in_(ids)).group_by(Submission.student_id).all()
+    ) if ids else {}
     
     return [
         {
@@ -101,32 +197,60 @@ async def get_all_users(
             "status": u.status,
             "created_at": u.created_at.isoformat(),
             "last_login": u.last_login.isoformat() if u.last_login else None,
-            "exam_count": db.query(Exam).filter(Exam.teacher_id == u.id).count() if u.role == "teacher" else 0,
-            "submission_count": db.query(Submission).filter(Submission.student_id == u.id).count() if u.role == "student" else 0
+            "exam_count": exam_counts.get(u.id, 0) if u.role == "teacher" else 0,
+            "submission_count": submission_counts.get(u.id, 0) if u.role == "student" else 0
         }
         for u in users
     ]
 
 @router.get("/exams")
 async def get_all_exams(
+    response: Response,
+    is_active: Optional[bool] = None,
+    teacher_id: Optional[int] = None,
+    search: Optional[str] = None,
+    sort: str = "id",
+    order: str = "asc",
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=ADMIN_MAX_PAGE_SIZE),
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db)
 ):
     """
     Get all exams with detailed statistics
+    (filter by is_active / teacher / title or code, sort by id, title or created_at;
+    pages of `limit` when limit or cursor is given)
     """
-    user = get_current_user(token, db)
-    if user.role != "admin":
-        raise HTTPException(status_code=403, detail="Admin access required")
+    require_admin(token, db)
+    if cursor and limit is None:
+        limit = ADMIN_PAGE_SIZE
+    
+    query = db.query(Exam).options(joinedload(Exam.teacher))
+    if is_active is not None:
+        query = query.filter(Exam.is_active == is_active)
+    if teacher_id is not None:
+        query = query.filter(Exam.teacher_id == teacher_id)
+    if search:
+        pattern = f"%{search}%"
+        query = query.filter(or_(Exam.title.ilike(pattern), Exam.exam_code.ilike(pattern)))
+    exams = paginate(query, EXAM_SORTS, sort, order, cursor, limit, response)
+    
+    # Submission aggregates for the whole page in one grouped query
+    ids = [exam.id for exam in exams]
+    rows = db.query(
+        Submission.exam_id,
+        func.count(Submission.id),
+        flag(Submission.status == "completed"),
+        flag(Submission.status == "in_progress"),
+        flag(Submission.cheating_count > 0),
+        func.coalesce(func.sum(Submission.percentage), 0)
+    ).filter(Submission.exam_id.in_(ids)).group_by(Submission.exam_id).all() if ids else []
+    aggregates = {row[0]: row[1:] for row in rows}
     
-    exams = db.query(Exam).all()
     result = []
-    
     for exam in exams:
-        teacher = db.query(User).filter(User.id == exam.teacher_id).first()
-        submissions = db.query(Submission).filter(Submission.exam_id == exam.id).all()
-        cheating_cases = [s for s in submissions if s.cheating_count > 0]
-        
+        total, completed, in_progress, cheating, percentage_sum = aggregates.get(exam.id, (0, 0, 0, 0, 0))
+        teacher = exam.teacher
         result.append({
             "id": exam.id,
             "exam_code": exam.exam_code,
@@ -139,45 +263,83 @@ async def get_all_exams(
             "questions_count": len(exam.questions) if exam.questions else 0,
             "created_at": exam.created_at.isoformat(),
             "submissions": {
-                "total": len(submissions),
-                "completed": len([s for s in submissions if s.status == "completed"]),
-                "in_progress": len([s for s in submissions if s.status == "in_progress"])
+                "total": total,
+                "completed": completed,
+                "in_progress": in_progress
             },
             "cheating": {
-                "cases": len(cheating_cases),
-                "percentage": (len(cheating_cases) / len(submissions) * 100) if submissions else 0
+                "cases": cheating,
+                "percentage": (cheating / total * 100) if total else 0
             },
-            "average_score": sum(s.percentage or 0 for s in submissions if s.percentage) / len(submissions) if submissions else 0
+            "average_score": percentage_sum / total if total else 0
         })
     
     return result
 
 @router.get("/cheating-cases")
 async def get_cheating_cases(
+    response: Response,
+    exam_id: Optional[int] = None,
+    student_id: Optional[int] = None,
+    min_count: int = Query(1, ge=1),
+    auto_submitted: Optional[bool] = None,
+    sort: str = "submitted_at",
+    order: str = "desc",
+    cursor: Optional[str] = None,
+    limit: int = Query(ADMIN_PAGE_SIZE, ge=1, le=ADMIN_MAX_PAGE_SIZE),
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db)
 ):
     """
     Get all cheating cases with details
+    (one page; filter by exam / student / minimum warnings / auto-submission,
+    sort by submitted_at, cheating_count or id)
     """
-    user = get_current_user(token, db)
-    if user.role != "admin":
-        raise HTTPException(status_code=403, detail="Admin access required")
-    
-    cheating_submissions = db.query(Submission).filter(
-        Submission.cheating_count > 0
-    ).order_by(Submission.submitted_at.desc()).all()
+    require_admin(token, db)
+    
+    # "> 0" matches the partial index ix_submissions_cheating_count
+    query = db.query(Submission).filter(
+        Submission.cheating_count > 0, Submission.cheating_count >= min_count
+    ).options(
+        joinedload(Submission.student),
+        joinedload(Submission.exam).joinedload(Exam.teacher)
+    )
+    if exam_id is not None:
+        query = query.filter(Submission.exam_id == exam_id)
+    if student_id is not None:
+        query = query.filter(Submission.student_id == student_id)
+    if auto_submitted is not None:
+        query = query.filter(Submission.auto_submitted == auto_submitted)
+    
+    def key(submission, column):
+        if column is CASE_SORTS["submitted_at"]:
+            return submission.submitted_at or submission.started_at
+        return column_value(submission, column)
+    
+    cheating_submissions = paginate(query, CASE_SORTS, sort, order, cursor, limit, response, key)
+    
+    # Events of the whole page in one query, without the stored frame / audio
+    ids = [submission.id for submission in cheating_submissions]
+    events_by_submission = {}
+    if ids:
+        events = db.query(
+            CheatingEvent.submission_id,
+            CheatingEvent.event_type,
+            CheatingEvent.severity,
+            CheatingEvent.confidence,
+            CheatingEvent.timestamp
+        ).filter(CheatingEvent.submission_id.in_(ids)).order_by(
+            CheatingEvent.submission_id, CheatingEvent.id  # ix_cheating_events_submission_id order
+        ).all()
+        for event in events:
+            events_by_submission.setdefault(event.submission_id, []).append(event)
     
     result = []
     
     for submission in cheating_submissions:
-        exam = db.query(Exam).filter(Exam.id == submission.exam_id).first()
-        student = db.query(User).filter(User.id == submission.student_id).first()
-        teacher = db.query(User).filter(User.id == exam.teacher_id).first() if exam else None
-        
-        cheating_events = db.query(CheatingEvent).filter(
-            CheatingEvent.submission_id == submission.id
-        ).all()
+        exam = submission.exam
+        student = submission.student
+        teacher = exam.teacher if exam else None
         
         result.append({
             "submission_id": submission.id,
@@ -211,13 +373,315 @@ async def get_cheating_cases(
                     "confidence": event.confidence,
                     "timestamp": event.timestamp.isoformat()
                 }
-                for event in cheating_events
+                for event in events_by_submission.get(submission.id, [])
             ],
             "warnings": submission.warnings or []
         })
     
     return result
 
+# ===================== EXPORT =====================
+# Exports stream in id order, one short keyset query per batch: memory stays
+# at one batch and no read transaction is held open between batches (SQLite
+# would block the event sink's writes for the whole export otherwise).
+# Evidence bytes are never read here; rows link to /evidence/{key}, or to
+# /events/{id}/media while a row still has its legacy base64 column.
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+EVENT_EXPORT_FIELDS = (
+    "id", "submission_id", "exam_id", "student_id", "student_name", "student_email",
+    "event_type", "severity", "confidence", "timestamp", "frame_url", "audio_url",
+)
+CASE_EXPORT_FIELDS = (
+    "submission_id", "exam_id", "exam_code", "student_id", "student_name", "student_email",
+    "status", "started_at", "submitted_at", "score", "percentage", "cheating_count",
+    "auto_submitted", "auto_submit_reason", "events_url",
+)
+
+
+def export_batches(build_query, after_id, id_column):
+    """Yield lists of rows with id > after_id, EXPORT_BATCH_SIZE at a time"""
+    last_id = after_id
+    while True:
+        db = SessionLocal()
+        try:
+            rows = db.execute(
+                build_query().where(id_column > last_id).order_by(id_column).limit(EXPORT_BATCH_SIZE)
+            ).all()
+        finally:
+            db.close()
+        if not rows:
+            return
+        yield rows
+        if len(rows) < EXPORT_BATCH_SIZE:
+            return
+        last_id = rows[-1][0]
+
+
+def export_lines(batches, fields, to_record, fmt):
+    """Encode batches as NDJSON or CSV text, one chunk per batch"""
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=fields, extrasaction="ignore")
+        writer.writeheader()
+        yield buffer.getvalue()
+    for rows in batches:
+        records = [to_record(row) for row in rows]
+        if fmt == "csv":
+            buffer = io.StringIO()
+            csv.DictWriter(buffer, fieldnames=fields, extrasaction="ignore").writerows(records)
+            yield buffer.getvalue()
+        else:
+            yield "".join(json.dumps(record) + "\n" for record in records)
+
+
+def export_response(lines, fmt, name):
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+    return StreamingResponse(
+        lines,
+        media_type=EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{fmt}"'}
+    )
+
+
+def isoformat(value):
+    return value.isoformat() if value else None
+
+
+@router.get("/events/export")
+async def export_cheating_events(
+    exam_id: Optional[int] = None,
+    submission_id: Optional[int] = None,
+    format: str = "ndjson",
+    after_id: int = 0,
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+):
+    """
+    Stream cheating events (optionally of one exam / submission) as NDJSON or CSV.
+    Resume an interrupted export with after_id = last exported id.
+    """
+    require_admin(token, db)
+    
+    def build_query():
+        query = select(
+            CheatingEvent.id,
+            CheatingEvent.submission_id,
+            Submission.exam_id,
+            Submission.student_id,
+            User.name,
+            User.email,
+            CheatingEvent.event_type,
+            CheatingEvent.severity,
+            CheatingEvent.confidence,
+            CheatingEvent.timestamp,
+            CheatingEvent.frame_key,
+            CheatingEvent.audio_key,
+            CheatingEvent.frame_data.isnot(None),
+            CheatingEvent.audio_data.isnot(None)
+        ).join(Submission, CheatingEvent.submission_id == Submission.id).outerjoin(
+            User, Submission.student_id == User.id
+        )
+        if exam_id is not None:
+            query = query.where(Submission.exam_id == exam_id)
+        if submission_id is not None:
+            query = query.where(CheatingEvent.submission_id == submission_id)
+        return query
+    
+    def media_url(event_id, kind, key, legacy):
+        if key:
+            return f"/api/admin/evidence/{key}"
+        return f"/api/admin/events/{event_id}/media/{kind}" if legacy else None
+    
+    def to_record(row):
+        event_id = row[0]
+        return {
+            "id": event_id,
+            "submission_id": row[1],
+            "exam_id": row[2],
+            "student_id": row[3],
+            "student_name": row[4],
+            "student_email": row[5],
+            "event_type": row[6],
+            "severity": row[7],
+            "confidence": row[8],
+            "timestamp": isoformat(row[9]),
+            "frame_url": media_url(event_id, "frame", row[10], row[12]),
+            "audio_url": media_url(event_id, "audio", row[11], row[13])
+        }
+    
+    batches = export_batches(build_query, after_id, CheatingEvent.id)
+    name = f"cheating-events-exam-{exam_id}" if exam_id is not None else "cheating-events"
+    return export_response(export_lines(batches, EVENT_EXPORT_FIELDS, to_record, format), format, name)
+
+@router.get("/cheating-cases/export")
+async def export_cheating_cases(
+    exam_id: Optional[int] = None,
+    min_count: int = Query(1, ge=1),
+    format: str = "ndjson",
+    after_id: int = 0,
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+):
+    """
+    Stream cheating cases (submissions with warnings) as NDJSON or CSV, each
+    linking to its event export. Resume with after_id = last submission_id.
+    """
+    require_admin(token, db)
+    
+    def build_query():
+        query = select(
+            Submission.id,
+            Submission.exam_id,
+            Exam.exam_code,
+            Submission.student_id,
+            User.name,
+            User.email,
+            Submission.status,
+            Submission.started_at,
+            Submission.submitted_at,
+            Submission.score,
+            Submission.percentage,
+            Submission.cheating_count,
+            Submission.auto_submitted,
+            Submission.auto_submit_reason
+        ).outerjoin(Exam, Submission.exam_id == Exam.id).outerjoin(
+            User, Submission.student_id == User.id
+        ).where(Submission.cheating_count > 0, Submission.cheating_count >= min_count)
+        if exam_id is not None:
+            query = query.where(Submission.exam_id == exam_id)
+        return query
+    
+    def to_record(row):
+        return {
+            "submission_id": row[0],
+            "exam_id": row[1],
+            "exam_code": row[2],
+            "student_id": row[3],
+            "student_name": row[4],
+            "student_email": row[5],
+            "status": row[6],
+            "started_at": isoformat(row[7]),
+            "submitted_at": isoformat(row[8]),
+            "score": row[9],
+            "percentage": row[10],
+            "cheating_count": row[11],
+            "auto_submitted": row[12],
+            "auto_submit_reason": row[13],
+            "events_url": f"/api/admin/events/export?submission_id={row[0]}"
+        }
+    
+    batches = export_batches(build_query, after_id, Submission.id)
+    name = f"cheating-cases-exam-{exam_id}" if exam_id is not None else "cheating-cases"
+    return export_response(export_lines(batches, CASE_EXPORT_FIELDS, to_record, format), format, name)
+
+# ===================== EVIDENCE =====================
+# Evidence lives in the content-addressed blob store; the key is the content
+# hash, so responses are immutable and cacheable. Single byte ranges are
+# honoured for seeking in audio / resuming downloads.
+EVIDENCE_CACHE_CONTROL = "private, max-age=31536000, immutable"
+
+
+def byte_range(header, size):
+    """
+    (start, end) of a single "bytes=" Range header; None to send everything.
+    Malformed headers (e.g. bytes=10-5) are ignored; 416 only for a valid
+    range that starts past the end (or an empty suffix, bytes=-0)
+    """
+    if not header:
+        return None
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None  # unknown unit / multiple ranges: full response
+    first, dash, last = (part.strip() for part in spec.partition("-"))
+    if not dash or not (first or last) or not all(part.isdigit() for part in (first, last) if part):
+        return None
+    if first:
+        start = int(first)
+        if last and int(last) < start:
+            return None
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        suffix = int(last)  # last N bytes
+        start, end = (max(size - suffix, 0), size - 1) if suffix else (size, size - 1)
+    if start >= size:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"}
+        )
+    return start, end
+
+
+def blob_response(key, range_header):
+    if not blob_store.exists(key):
+        raise HTTPException(status_code=404, detail="Evidence not found")
+    size = blob_store.size(key)
+    headers = {"Accept-Ranges": "bytes", "ETag": f'"{key}"', "Cache-Control": EVIDENCE_CACHE_CONTROL}
+    span = byte_range(range_header, size)
+    status = 200
+    start, end = 0, size - 1
+    if span is not None:
+        start, end = span
+        status = 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        blob_store.iter_range(key, start, end),
+        status_code=status,
+        media_type=blob_store.media_type(key),
+        headers=headers
+    )
+
+@router.get("/evidence/{key}")
+async def get_evidence(
+    key: str,
+    range_header: Optional[str] = Header(None, alias="Range"),
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+):
+    """
+    Evidence blob by key (supports Range requests)
+    """
+    require_admin(token, db)
+    return blob_response(key, range_header)
+
+@router.get("/events/{event_id}/media/{kind}")
+async def get_event_media(
+    event_id: int,
+    kind: str,
+    range_header: Optional[str] = Header(None, alias="Range"),
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+):
+    """
+    The frame or audio snippet stored with a cheating event
+    """
+    require_admin(token, db)
+    
+    columns = {
+        "frame": (CheatingEvent.frame_key, CheatingEvent.frame_data),
+        "audio": (CheatingEvent.audio_key, CheatingEvent.audio_data),
+    }
+    if kind not in columns:
+        raise HTTPException(status_code=404, detail="Unknown media kind")
+    row = db.query(*columns[kind]).filter(CheatingEvent.id == event_id).first()
+    if row is None or not (row[0] or row[1]):
+        raise HTTPException(status_code=404, detail="Media not found")
+    if row[0]:
+        return blob_response(row[0], range_header)
+    
+    # not migrated yet: base64, optionally as a data URL carrying the media type
+    header, _, data = row[1].rpartition(",")
+    media_type = "application/octet-stream"
+    if header.startswith("data:") and ";" in header:
+        media_type = header[5:header.index(";")]
+    elif kind == "frame":
+        media_type = "image/jpeg"
+    return Response(content=base64.b64decode(data), media_type=media_type)
+
 @router.delete("/user/{user_id}")
 async def delete_user(
     user_id: int,
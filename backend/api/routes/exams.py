@@ -10,6 +10,7 @@ from database.database import get_db
 from database.models import User, Exam, Submission
 from services.auth_service import get_current_user
 from api.routes.auth import oauth2_scheme
+from api.routes.websocket import manager
 
 router = APIRouter()
 
@@ -339,6 +340,7 @@ async def submit_exam(
     submission.submitted_at = datetime.utcnow()
     
     db.commit()
+    await manager.invalidate_submission(str(user.id), str(submission.exam_id))
     
     return {
         "message": "Exam submitted successfully",
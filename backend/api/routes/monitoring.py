@@ -13,9 +13,35 @@ from datetime import datetime
 
 # Import AI monitoring system
 from services.ai_monitoring import ai_monitor
+from services.inference_pool import inference_pool, InferenceQueueFull, monitoring_ready
+from services.event_sink import event_sink
+from services.metrics import metrics
+from api.routes.websocket import manager
 
 
-router = APIRouter(prefix="/monitoring", tags=["monitoring"])
+router = APIRouter()
+
+# Queue depths and connection counts are read at scrape time, never on the hot path
+metrics.gauge("proctorvision_ws_connections", "Open monitoring WebSocket connections",
+              fn=lambda: len(manager.active_connections))
+metrics.gauge("proctorvision_proctor_subscribers", "Connected proctor live views",
+              fn=lambda: manager.proctors.stats()["subscribers"])
+metrics.gauge("proctorvision_proctor_queued", "Messages waiting in proctor send queues",
+              fn=lambda: manager.proctors.stats()["queued"])
+metrics.gauge("proctorvision_inference_pending", "Frames queued or running in the inference pool",
+              fn=lambda: inference_pool.pending)
+metrics.gauge("proctorvision_event_sink_queue", "Cheating events waiting for the next DB flush",
+              fn=lambda: len(event_sink.events))
+metrics.gauge("proctorvision_monitor_sessions", "Monitoring sessions held in memory",
+              fn=lambda: len(ai_monitor.sessions))
+metrics.gauge("proctorvision_models_ready", "1 once every detector is loaded",
+              fn=lambda: int(monitoring_ready()))
+
+
+def require_models():
+    """503 while the detectors are still loading after a (re)start"""
+    if not monitoring_ready():
+        raise HTTPException(status_code=503, detail="AI monitoring is warming up")
 
 
 # Request Models
@@ -49,9 +75,12 @@ async def process_frame(
     # current_user: dict = Depends(get_current_user)  # Uncomment if you have auth
 ):
     """Process video frame for cheating detection"""
+    require_models()
     try:
-        result = ai_monitor.process_frame(request.frame, submission_id)
+        result = await inference_pool.process_frame(request.frame, submission_id)
         return result
+    except InferenceQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -63,6 +92,7 @@ async def process_audio(
     # current_user: dict = Depends(get_current_user)
 ):
     """Process audio for voice detection"""
+    require_models()
     try:
         result = ai_monitor.process_audio(request.audio, submission_id)
         return result
@@ -106,16 +136,60 @@ async def log_auto_submit(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/inference")
+async def get_inference_stats():
+    """Get inference pool, session, scheduler, event sink and connection statistics"""
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "inference": inference_pool.stats(),
+        **ai_monitor.stats(),
+        "event_sink": event_sink.stats(),
+        "connections": {
+            "active": len(manager.active_connections),
+            **manager.backend.stats()
+        },
+        "proctors": manager.proctors.stats()
+    }
+
+
 @router.get("/status")
 async def get_monitoring_status():
-    """Get monitoring system status"""
+    """Get monitoring system status: detectors, live counters and stage latencies"""
+    ready = monitoring_ready()
+    counters = metrics.snapshot()
+    server = ai_monitor.status()
+    # vision models live in the inference workers (in-process when INFERENCE_WORKERS=0)
+    detectors = {**inference_pool.detectors, **server["enabled"]}
     return {
-        "status": "active",
+        "status": "active" if ready else "warming_up",
         "timestamp": datetime.now().isoformat(),
         "detectors": {
-            "faces": ai_monitor.face_detector is not None,
-            "head_pose": ai_monitor.head_pose_estimator is not None,
-            "phone": ai_monitor.phone_detector is not None,
-            "audio": ai_monitor.audio_analyzer is not None
+            "faces": detectors.get("face", False),
+            "head_pose": detectors.get("pose", False),
+            "phone": detectors.get("phone", False),
+            "audio": detectors.get("audio", False)
+        },
+        "models": {
+            "server": server,
+            "workers": inference_pool.worker_load_times,
+            "warmup_s": inference_pool.warmup_time
+        },
+        "connections": counters["proctorvision_ws_connections"],
+        "sessions": counters["proctorvision_monitor_sessions"],
+        "frames": counters["proctorvision_frames_total"],
+        "frames_dropped": counters["proctorvision_frames_dropped_total"],
+        "audio_chunks": counters["proctorvision_audio_chunks_total"],
+        "violations": counters["proctorvision_violations_total"],
+        "queues": {
+            "inference": counters["proctorvision_inference_pending"],
+            "event_sink": counters["proctorvision_event_sink_queue"],
+            "proctors": counters["proctorvision_proctor_queued"]
+        },
+        "latency": {
+            "stages": counters["proctorvision_stage_seconds"],
+            "inference": counters["proctorvision_inference_seconds"],
+            "process": counters["proctorvision_ws_process_seconds"],
+            "send": counters["proctorvision_ws_send_seconds"],
+            "db_flush": counters["proctorvision_db_flush_seconds"]
         }
-    }
\ No newline at end of file
+    }
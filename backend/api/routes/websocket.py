@@ -1,150 +1,556 @@
 from fastapi import WebSocket, WebSocketDisconnect
 from typing import Dict, List
+from collections import deque
 import json
 import asyncio
+import base64
+import os
+import struct
+import time
 from datetime import datetime
 from services.ai_monitoring import ai_monitor
+from services.inference_pool import inference_pool, InferenceQueueFull, monitoring_ready
 from database.database import SessionLocal
-from database.models import CheatingEvent, Submission
+from database.models import Exam, Submission
+from services.event_sink import event_sink
+from services.metrics import FRAMES_DROPPED, MESSAGES, PROCESS_SECONDS, WS_SEND_SECONDS
+from services.connection_backend import create_backend
+from services.proctor_hub import ProctorHub, ProctorSubscriber
+from services.auth_service import get_current_user
+
+AUDIO_RING_SIZE = int(os.getenv("WS_AUDIO_RING_SIZE", "4"))
+PROCTOR_HEARTBEAT_INTERVAL = float(os.getenv("PROCTOR_HEARTBEAT_INTERVAL", "2"))
+# Store the frame / audio a violation was raised on as evidence (blob store)
+EVIDENCE_SNAPSHOTS = os.getenv("EVIDENCE_SNAPSHOTS", "0") == "1"
+
+# ===================== BINARY PROTOCOL =====================
+# Clients that offer this subprotocol at connect time send binary messages:
+#   type (uint8) | sequence (uint32) | client timestamp ms (uint64) | payload
+# payload: JPEG bytes (frame), 16 kHz 16-bit mono PCM (audio), 1 byte (focus).
+# Text messages on a binary connection are still parsed as JSON.
+BINARY_SUBPROTOCOL = "proctorvision.binary.v1"
+BINARY_HEADER = struct.Struct("!BIQ")
+MSG_FRAME = 1
+MSG_AUDIO = 2
+MSG_FOCUS = 3
+
+
+def decode_binary_message(message: bytes) -> dict:
+    """Split a binary message into the same dict shape JSON clients send"""
+    if len(message) < BINARY_HEADER.size:
+        raise ValueError("Binary message shorter than header")
+    msg_type, sequence, timestamp = BINARY_HEADER.unpack_from(message)
+    payload = memoryview(message)[BINARY_HEADER.size:]
+
+    data = {"sequence": sequence, "timestamp": timestamp}
+    if msg_type == MSG_FRAME:
+        data["frame"] = payload
+    elif msg_type == MSG_AUDIO:
+        data["audio"] = payload
+    elif msg_type == MSG_FOCUS:
+        data["is_focused"] = bool(payload[0]) if len(payload) else True
+    else:
+        raise ValueError(f"Unknown binary message type {msg_type}")
+    return data
+
+
+def evidence_bytes(payload) -> bytes:
+    """Raw bytes of a frame / audio payload (base64 or data URL from JSON clients)"""
+    if isinstance(payload, str):
+        return base64.b64decode(payload.split(",")[-1])
+    return bytes(payload)
+
+
+
+class StreamMailbox:
+    """
+    Per-connection inbox between the receive loop and the analysis loop.
+    Only the newest unprocessed frame is kept; audio keeps a small ring.
+    """
+    def __init__(self, audio_size: int = AUDIO_RING_SIZE):
+        self.frame = None
+        self.audio = deque(maxlen=audio_size)
+        self.focus_events: List[bool] = []  # focus changes are never dropped
+        self.dropped_frames = 0
+        self.dropped_audio = 0
+        self.sequence = None  # client sequence / timestamp of the newest message
+        self.client_timestamp = None
+        self.closed = False
+        self._ready = asyncio.Event()
+
+    def put(self, data: dict):
+        if "frame" in data:
+            if self.frame is not None:
+                self.dropped_frames += 1
+                FRAMES_DROPPED.inc(reason="coalesced")
+            self.frame = data["frame"]
+        if "audio" in data:
+            if len(self.audio) == self.audio.maxlen:
+                self.dropped_audio += 1
+            self.audio.append(data["audio"])
+        if "is_focused" in data:
+            self.focus_events.append(data["is_focused"])
+        if "sequence" in data:
+            self.sequence = data["sequence"]
+        if "timestamp" in data:
+            self.client_timestamp = data["timestamp"]
+        self._ready.set()
+
+    async def take(self):
+        """Wait for new input and drain everything pending; None once closed"""
+        await self._ready.wait()
+        self._ready.clear()
+        if self.closed:
+            return None
+
+        data = {
+            "audio": list(self.audio),
+            "focus_events": self.focus_events,
+            "sequence": self.sequence,
+            "timestamp": self.client_timestamp
+        }
+        if self.frame is not None:
+            data["frame"] = self.frame
+        self.frame = None
+        self.audio.clear()
+        self.focus_events = []
+        return data
+
+    def close(self):
+        self.closed = True
+        self._ready.set()
+
+
+def cheating_counter_key(student_id: str, exam_id: str) -> str:
+    return f"cheating:{student_id}:{exam_id}"
+
+
+class ConnectionContext:
+    """
+    Per-connection state resolved once at connect time, so the hot path
+    never has to look the submission up again.
+    """
+    __slots__ = ("student_id", "exam_id", "websocket", "submission_id", "cheating_count", "mailbox", "last_heartbeat")
+
+    def __init__(self, student_id: str, exam_id: str, websocket: WebSocket = None):
+        self.student_id = student_id
+        self.exam_id = exam_id
+        self.websocket = websocket  # the connection this context belongs to
+        self.submission_id = None  # in-progress submission, None until resolved / after submit
+        self.cheating_count = 0
+        self.mailbox = StreamMailbox()
+        self.last_heartbeat = 0.0
+
+    @property
+    def counter_key(self) -> str:
+        return cheating_counter_key(self.student_id, self.exam_id)
+
+    @property
+    def session_key(self) -> str:
+        """
+        ai_monitor session: student + exam, fixed for the connection (and its
+        reconnects). Resolving the submission mid-stream must not move the
+        stream to a fresh session and lose the detector state.
+        """
+        return f"{self.student_id}:{self.exam_id}"
+
+    def resolve_submission(self):
+        """Load the in-progress submission id and its current cheating_count"""
+        if not (self.student_id.isdigit() and self.exam_id.isdigit()):
+            return None  # nothing to persist against
+
+        db = SessionLocal()
+        try:
+            submission = db.query(Submission.id, Submission.cheating_count).filter(
+                Submission.student_id == int(self.student_id),
+                Submission.exam_id == int(self.exam_id),
+                Submission.status == "in_progress"
+            ).first()
+        finally:
+            db.close()
+
+        if submission:
+            self.submission_id = submission.id
+            self.cheating_count = submission.cheating_count or 0
+        return self.submission_id
+
 
 class ConnectionManager:
-    def __init__(self):
+    """
+    Owns this worker's sockets. Cheating counters and cross-worker message
+    routing go through a pluggable backend (see services/connection_backend.py),
+    so several uvicorn workers can share one exam.
+    """
+    def __init__(self, backend=None):
         self.active_connections: Dict[str, WebSocket] = {}
-        self.student_exams: Dict[str, str] = {}  # student_id -> exam_id
-        self.cheating_counts: Dict[str, int] = {}  # student_id -> count
+        self.contexts: Dict[str, ConnectionContext] = {}  # student_id -> connection context
+        self.backend = backend or create_backend()
+        self.proctors = ProctorHub(self.backend)
+        self.remote_heartbeats: Dict[str, Dict[str, dict]] = {}  # exam_id -> student_id -> newest heartbeat
+        self.background = set()
+
+    async def start(self):
+        self.backend.subscribe("broadcast")
+        await self.backend.start(self._deliver)
+
+    async def stop(self):
+        await self.backend.stop()
+
+    async def _deliver(self, channel: str, message: dict):
+        """Handle a message another worker routed to us"""
+        if channel == "broadcast":
+            if message.get("kind") == "send":
+                await self._broadcast_local(message["text"])
+            return
+
+        if channel.startswith("exam:"):
+            exam_id = channel.split(":", 1)[1]
+            if message.get("kind") == "proctor":
+                self.proctors.publish(exam_id, message["event"])
+            elif message.get("kind") == "heartbeats":
+                for event in message["events"]:
+                    self.proctors.publish(exam_id, event)
+            return
+
+        student_id = channel.split(":", 1)[1]
+        if message.get("kind") == "send":
+            await self._send_local(message["text"], student_id)
+        elif message.get("kind") == "invalidate":
+            self._invalidate_local(student_id)
     
-    async def connect(self, websocket: WebSocket, student_id: str, exam_id: str):
-        await websocket.accept()
+    async def connect(self, websocket: WebSocket, student_id: str, exam_id: str) -> bool:
+        """Accept the socket; returns True if the binary protocol was negotiated"""
+        binary = BINARY_SUBPROTOCOL in websocket.scope.get("subprotocols", [])
+        await websocket.accept(subprotocol=BINARY_SUBPROTOCOL if binary else None)
         self.active_connections[student_id] = websocket
-        self.student_exams[student_id] = exam_id
-        self.cheating_counts[student_id] = 0
+
+        context = ConnectionContext(student_id, exam_id, websocket)
+        context.resolve_submission()
+        # Another worker may have counted violations the DB has not seen yet
+        context.cheating_count = await self.backend.init_counter(
+            context.counter_key, context.cheating_count
+        )
+        self.contexts[student_id] = context
+        self.backend.subscribe(f"student:{student_id}")
         
-        print(f"Student {student_id} connected for exam {exam_id}")
+        print(f"Student {student_id} connected for exam {exam_id}" + (" (binary)" if binary else ""))
+        self.publish_exam_event(exam_id, {
+            "type": "student_connected",
+            "student_id": student_id,
+            "total_warnings": context.cheating_count,
+            "timestamp": datetime.now().isoformat()
+        })
+        return binary
+
+    async def receive(self, websocket: WebSocket, binary: bool) -> dict:
+        """Read one client message in the negotiated protocol"""
+        if not binary:
+            return await websocket.receive_json()
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            raise WebSocketDisconnect(message.get("code", 1000))
+        if message.get("bytes") is not None:
+            return decode_binary_message(message["bytes"])
+        return json.loads(message["text"])
     
-    def disconnect(self, student_id: str):
-        if student_id in self.active_connections:
-            del self.active_connections[student_id]
-        if student_id in self.student_exams:
-            del self.student_exams[student_id]
-        if student_id in self.cheating_counts:
-            del self.cheating_counts[student_id]
+    def disconnect(self, student_id: str, websocket: WebSocket):
+        """
+        Drop the student's connection state if it still belongs to `websocket`.
+        After a reconnect the old socket's cleanup runs last; the new
+        connection then owns the entries and the subscription, so it is a no-op.
+        """
+        current = self.active_connections.get(student_id)
+        if current is not websocket:
+            if current is not None:
+                print(f"Student {student_id}: replaced connection closed")
+            return
+        del self.active_connections[student_id]
+        context = self.contexts.get(student_id)
+        if context is not None and context.websocket is websocket:
+            del self.contexts[student_id]
+            context.mailbox.close()
+            if context.submission_id is None:
+                # submission sessions survive a reconnect; idle eviction reclaims them
+                ai_monitor.forget(context.session_key)
+            self.publish_exam_event(context.exam_id, {
+                "type": "student_disconnected",
+                "student_id": student_id,
+                "timestamp": datetime.now().isoformat()
+            })
+        self.backend.unsubscribe(f"student:{student_id}")
         
         print(f"Student {student_id} disconnected")
+
+    async def invalidate_submission(self, student_id: str, exam_id: str):
+        """Forget the cached submission (after submit) on whichever worker holds it"""
+        await self.backend.set_counter(cheating_counter_key(student_id, exam_id), 0)
+        if not self._invalidate_local(student_id):
+            await self.backend.publish(f"student:{student_id}", {"kind": "invalidate"})
+
+    def _invalidate_local(self, student_id: str) -> bool:
+        context = self.contexts.get(student_id)
+        if context is None:
+            return False
+        ai_monitor.forget(context.session_key)
+        context.submission_id = None
+        context.cheating_count = 0
+        return True
+
+    def enqueue(self, student_id: str, data: dict):
+        """Hand a received message to the student's mailbox (never blocks)"""
+        context = self.contexts.get(student_id)
+        if context is not None:
+            for kind in ("frame", "audio", "is_focused"):
+                if kind in data:
+                    MESSAGES.inc(kind=kind)
+            context.mailbox.put(data)
+
+    async def run_mailbox(self, student_id: str, exam_id: str):
+        """Analysis loop: processes the latest input whenever the previous pass is done"""
+        context = self.contexts.get(student_id)
+        if context is None:
+            return
+        while True:
+            data = await context.mailbox.take()
+            if data is None:
+                break
+            await self.process_data(student_id, exam_id, data)
     
-    async def send_personal_message(self, message: str, student_id: str):
+    # ---------- proctor live view ----------
+    def authorize_proctor(self, token: str, exam_id: str) -> bool:
+        """Teachers may watch their own exams, admins any exam"""
+        if not token or not exam_id.isdigit():
+            return False
+        db = SessionLocal()
+        try:
+            user = get_current_user(token, db)
+            if user.role == "admin":
+                return True
+            exam = db.query(Exam.teacher_id).filter(Exam.id == int(exam_id)).first()
+            return user.role == "teacher" and exam is not None and exam.teacher_id == user.id
+        except Exception:
+            return False
+        finally:
+            db.close()
+
+    async def connect_proctor(self, websocket: WebSocket, exam_id: str, token: str):
+        """Accept a proctor socket; returns its subscriber or None if refused"""
+        if not self.authorize_proctor(token, exam_id):
+            await websocket.close(code=1008)
+            return None
+        await websocket.accept()
+
+        subscriber = self.proctors.subscribe(exam_id, websocket)
+        subscriber.push({"type": "subscribed"}, json.dumps({
+            "type": "subscribed",
+            "exam_id": exam_id,
+            "students": [c.student_id for c in self.contexts.values() if c.exam_id == exam_id],
+            "timestamp": datetime.now().isoformat()
+        }))
+        print(f"Proctor watching exam {exam_id}")
+        return subscriber
+
+    def disconnect_proctor(self, subscriber: ProctorSubscriber):
+        self.proctors.unsubscribe(subscriber)
+
+    def publish_exam_event(self, exam_id: str, event: dict):
+        """
+        Push an event to every proctor of the exam, on this and other workers (never blocks).
+        Nothing goes to the bus unless another worker has a proctor on the exam;
+        heartbeats for it are sent as one batch per exam every PROCTOR_HEARTBEAT_INTERVAL.
+        """
+        self.proctors.publish(exam_id, event)
+        if not self.backend.has_remote_subscribers(f"exam:{exam_id}"):
+            return
+        if event.get("type") == "heartbeat":
+            pending = self.remote_heartbeats.get(exam_id)
+            if pending is None:
+                pending = self.remote_heartbeats[exam_id] = {}
+                asyncio.get_running_loop().call_later(
+                    PROCTOR_HEARTBEAT_INTERVAL, self._flush_heartbeats, exam_id
+                )
+            pending[event["student_id"]] = event
+            return
+        if event.get("type") == "student_disconnected":
+            # a batched heartbeat must not arrive after the disconnect
+            self.remote_heartbeats.get(exam_id, {}).pop(event["student_id"], None)
+        self._publish_background(f"exam:{exam_id}", {"kind": "proctor", "event": event})
+
+    def _flush_heartbeats(self, exam_id: str):
+        events = self.remote_heartbeats.pop(exam_id, {})
+        if events:
+            self._publish_background(f"exam:{exam_id}", {"kind": "heartbeats", "events": list(events.values())})
+
+    def _publish_background(self, channel: str, message: dict):
+        task = asyncio.get_running_loop().create_task(self.backend.publish(channel, message))
+        self.background.add(task)
+        task.add_done_callback(self.background.discard)
+
+    def _heartbeat(self, context: ConnectionContext):
+        now = time.time()
+        if now - context.last_heartbeat < PROCTOR_HEARTBEAT_INTERVAL:
+            return
+        context.last_heartbeat = now
+        self.publish_exam_event(context.exam_id, {
+            "type": "heartbeat",
+            "student_id": context.student_id,
+            "total_warnings": context.cheating_count,
+            "dropped_frames": context.mailbox.dropped_frames,
+            "timestamp": datetime.now().isoformat()
+        })
+
+    # ---------- messaging ----------
+    async def send_personal_message(self, message: str, student_id: str, kind: str = "other"):
+        if not await self._send_local(message, student_id, kind):
+            await self.backend.publish(f"student:{student_id}", {"kind": "send", "text": message})
+
+    async def _send_local(self, message: str, student_id: str, kind: str = "other") -> bool:
         if student_id in self.active_connections:
+            start = time.perf_counter()
             await self.active_connections[student_id].send_text(message)
+            WS_SEND_SECONDS.observe(time.perf_counter() - start, type=kind)
+            return True
+        return False
     
     async def broadcast(self, message: str):
-        for connection in self.active_connections.values():
-            await connection.send_text(message)
+        await self._broadcast_local(message)
+        await self.backend.publish("broadcast", {"kind": "send", "text": message})
+
+    async def _broadcast_local(self, message: str):
+        # concurrently, so one slow client does not hold up the rest
+        await asyncio.gather(
+            *(connection.send_text(message) for connection in list(self.active_connections.values())),
+            return_exceptions=True
+        )
     
     async def process_data(self, student_id: str, exam_id: str, data: dict):
         """
-        Process incoming data from student (frames, audio, events)
+        Process incoming data from student (frames, audio, events).
+        Accepts a single client message or a drained mailbox batch
+        ("audio" list plus "focus_events").
         """
+        start = time.perf_counter()
         try:
             violations = []
+            evidence = {}
+            context = self.contexts.get(student_id)
+            mailbox = context.mailbox if context else None
+            session_key = context.session_key if context else f"{student_id}:{exam_id}"
+            # Until the models are loaded frames and audio are dropped, not queued
+            models_ready = monitoring_ready()
             
+            if "frame" in data and not models_ready:
+                FRAMES_DROPPED.inc(reason="warming_up")
+
             # Process frame if present
-            if "frame" in data:
-                frame_result = ai_monitor.process_frame(data["frame"], student_id)
-                if "violations" in frame_result:
+            if "frame" in data and models_ready:
+                try:
+                    frame_result = await inference_pool.process_frame(data["frame"], session_key, exam_id)
+                except InferenceQueueFull:
+                    # Pool saturated: drop this frame rather than stall the socket
+                    frame_result = {}
+                    FRAMES_DROPPED.inc(reason="queue_full")
+                    if mailbox is not None:
+                        mailbox.dropped_frames += 1
+                if frame_result.get("violations"):
                     violations.extend(frame_result["violations"])
+                    if EVIDENCE_SNAPSHOTS:
+                        evidence["frame"] = evidence_bytes(data["frame"])
             
             # Process audio if present
-            if "audio" in data:
-                audio_result = ai_monitor.process_audio(data["audio"], student_id)
-                if "violations" in audio_result:
-                    violations.extend(audio_result["violations"])
+            audio_chunks = data.get("audio", [])
+            if not isinstance(audio_chunks, list):
+                audio_chunks = [audio_chunks]
+            if audio_chunks and models_ready:
+                audio_result = ai_monitor.process_audio_batch(audio_chunks, session_key)
+                violations.extend(audio_result.get("violations", []))
+                if EVIDENCE_SNAPSHOTS and audio_result.get("violations"):
+                    evidence["audio"] = b"".join(evidence_bytes(chunk) for chunk in audio_chunks)
             
             # Check tab switching
+            focus_events = data.get("focus_events", [])
             if "is_focused" in data:
-                focus_result = ai_monitor.check_tab_switch(student_id, data["is_focused"])
+                focus_events = focus_events + [data["is_focused"]]
+            for is_focused in focus_events:
+                focus_result = ai_monitor.check_tab_switch(session_key, is_focused)
                 violations.extend(focus_result.get("violations", []))
             
-            # Save cheating events to database
-            db = SessionLocal()
-            try:
-                # Get submission for this student and exam
-                submission = db.query(Submission).filter(
-                    Submission.student_id == int(student_id),
-                    Submission.exam_id == int(exam_id),
-                    Submission.status == "in_progress"
-                ).first()
+            # Queue cheating events for the write-behind sink
+            if violations and context is not None and context.submission_id is None:
+                # not started when the socket connected, or submitted since
+                context.resolve_submission()
+            
+            if violations and context is not None and context.submission_id:
+                # Update cheating count (shared across workers)
+                context.cheating_count = await self.backend.incr_counter(
+                    context.counter_key, len(violations)
+                )
+                event_sink.record(context.submission_id, violations, context.cheating_count, evidence)
                 
-                if submission and violations:
-                    # Update cheating count
-                    self.cheating_counts[student_id] = self.cheating_counts.get(student_id, 0) + len(violations)
-                    
-                    # Save each violation as cheating event
-                    for violation in violations:
-                        cheating_event = CheatingEvent(
-                            submission_id=submission.id,
-                            event_type=violation["type"],
-                            severity=violation["severity"],
-                            confidence=violation["confidence"],
-                            timestamp=datetime.fromisoformat(violation["timestamp"])
-                        )
-                        db.add(cheating_event)
-                    
-                    # Update submission cheating count
-                    submission.cheating_count = self.cheating_counts[student_id]
-                    submission.warnings = submission.warnings or []
-                    submission.warnings.extend(violations)
+                # Send warning to student
+                warning_message = {
+                    "type": "cheating_warning",
+                    "violations": violations,
+                    "total_warnings": context.cheating_count,
+                    "timestamp": datetime.now().isoformat()
+                }
+                await self.send_personal_message(
+                    json.dumps(warning_message), 
+                    student_id,
+                    "cheating_warning"
+                )
+                self.publish_exam_event(exam_id, {
+                    "type": "violation",
+                    "student_id": student_id,
+                    "violations": violations,
+                    "total_warnings": context.cheating_count,
+                    "timestamp": warning_message["timestamp"]
+                })
+                
+                # Auto-submit on 3rd warning
+                if context.cheating_count >= 3:
+                    auto_submit_message = {
+                        "type": "auto_submit",
+                        "reason": "Multiple cheating violations detected",
+                        "violation_count": context.cheating_count,
+                        "timestamp": datetime.now().isoformat()
+                    }
+                    await self.send_personal_message(
+                        json.dumps(auto_submit_message),
+                        student_id,
+                        "auto_submit"
+                    )
+                    self.publish_exam_event(exam_id, {**auto_submit_message, "student_id": student_id})
                     
-                    db.commit()
+                    # Update submission status (flushes the sink immediately)
+                    await event_sink.auto_submit(context.submission_id, "Multiple cheating violations")
+                    ai_monitor.forget(context.session_key)
+                    context.submission_id = None
                     
-                    # Send warning to student if cheating detected
-                    if violations:
-                        warning_message = {
-                            "type": "cheating_warning",
-                            "violations": violations,
-                            "total_warnings": self.cheating_counts[student_id],
-                            "timestamp": datetime.now().isoformat()
-                        }
-                        await self.send_personal_message(
-                            json.dumps(warning_message), 
-                            student_id
-                        )
-                        
-                        # Auto-submit on 3rd warning
-                        if self.cheating_counts[student_id] >= 3:
-                            auto_submit_message = {
-                                "type": "auto_submit",
-                                "reason": "Multiple cheating violations detected",
-                                "violation_count": self.cheating_counts[student_id],
-                                "timestamp": datetime.now().isoformat()
-                            }
-                            await self.send_personal_message(
-                                json.dumps(auto_submit_message),
-                                student_id
-                            )
-                            
-                            # Update submission status
-                            submission.status = "completed"
-                            submission.auto_submitted = True
-                            submission.auto_submit_reason = "Multiple cheating violations"
-                            submission.submitted_at = datetime.now()
-                            db.commit()
-                            
-                            # Disconnect student
-                            self.disconnect(student_id)
-            finally:
-                db.close()
+                    # Disconnect student
+                    self.disconnect(student_id, context.websocket)
             
             # Send monitoring feedback
             feedback = {
                 "type": "monitoring_feedback",
                 "timestamp": datetime.now().isoformat(),
                 "violations_detected": len(violations),
-                "total_warnings": self.cheating_counts.get(student_id, 0)
+                "total_warnings": context.cheating_count if context else 0,
+                "dropped_frames": mailbox.dropped_frames if mailbox else 0,
+                "dropped_audio": mailbox.dropped_audio if mailbox else 0,
+                "monitoring": "ready" if models_ready else "warming_up",
+                "sequence": data.get("sequence"),
+                "client_timestamp": data.get("timestamp")
             }
             
-            await self.send_personal_message(json.dumps(feedback), student_id)
+            await self.send_personal_message(json.dumps(feedback), student_id, "monitoring_feedback")
+            if context is not None and student_id in self.contexts:
+                self._heartbeat(context)
             
         except Exception as e:
             print(f"Error processing data: {e}")
+        finally:
+            PROCESS_SECONDS.observe(time.perf_counter() - start)
 
 # Global WebSocket manager
 manager = ConnectionManager()
\ No newline at end of file
@@ -0,0 +1,85 @@
+"""
+Shared helpers for the benchmark scripts
+Synthetic inputs, recorded-input loading and process memory readings
+"""
+
+import os
+import resource
+import sys
+import wave
+
+import cv2
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+
+def synthetic_jpeg(width, height, quality=80, seed=None):
+    """A webcam-like test frame: gradients, a face-sized blob and sensor noise"""
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    frame = np.dstack([np.broadcast_to(x, (height, width)), np.broadcast_to(y, (height, width)),
+                       np.full((height, width), 128, np.float32)])
+    frame = np.clip(frame + rng.normal(0, 12, frame.shape), 0, 255).astype(np.uint8)
+    cv2.circle(frame, (width // 2, height // 2), height // 4, (60, 90, 200), -1)
+    ok, encoded = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    return encoded.tobytes()
+
+
+def synthetic_pcm(seconds=1.0, sample_rate=16000, voiced=True, seed=None):
+    """16-bit mono PCM: a modulated harmonic tone (voiced) or low room noise"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    noise = rng.normal(0, 40, t.shape)
+    if voiced:
+        tone = sum(np.sin(2 * np.pi * f * t) / k for k, f in enumerate((140, 280, 420, 560), 1))
+        signal = tone * (0.6 + 0.4 * np.sin(2 * np.pi * 4 * t)) * 5000 + noise
+    else:
+        signal = noise
+    return np.clip(signal, -32768, 32767).astype("<i2").tobytes()
+
+
+def load_frames(directory):
+    """Raw bytes of every .jpg / .jpeg in a directory, sorted by name"""
+    names = sorted(n for n in os.listdir(directory) if n.lower().endswith((".jpg", ".jpeg")))
+    frames = []
+    for name in names:
+        with open(os.path.join(directory, name), "rb") as f:
+            frames.append(f.read())
+    return frames
+
+
+def load_audio(directory):
+    """PCM chunks from .pcm / .raw (16-bit mono) and .wav files in a directory"""
+    chunks = []
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        if name.lower().endswith(".wav"):
+            with wave.open(path, "rb") as w:
+                if w.getsampwidth() == 2 and w.getnchannels() == 1:
+                    chunks.append(w.readframes(w.getnframes()))
+        elif name.lower().endswith((".pcm", ".raw")):
+            with open(path, "rb") as f:
+                chunks.append(f.read())
+    return chunks
+
+
+def rss_mb():
+    """Current resident set size of this process in MB"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return peak_rss_mb()
+
+
+def peak_rss_mb(who=resource.RUSAGE_SELF):
+    """High-water mark of resident memory in MB (ru_maxrss is KB on Linux, bytes on macOS)"""
+    peak = resource.getrusage(who).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
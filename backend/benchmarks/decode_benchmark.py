@@ -0,0 +1,79 @@
+"""
+Frame decode micro-benchmark
+Compares the old full-resolution decode + per-model RGB conversions with
+FrameDecoder (reduced JPEG decode, one shared RGB buffer)
+
+Run from backend/:
+    python benchmarks/decode_benchmark.py [--image frame.jpg] [--iterations 200]
+"""
+
+import argparse
+import os
+import time
+
+import cv2
+import numpy as np
+
+from common import synthetic_jpeg
+from services.ai_monitoring import FrameDecoder
+
+
+def before(jpeg):
+    """Previous path: full decode, a cvtColor per model, fresh thumbnail arrays"""
+    frame = cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_COLOR)
+    cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)  # face detection
+    cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)  # head pose
+    cv2.cvtColor(cv2.resize(frame, (32, 24), interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2GRAY).tobytes()
+    return frame.shape
+
+
+def after(decoder, jpeg):
+    frame = decoder.decode(jpeg)
+    decoder.rgb(frame)
+    decoder.thumb(frame)
+    return frame.shape
+
+
+def measure(fn, iterations):
+    fn()  # warm-up
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return np.mean(samples), samples[len(samples) // 2], samples[int(len(samples) * 0.95) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--image", help="JPEG file to use instead of synthetic frames")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--target-width", type=int, default=FrameDecoder().target_width)
+    args = parser.parse_args()
+
+    if args.image:
+        with open(args.image, "rb") as f:
+            inputs = [(os.path.basename(args.image), f.read())]
+    else:
+        inputs = [(f"{w}x{h}", synthetic_jpeg(w, h)) for w, h in ((640, 480), (1280, 720), (1920, 1080))]
+
+    decoder = FrameDecoder(target_width=args.target_width)
+
+    print("=" * 72)
+    print(f"FRAME DECODE BENCHMARK ({args.iterations} iterations, target width {args.target_width})")
+    print("=" * 72)
+    print(f"{'input':<14}{'path':<8}{'decoded':>12}{'avg ms':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, jpeg in inputs:
+        rows = [
+            ("before", before(jpeg), measure(lambda: before(jpeg), args.iterations)),
+            ("after", after(decoder, jpeg), measure(lambda: after(decoder, jpeg), args.iterations)),
+        ]
+        for path, shape, (avg, p50, p95) in rows:
+            decoded = f"{shape[1]}x{shape[0]}"
+            print(f"{name:<14}{path:<8}{decoded:>12}{avg:>10.2f}{p50:>10.2f}{p95:>10.2f}")
+        print(f"{'':<14}speedup {rows[0][2][0] / rows[1][2][0]:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,412 @@
+"""
+ProctorVision exam cohort load generator
+Simulates N students taking one exam against a running server: login, start
+the exam, stream frames + audio over /ws/monitoring at a fixed rate, submit
+
+Records end-to-end feedback latency (client timestamp echoed back in
+monitoring_feedback), dropped / coalesced messages, server CPU (from /proc,
+when the server runs on this host) and the cheating-event DB write rate.
+With --ramp it steps through several cohort sizes and reports the first one
+that breaks the latency / drop budget, i.e. where the node saturates.
+
+Students are seeded straight into the database (like create_demo_data.py),
+so run it from backend/ with the server's DATABASE_URL, or use --seed api
+against a remote server:
+    python benchmarks/load_test.py --students 50 --duration 60 --fps 2
+    python benchmarks/load_test.py --ramp 10,25,50,100 --server-pid $(pgrep -of "uvicorn main:app")
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import math
+import os
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+import websockets
+
+from common import synthetic_jpeg, synthetic_pcm
+from utils.helpers import summarize_ms
+
+BINARY_SUBPROTOCOL = "proctorvision.binary.v1"
+MSG_FRAME, MSG_AUDIO = 1, 2
+EMAIL_DOMAIN = "loadtest.proctorvision.com"
+
+
+# ===================== HTTP =====================
+def _http(base_url, method, path, token=None, body=None, form=None, timeout=30):
+    headers = {}
+    data = None
+    if body is not None:
+        data = json.dumps(body).encode()
+        headers["Content-Type"] = "application/json"
+    elif form is not None:
+        data = urllib.parse.urlencode(form).encode()
+        headers["Content-Type"] = "application/x-www-form-urlencoded"
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+
+    request = urllib.request.Request(base_url + path, data=data, headers=headers, method=method)
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.status, json.loads(response.read() or b"null")
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read() or b"null")
+
+
+async def http(base_url, method, path, **kwargs):
+    # urllib is blocking; a thread per request keeps the event loop streaming
+    return await asyncio.to_thread(_http, base_url, method, path, **kwargs)
+
+
+# ===================== SEEDING =====================
+def student_email(prefix, i):
+    return f"{prefix}-student{i}@{EMAIL_DOMAIN}"
+
+
+def teacher_email(prefix):
+    return f"{prefix}-teacher@{EMAIL_DOMAIN}"
+
+
+def seed_db(prefix, count, password):
+    """Teacher + students inserted directly, one password hash shared by all"""
+    from database.database import Base, SessionLocal, engine
+    from database.models import User
+    from services.auth_service import get_password_hash
+
+    Base.metadata.create_all(bind=engine)
+    hashed = get_password_hash(password)
+    wanted = {teacher_email(prefix): "teacher"}
+    wanted.update({student_email(prefix, i): "student" for i in range(count)})
+
+    db = SessionLocal()
+    try:
+        existing = {e for (e,) in db.query(User.email).filter(User.email.in_(list(wanted))).all()}
+        db.add_all([
+            User(email=email, name=email.split("@")[0], hashed_password=hashed, role=role, status="active")
+            for email, role in wanted.items() if email not in existing
+        ])
+        db.commit()
+        return len(wanted) - len(existing)
+    finally:
+        db.close()
+
+
+async def seed_api(base_url, prefix, count, password):
+    """Register whoever does not exist yet through /api/auth/register"""
+    async def register(email, role):
+        status, _ = await http(base_url, "POST", "/api/auth/register", body={
+            "email": email, "password": password, "name": email.split("@")[0], "role": role
+        })
+        return status == 200
+
+    created = await asyncio.gather(
+        register(teacher_email(prefix), "teacher"),
+        *(register(student_email(prefix, i), "student") for i in range(count))
+    )
+    return sum(created)
+
+
+async def login(base_url, email, password):
+    status, body = await http(base_url, "POST", "/api/auth/login",
+                              form={"username": email, "password": password})
+    if status != 200:
+        raise RuntimeError(f"login {email}: {status} {body}")
+    return body["access_token"], body["user"]["id"]
+
+
+async def create_exam(base_url, prefix, password):
+    token, _ = await login(base_url, teacher_email(prefix), password)
+    status, body = await http(base_url, "POST", "/api/exams/create", token=token, body={
+        "title": f"Load test {prefix}",
+        "duration": 120,
+        "questions": [
+            {"question_text": f"Question {i + 1}", "type": "mcq",
+             "options": ["A", "B", "C", "D"], "correct_answer": i % 4, "marks": 1}
+            for i in range(5)
+        ],
+    })
+    if status != 200:
+        raise RuntimeError(f"create exam: {status} {body}")
+    return body["exam_code"]
+
+
+# ===================== SERVER SIDE SAMPLING =====================
+def _cpu_ticks(pid):
+    """utime + stime of a process and its direct children (inference workers)"""
+    pids = [pid]
+    for entry in os.listdir("/proc"):
+        if entry.isdigit():
+            try:
+                with open(f"/proc/{entry}/stat") as f:
+                    if int(f.read().rsplit(")", 1)[1].split()[1]) == pid:
+                        pids.append(int(entry))
+            except (OSError, ValueError, IndexError):
+                pass
+
+    total = 0
+    for p in pids:
+        try:
+            with open(f"/proc/{p}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+            total += int(fields[11]) + int(fields[12])
+        except (OSError, ValueError, IndexError):
+            pass
+    return total
+
+
+class ServerProbe:
+    """CPU (when the server pid is local) and event sink counters around one stage"""
+
+    def __init__(self, base_url, pid=None):
+        self.base_url = base_url
+        self.pid = pid
+        self.ticks_per_second = os.sysconf("SC_CLK_TCK")
+
+    async def sink_counters(self):
+        status, body = await http(self.base_url, "GET", "/api/monitoring/inference")
+        if status != 200:
+            return None
+        sink = body.get("event_sink", {})
+        return sink.get("flushed_events", 0), sink.get("flushes", 0)
+
+    async def begin(self):
+        self.started = time.perf_counter()
+        self.ticks = _cpu_ticks(self.pid) if self.pid else None
+        self.sink = await self.sink_counters()
+
+    async def end(self):
+        elapsed = time.perf_counter() - self.started
+        result = {}
+        if self.ticks is not None:
+            used = (_cpu_ticks(self.pid) - self.ticks) / self.ticks_per_second
+            result["server_cpu_percent"] = round(used / elapsed * 100, 1)
+            result["server_cpu_cores"] = round(used / elapsed, 2)
+        sink = await self.sink_counters()
+        if sink and self.sink:
+            result["db_events_per_second"] = round((sink[0] - self.sink[0]) / elapsed, 1)
+            result["db_flushes_per_second"] = round((sink[1] - self.sink[1]) / elapsed, 2)
+        return result
+
+
+# ===================== STUDENT =====================
+class StudentStats:
+    def __init__(self):
+        self.sent = 0
+        self.feedback = 0
+        self.latencies = []  # seconds, client timestamp -> feedback received
+        self.server_dropped_frames = 0
+        self.server_dropped_audio = 0
+        self.warming_up = 0
+        self.auto_submitted = False
+        self.error = None
+
+
+def encode_message(kind, payload, sequence, binary):
+    timestamp = int(time.time() * 1000)
+    if binary:
+        msg_type = MSG_FRAME if kind == "frame" else MSG_AUDIO
+        return msg_type.to_bytes(1, "big") + sequence.to_bytes(4, "big") + timestamp.to_bytes(8, "big") + payload
+    return json.dumps({kind: payload, "sequence": sequence, "timestamp": timestamp})
+
+
+async def receive_feedback(ws, stats):
+    async for message in ws:
+        if isinstance(message, bytes):
+            continue
+        data = json.loads(message)
+        if data.get("type") == "monitoring_feedback":
+            stats.feedback += 1
+            if data.get("client_timestamp"):
+                stats.latencies.append(time.time() - data["client_timestamp"] / 1000)
+            stats.server_dropped_frames = data.get("dropped_frames", 0)
+            stats.server_dropped_audio = data.get("dropped_audio", 0)
+            if data.get("monitoring") == "warming_up":
+                stats.warming_up += 1
+        elif data.get("type") == "auto_submit":
+            stats.auto_submitted = True
+
+
+async def run_student(args, index, exam_code, frames, audio, stats, stop_at):
+    try:
+        token, user_id = await login(args.base_url, student_email(args.prefix, index), args.password)
+        status, started = await http(args.base_url, "POST", f"/api/exams/{exam_code}/start", token=token)
+        if status != 200:
+            raise RuntimeError(f"start exam: {status} {started}")
+
+        url = f"{args.ws_url}/ws/monitoring/{user_id}/{started['exam']['id']}"
+        subprotocols = [BINARY_SUBPROTOCOL] if args.binary else None
+        async with websockets.connect(url, subprotocols=subprotocols, max_size=None) as ws:
+            receiver = asyncio.create_task(receive_feedback(ws, stats))
+            frame_interval = 1 / args.fps
+            next_frame = next_audio = time.perf_counter()
+            if args.audio_interval <= 0:
+                next_audio = math.inf  # audio off: only frames set the pace
+            sequence = 0
+            while time.time() < stop_at and not stats.auto_submitted:
+                now = time.perf_counter()
+                if now >= next_audio:
+                    await ws.send(encode_message("audio", audio[sequence % len(audio)], sequence, args.binary))
+                    next_audio += args.audio_interval
+                    sequence += 1
+                    stats.sent += 1
+                if now >= next_frame:
+                    await ws.send(encode_message("frame", frames[sequence % len(frames)], sequence, args.binary))
+                    next_frame += frame_interval
+                    sequence += 1
+                    stats.sent += 1
+                await asyncio.sleep(max(0.0, min(next_frame, next_audio) - time.perf_counter()))
+
+            await asyncio.sleep(args.drain)  # let the last feedback arrive
+            receiver.cancel()
+
+        if not stats.auto_submitted:
+            await http(args.base_url, "POST", f"/api/exams/submit/{started['submission_id']}",
+                       token=token, body={"answers": []})
+    except Exception as e:
+        stats.error = f"{type(e).__name__}: {e}"
+
+
+# ===================== STAGES =====================
+async def run_stage(args, students, exam_code, frames, audio, probe):
+    stats = [StudentStats() for _ in range(students)]
+    await probe.begin()
+    stop_at = time.time() + args.ramp_up + args.duration
+
+    async def staggered(i):
+        await asyncio.sleep(args.ramp_up * i / max(1, students))
+        await run_student(args, i, exam_code, frames, audio, stats[i], stop_at)
+
+    await asyncio.gather(*(staggered(i) for i in range(students)))
+    server = await probe.end()
+
+    sent = sum(s.sent for s in stats)
+    feedback = sum(s.feedback for s in stats)
+    dropped = sum(s.server_dropped_frames + s.server_dropped_audio for s in stats)
+    latency = summarize_ms([l for s in stats for l in s.latencies])
+    errors = [s.error for s in stats if s.error]
+    result = {
+        "students": students,
+        "connected": students - len(errors),
+        "messages_sent": sent,
+        "feedback_received": feedback,
+        "coalesced_or_lost": max(0, sent - feedback),
+        "server_dropped": dropped,
+        "drop_rate": round(dropped / sent, 3) if sent else 0.0,
+        "warming_up_feedback": sum(s.warming_up for s in stats),
+        "auto_submitted": sum(s.auto_submitted for s in stats),
+        "latency_ms": latency,
+        "errors": errors[:5],
+        "error_count": len(errors),
+        **server,
+    }
+    result["saturated"] = (
+        latency["p95"] > args.latency_budget_ms
+        or result["drop_rate"] > args.drop_budget
+        or len(errors) > 0
+    )
+    return result
+
+
+def print_stage(result):
+    lat = result["latency_ms"]
+    cpu = result.get("server_cpu_percent")
+    db = result.get("db_events_per_second")
+    print(f"{result['students']:>8}{result['connected']:>10}{lat['p50']:>9.0f}{lat['p95']:>9.0f}{lat['p99']:>9.0f}"
+          f"{result['drop_rate'] * 100:>8.1f}%{(f'{cpu:.0f}%' if cpu is not None else '-'):>8}"
+          f"{(f'{db:.1f}' if db is not None else '-'):>9}{'  SATURATED' if result['saturated'] else ''}")
+    for error in result["errors"]:
+        print(f"          ! {error}")
+
+
+async def main_async(args):
+    levels = [int(n) for n in (args.ramp or str(args.students)).split(",")]
+    print("=" * 78)
+    print(f"PROCTORVISION LOAD TEST ({args.base_url}, {args.fps:g} fps, "
+          f"{'binary' if args.binary else 'JSON'} protocol, {args.duration:g}s per stage)")
+    print("=" * 78)
+
+    if args.seed == "db":
+        created = seed_db(args.prefix, max(levels), args.password)
+    elif args.seed == "api":
+        created = await seed_api(args.base_url, args.prefix, max(levels), args.password)
+    else:
+        created = 0
+    print(f"👥 Seeded {created} new user(s) with prefix '{args.prefix}'")
+
+    exam_code = args.exam_code or await create_exam(args.base_url, args.prefix, args.password)
+    print(f"📝 Exam {exam_code}")
+
+    jpeg = [synthetic_jpeg(args.width, args.height, seed=i) for i in range(8)]
+    pcm = [synthetic_pcm(args.audio_seconds, voiced=args.voice, seed=i) for i in range(4)]
+    if args.binary:
+        frames, audio = jpeg, pcm
+    else:
+        frames = ["data:image/jpeg;base64," + base64.b64encode(f).decode() for f in jpeg]
+        audio = [base64.b64encode(a).decode() for a in pcm]
+
+    probe = ServerProbe(args.base_url, args.server_pid)
+    print(f"\n{'students':>8}{'connected':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'drops':>9}{'CPU':>8}{'DB ev/s':>9}")
+    results = []
+    for students in levels:
+        result = await run_stage(args, students, exam_code, frames, audio, probe)
+        results.append(result)
+        print_stage(result)
+        if result["saturated"] and args.stop_on_saturation:
+            break
+
+    saturated = next((r["students"] for r in results if r["saturated"]), None)
+    print(f"\n{'⚠️ Saturated at ' + str(saturated) + ' students' if saturated else '✅ No stage saturated'}"
+          f" (budget: p95 <= {args.latency_budget_ms:g} ms, drops <= {args.drop_budget * 100:g}%)")
+
+    report = {
+        "config": {k: v for k, v in vars(args).items() if k != "password"},
+        "exam_code": exam_code,
+        "stages": results,
+        "saturated_at": saturated,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ProctorVision exam cohort load generator")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--ws-url", help="defaults to --base-url with ws:// / wss://")
+    parser.add_argument("--students", type=int, default=20)
+    parser.add_argument("--ramp", help="comma-separated cohort sizes, run one after another")
+    parser.add_argument("--duration", type=float, default=30, help="seconds of streaming per stage")
+    parser.add_argument("--ramp-up", type=float, default=5, help="seconds over which students join")
+    parser.add_argument("--drain", type=float, default=1, help="seconds to wait for trailing feedback")
+    parser.add_argument("--fps", type=float, default=2)
+    parser.add_argument("--audio-interval", type=float, default=3, help="seconds between audio chunks, 0 = none")
+    parser.add_argument("--audio-seconds", type=float, default=1)
+    parser.add_argument("--voice", action="store_true", help="stream voiced audio (expect voice violations)")
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--binary", action="store_true", help=f"use the {BINARY_SUBPROTOCOL} protocol")
+    parser.add_argument("--seed", choices=("db", "api", "none"), default="db")
+    parser.add_argument("--prefix", default="load")
+    parser.add_argument("--password", default="loadtest123")
+    parser.add_argument("--exam-code", help="use an existing exam instead of creating one")
+    parser.add_argument("--server-pid", type=int, help="local server pid for CPU sampling")
+    parser.add_argument("--latency-budget-ms", type=float, default=1000)
+    parser.add_argument("--drop-budget", type=float, default=0.2, help="max fraction of server-dropped messages")
+    parser.add_argument("--stop-on-saturation", action="store_true")
+    parser.add_argument("--output", help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    args.base_url = args.base_url.rstrip("/")
+    if not args.ws_url:
+        args.ws_url = "ws" + args.base_url[len("http"):]
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
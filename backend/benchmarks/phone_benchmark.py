@@ -0,0 +1,110 @@
+"""
+Phone detector backend benchmark
+Model-load time, resident memory and per-frame latency of the PyTorch
+(ultralytics) and ONNX Runtime phone backends
+
+Each backend is measured in a fresh interpreter so import cost and memory
+are not shared. Export the ONNX model first:
+    yolo export model=yolov8n.pt format=onnx dynamic=True
+
+Run from backend/:
+    python benchmarks/phone_benchmark.py [--backends torch,onnx] [--frames 50] [--batch 8]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from common import BACKEND_DIR, rss_mb
+
+
+def measure(backend, frames, batch):
+    """Runs inside the child interpreter; returns one result dict"""
+    import numpy as np
+
+    from services.ai_monitoring import PHONE_BACKENDS
+
+    baseline = rss_mb()
+    start = time.perf_counter()  # includes importing torch / onnxruntime
+    model = PHONE_BACKENDS[backend]()
+    load_time = time.perf_counter() - start
+    loaded = rss_mb()
+
+    from utils.helpers import summarize_ms
+
+    rng = np.random.default_rng(0)
+    images = [rng.integers(0, 255, (480, 640, 3), dtype=np.uint8) for _ in range(batch)]
+    model.infer(images[:1])  # warm-up
+
+    single = []
+    for i in range(frames):
+        t = time.perf_counter()
+        model.infer([images[i % batch]])
+        single.append(time.perf_counter() - t)
+
+    batched = []
+    for _ in range(max(1, frames // batch)):
+        t = time.perf_counter()
+        model.infer(images)
+        batched.append((time.perf_counter() - t) / batch)
+
+    return {
+        "backend": backend,
+        "load_s": round(load_time, 3),
+        "rss_mb": round(loaded, 1),
+        "model_rss_mb": round(loaded - baseline, 1),
+        "peak_rss_mb": round(rss_mb(), 1),
+        "frame_ms": summarize_ms(single),
+        f"batch{batch}_frame_ms": summarize_ms(batched),
+    }
+
+
+def run_child(backend, args):
+    cmd = [sys.executable, os.path.abspath(__file__), "--child", backend,
+           "--frames", str(args.frames), "--batch", str(args.batch)]
+    env = {**os.environ, "PHONE_BACKEND": "none"}  # keep the global ai_monitor from loading one
+    proc = subprocess.run(cmd, cwd=BACKEND_DIR, env=env, capture_output=True, text=True)
+    lines = proc.stdout.strip().splitlines()
+    if proc.returncode != 0 or not lines:
+        reason = (proc.stderr.strip().splitlines() or ["no output"])[-1]
+        return {"backend": backend, "error": reason}
+    return json.loads(lines[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Phone detector backend benchmark")
+    parser.add_argument("--backends", default="torch,onnx")
+    parser.add_argument("--frames", type=int, default=50)
+    parser.add_argument("--batch", type=int, default=8)
+    parser.add_argument("--json", action="store_true", help="print raw JSON results")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.child, args.frames, args.batch)))
+        return
+
+    results = [run_child(backend, args) for backend in args.backends.split(",")]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print("=" * 78)
+    print(f"PHONE DETECTOR BENCHMARK ({args.frames} frames, batch {args.batch}, 640x480 input)")
+    print("=" * 78)
+    print(f"{'backend':<8}{'load s':>8}{'RSS MB':>9}{'model MB':>10}"
+          f"{'p50 ms':>9}{'p95 ms':>9}{f'b{args.batch} ms/frame':>16}")
+    for r in results:
+        if "error" in r:
+            print(f"{r['backend']:<8}  unavailable: {r['error']}")
+            continue
+        batched = r[f"batch{args.batch}_frame_ms"]["avg"]
+        print(f"{r['backend']:<8}{r['load_s']:>8.2f}{r['rss_mb']:>9.1f}{r['model_rss_mb']:>10.1f}"
+              f"{r['frame_ms']['p50']:>9.2f}{r['frame_ms']['p95']:>9.2f}{batched:>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""
+AI monitoring pipeline benchmark
+Replays recorded and/or synthetic frames and audio through every detector on
+its own and through process_frame / process_audio, then repeats the full
+frame path across several worker processes
+
+Reports p50/p95/p99 latency, frames per second (per core), memory high-water
+mark and writes machine-readable JSON for tracking regressions.
+
+Run from backend/:
+    python benchmarks/pipeline_benchmark.py --output bench.json
+    python benchmarks/pipeline_benchmark.py --frames-dir recordings/frames --audio-dir recordings/audio
+    python benchmarks/pipeline_benchmark.py --compare bench.json   # deltas against an earlier run
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import time
+from datetime import datetime
+
+from common import BACKEND_DIR, load_audio, load_frames, peak_rss_mb, rss_mb, synthetic_jpeg, synthetic_pcm
+from utils.helpers import summarize_ms
+
+SYNTHETIC_SIZES = ((640, 480), (1280, 720))
+
+
+# ===================== INPUTS =====================
+def build_inputs(args):
+    frames, audio = [], []
+    if args.frames_dir:
+        frames += load_frames(args.frames_dir)
+    if args.audio_dir:
+        audio += load_audio(args.audio_dir)
+    if args.synthetic or not frames:
+        count = args.synthetic or 16
+        frames += [synthetic_jpeg(*SYNTHETIC_SIZES[i % len(SYNTHETIC_SIZES)], seed=i) for i in range(count)]
+    if args.synthetic or not audio:
+        count = args.synthetic or 16
+        audio += [synthetic_pcm(1.0, voiced=i % 2 == 0, seed=i) for i in range(count)]
+    return frames, audio
+
+
+# ===================== SINGLE PROCESS =====================
+def time_calls(fn, items, iterations):
+    """Runs fn over items round-robin; returns (latency summary, items per second)"""
+    fn(items[0])  # warm-up
+    samples = []
+    start = time.perf_counter()
+    for i in range(iterations):
+        t = time.perf_counter()
+        fn(items[i % len(items)])
+        samples.append(time.perf_counter() - t)
+    elapsed = time.perf_counter() - start
+    return {
+        "iterations": iterations,
+        "latency_ms": summarize_ms(samples),
+        "per_second": round(iterations / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+def run_stages(monitor, frames, audio, iterations):
+    monitor.load()
+    decoded = [monitor.decoder.decode(f) for f in frames]
+    stages = {}
+
+    def decode(frame_data):
+        frame = monitor.decoder.decode(frame_data)
+        monitor.decoder.rgb(frame)
+        monitor.decoder.thumb(frame)
+
+    stages["decode"] = time_calls(decode, frames, iterations)
+
+    detectors = {
+        "face": (monitor.face, lambda f: monitor.face.detect(f)),
+        "pose": (monitor.pose, lambda f: monitor.pose.estimate(f)),
+        "phone": (monitor.phone, lambda f: monitor.phone.detect(f)),
+    }
+    for name, (detector, fn) in detectors.items():
+        if detector.enabled:
+            stages[name] = time_calls(fn, decoded, iterations)
+        else:
+            stages[name] = {"enabled": False}
+
+    stages["audio_vad"] = time_calls(lambda chunk: monitor.audio.frame_flags([chunk]), audio, iterations)
+    stages["audio_vad"]["audio_frames_per_second"] = monitor.audio.stats()["frames_per_second"]
+
+    # full paths, one session per input so the scheduler sees realistic streams
+    counter = iter(range(10 ** 9))
+    stages["process_frame"] = time_calls(
+        lambda f: monitor.process_frame(f, f"bench-{next(counter) % 8}", "bench"), frames, iterations
+    )
+    stages["process_audio"] = time_calls(
+        lambda chunk: monitor.process_audio(chunk, f"bench-{next(counter) % 8}"), audio, iterations
+    )
+    return stages
+
+
+# ===================== CONCURRENCY =====================
+def _concurrency_worker(job):
+    """One benchmark process: load models, then push frames for `duration` seconds"""
+    frames, duration, index = job
+    from services.ai_monitoring import ai_monitor
+    ai_monitor.load()
+    ai_monitor.process_frame(frames[0], f"warm-{index}")
+
+    samples = []
+    start = time.perf_counter()
+    i = 0
+    while time.perf_counter() - start < duration:
+        t = time.perf_counter()
+        ai_monitor.process_frame(frames[i % len(frames)], f"worker-{index}-{i % 8}", "bench")
+        samples.append(time.perf_counter() - t)
+        i += 1
+    return {"frames": i, "elapsed": time.perf_counter() - start, "samples": samples, "peak_rss_mb": peak_rss_mb()}
+
+
+def run_concurrency(frames, levels, duration):
+    results = []
+    context = multiprocessing.get_context("spawn")
+    for workers in levels:
+        with context.Pool(workers) as pool:
+            runs = pool.map(_concurrency_worker, [(frames, duration, i) for i in range(workers)])
+        fps = sum(r["frames"] / r["elapsed"] for r in runs if r["elapsed"])
+        results.append({
+            "workers": workers,
+            "frames": sum(r["frames"] for r in runs),
+            "fps": round(fps, 1),
+            "fps_per_core": round(fps / workers, 1),
+            "latency_ms": summarize_ms([s for r in runs for s in r["samples"]]),
+            "peak_rss_mb_per_worker": round(max(r["peak_rss_mb"] for r in runs), 1),
+        })
+    return results
+
+
+# ===================== REPORT =====================
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True
+        ).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def print_report(report):
+    print("=" * 78)
+    print(f"AI MONITORING PIPELINE BENCHMARK ({report['meta']['revision'] or 'unknown revision'})")
+    print("=" * 78)
+    print(f"inputs: {report['inputs']['frames']} frames, {report['inputs']['audio_chunks']} audio chunks")
+    print(f"{'stage':<16}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'per sec':>11}")
+    for name, stage in report["stages"].items():
+        if stage.get("enabled") is False:
+            print(f"{name:<16}  disabled")
+            continue
+        lat = stage["latency_ms"]
+        print(f"{name:<16}{lat['p50']:>9.2f}{lat['p95']:>9.2f}{lat['p99']:>9.2f}{stage['per_second']:>11.1f}")
+
+    if report["concurrency"]:
+        print(f"\n{'workers':<9}{'fps':>9}{'fps/core':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'RSS MB':>9}")
+        for row in report["concurrency"]:
+            lat = row["latency_ms"]
+            print(f"{row['workers']:<9}{row['fps']:>9.1f}{row['fps_per_core']:>10.1f}"
+                  f"{lat['p50']:>9.2f}{lat['p95']:>9.2f}{lat['p99']:>9.2f}{row['peak_rss_mb_per_worker']:>9.1f}")
+    print(f"\nmemory high-water mark: {report['memory']['peak_rss_mb']:.1f} MB")
+
+
+def print_comparison(report, baseline):
+    """p95 latency and throughput deltas against an earlier JSON report"""
+    print(f"\nvs {baseline['meta'].get('revision') or 'baseline'} ({baseline['meta'].get('timestamp')})")
+    for name, stage in report["stages"].items():
+        old = baseline.get("stages", {}).get(name)
+        if not old or "latency_ms" not in stage or "latency_ms" not in old:
+            continue
+        p95, old_p95 = stage["latency_ms"]["p95"], old["latency_ms"]["p95"]
+        change = (p95 - old_p95) / old_p95 * 100 if old_p95 else 0.0
+        print(f"{name:<16}p95 {old_p95:>8.2f} -> {p95:>8.2f} ms ({change:+.1f}%)")
+    old_rows = {row["workers"]: row for row in baseline.get("concurrency", [])}
+    for row in report["concurrency"]:
+        old = old_rows.get(row["workers"])
+        if old:
+            print(f"{row['workers']} workers    fps/core {old['fps_per_core']:>8.1f} -> {row['fps_per_core']:>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AI monitoring pipeline benchmark")
+    parser.add_argument("--frames-dir", help="directory of recorded .jpg frames")
+    parser.add_argument("--audio-dir", help="directory of recorded 16-bit mono .pcm/.raw/.wav audio")
+    parser.add_argument("--synthetic", type=int, default=0,
+                        help="add N synthetic frames / chunks (default: 16 when nothing is recorded)")
+    parser.add_argument("--iterations", type=int, default=200, help="calls per single-process stage")
+    parser.add_argument("--concurrency", default="1,2,4", help="worker process counts, '' to skip")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per concurrency level")
+    parser.add_argument("--output", help="write the JSON report to this file")
+    parser.add_argument("--json", action="store_true", help="print the JSON report instead of tables")
+    parser.add_argument("--compare", help="earlier JSON report to diff against")
+    args = parser.parse_args()
+
+    frames, audio = build_inputs(args)
+    levels = [int(n) for n in args.concurrency.split(",") if n.strip()]
+    levels = sorted({min(n, os.cpu_count() or 1) for n in levels if n > 0})
+
+    from services.ai_monitoring import ai_monitor, DetectionConfig
+
+    started = time.perf_counter()
+    load_start = time.perf_counter()
+    ai_monitor.load()
+    load_time = time.perf_counter() - load_start
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "config": {
+                "phone_backend": DetectionConfig.PHONE_BACKEND,
+                "frame_target_width": DetectionConfig.FRAME_TARGET_WIDTH,
+                "pose_every_n_frames": DetectionConfig.POSE_EVERY_N_FRAMES,
+                "phone_every_n_frames": DetectionConfig.PHONE_EVERY_N_FRAMES,
+                "motion_gate_threshold": DetectionConfig.MOTION_GATE_THRESHOLD,
+                "audio_frame_ms": DetectionConfig.AUDIO_FRAME_MS,
+            },
+            "models": ai_monitor.status(),
+        },
+        "inputs": {
+            "frames": len(frames),
+            "audio_chunks": len(audio),
+            "frames_dir": args.frames_dir,
+            "audio_dir": args.audio_dir,
+        },
+        "load_s": round(load_time, 3),
+        "stages": run_stages(ai_monitor, frames, audio, args.iterations),
+        "concurrency": run_concurrency(frames, levels, args.duration) if levels else [],
+    }
+    report["memory"] = {
+        "rss_mb": round(rss_mb(), 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "peak_rss_mb_workers": round(peak_rss_mb(resource.RUSAGE_CHILDREN), 1),
+    }
+    report["elapsed_s"] = round(time.perf_counter() - started, 1)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Query plan check for the API routes
+
+Builds a scratch SQLite database (tables, migrations, a seeded cohort,
+ANALYZE), drives every database-backed route through the app, plus the
+WebSocket submission lookup and the event sink flush, and records each SQL
+statement they issue. Every statement is then run through EXPLAIN QUERY PLAN.
+The check fails (exit code 1) if one scans a whole large table without an
+index, unless the scan is on ALLOWED_SCANS.
+
+Run from backend/ (never touches DATABASE_URL):
+    python check_query_plans.py
+    python check_query_plans.py --students 5000 --verbose
+"""
+
+import argparse
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+
+# ===================== CONFIG =====================
+# Tables that grow with every exam taken; exams only grow with teacher activity
+LARGE_TABLES = ("users", "submissions", "cheating_events", "system_logs")
+
+# (route, table) -> why a full scan is expected there
+ALLOWED_SCANS = {
+    ("dashboard_stats.reconcile", "users"): "periodic full count, by design",
+    ("dashboard_stats.reconcile", "submissions"): "periodic full count, by design",
+    ("GET /api/admin/dashboard-stats", "users"): "first read reconciles; later reads are in memory",
+    ("GET /api/admin/dashboard-stats", "submissions"): "first read reconciles; later reads are in memory",
+    ("GET /api/admin/dashboard-stats", "system_logs"): "newest logs off the timestamp index, stops at the LIMIT",
+    ("GET /api/admin/users", "users"): "whole list for the admin UI, or a keyset page in id order",
+}
+
+SCAN = re.compile(r"^SCAN (\w+)(?: USING (?:COVERING )?INDEX (\w+))?")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=2000)
+    parser.add_argument("--teachers", type=int, default=20)
+    parser.add_argument("--exams", type=int, default=100)
+    parser.add_argument("--submissions-per-student", type=int, default=3)
+    parser.add_argument("--verbose", action="store_true", help="print every statement with its plan")
+    return parser.parse_args()
+
+
+# The app binds its engine at import time: point it at the scratch database first
+SCRATCH_DIR = tempfile.mkdtemp(prefix="pv-plans-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(SCRATCH_DIR, 'plans.db')}"
+os.environ["EVIDENCE_DIR"] = os.path.join(SCRATCH_DIR, "evidence")
+
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event, text
+
+from database.database import Base, SessionLocal, engine
+from database.migrations import run_migrations
+from database.models import CheatingEvent, Exam, Submission, SystemLog, User
+from services.auth_service import create_access_token, get_password_hash
+from services.dashboard_stats import dashboard_stats
+from services.event_sink import event_sink
+from api.routes.websocket import ConnectionContext
+import main
+
+
+# ===================== SEED =====================
+def seed(students, teachers, exams, per_student):
+    """Bulk-insert a cohort; returns ids the routes are driven with"""
+    now = datetime.utcnow()
+    db = SessionLocal()
+    try:
+        users = [{"email": "admin@plans.test", "name": "Admin", "role": "admin",
+                  "hashed_password": "x", "status": "active"}]
+        users += [{"email": f"teacher{i}@plans.test", "name": f"Teacher {i}", "role": "teacher",
+                   "hashed_password": "x", "status": "active"} for i in range(teachers)]
+        users += [{"email": f"student{i}@plans.test", "name": f"Student {i}", "role": "student",
+                   "hashed_password": "x", "status": "active"} for i in range(students)]
+        users[-1]["hashed_password"] = get_password_hash("student123")  # the one that logs in
+        db.bulk_insert_mappings(User, users)
+        db.commit()
+
+        admin_id = 1
+        teacher_ids = list(range(2, teachers + 2))
+        student_ids = list(range(teachers + 2, teachers + students + 2))
+        question = {"question_text": "2 + 2?", "type": "mcq", "options": ["3", "4"], "correct_answer": 1, "marks": 1}
+        db.bulk_insert_mappings(Exam, [{
+            "exam_code": f"PLAN{i:04d}", "title": f"Exam {i}", "duration": 60, "questions": [question],
+            "teacher_id": teacher_ids[i % teachers], "is_active": True, "access_type": "link",
+            "allowed_students": [],
+        } for i in range(exams)])
+        db.commit()
+
+        submissions, n = [], 0
+        for student_id in student_ids:
+            for k in range(per_student):
+                n += 1
+                cheating = 1 + n % 4 if n % 20 == 0 else 0  # ~5% have warnings
+                submissions.append({
+                    "exam_id": 1 + (student_id * 7 + k) % exams, "student_id": student_id, "answers": [],
+                    "cheating_count": cheating, "warnings": [],
+                    "started_at": now - timedelta(hours=n % 500),
+                    "submitted_at": now - timedelta(hours=n % 500) + timedelta(minutes=40),
+                    "status": "completed", "auto_submitted": cheating >= 3,
+                })
+        db.bulk_insert_mappings(Submission, submissions)
+        db.commit()
+
+        events = [{
+            "submission_id": i + 1, "event_type": "looking_away", "severity": "low", "confidence": 0.8,
+            "timestamp": now,
+        } for i, row in enumerate(submissions) for _ in range(row["cheating_count"] * 3)]
+        db.bulk_insert_mappings(CheatingEvent, events)
+        db.bulk_insert_mappings(SystemLog, [{
+            "user_id": admin_id, "action": "delete_user", "details": {}, "timestamp": now - timedelta(minutes=i)
+        } for i in range(students // 2)])
+        db.commit()
+    finally:
+        db.close()
+
+    with engine.begin() as connection:
+        connection.execute(text("ANALYZE"))
+    return {"admin": admin_id, "teacher": teacher_ids[0], "student": student_ids[-1],
+            "other_student": student_ids[0], "exam": 1, "exam_code": "PLAN0000"}
+
+
+# ===================== CAPTURE =====================
+class StatementRecorder:
+    """Distinct SELECT / UPDATE / DELETE statements, with the route that issued them"""
+
+    def __init__(self):
+        self.route = None
+        self.statements = {}  # (route, sql) -> parameters
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        if self.route is None or executemany:
+            return
+        if statement.lstrip().split(None, 1)[0].upper() in ("SELECT", "UPDATE", "DELETE"):
+            self.statements.setdefault((self.route, statement), parameters)
+
+
+def drive_routes(recorder, ids):
+    """Call every DB-backed route once (some twice: filters / second page)"""
+    def token(user_id, role, email):
+        return {"Authorization": f"Bearer {create_access_token({'sub': email, 'user_id': user_id, 'role': role})}"}
+
+    admin = token(ids["admin"], "admin", "admin@plans.test")
+    teacher = token(ids["teacher"], "teacher", "teacher0@plans.test")
+    db = SessionLocal()
+    email = db.query(User.email).filter(User.id == ids["student"]).scalar()
+    db.close()
+    student = token(ids["student"], "student", email)
+    exam_body = {"title": "Plans", "duration": 30, "questions": [
+        {"question_text": "1 + 1?", "type": "mcq", "options": ["1", "2"], "correct_answer": 1}
+    ]}
+
+    client = TestClient(main.app, raise_server_exceptions=False)  # no lifespan: no models / workers
+    calls = [
+        ("POST /api/auth/login", "post", "/api/auth/login", None,
+         {"data": {"username": email, "password": "student123"}}),
+        ("POST /api/auth/register", "post", "/api/auth/register", None,
+         {"json": {"email": "new@plans.test", "password": "pw123456", "name": "New", "role": "student"}}),
+        ("GET /api/auth/me", "get", "/api/auth/me", student, {}),
+        ("POST /api/exams/create", "post", "/api/exams/create", teacher, {"json": exam_body}),
+        ("GET /api/exams/my-exams", "get", "/api/exams/my-exams", teacher, {}),
+        ("GET /api/exams/{exam_code}", "get", f"/api/exams/{ids['exam_code']}", student, {}),
+        ("POST /api/exams/{exam_code}/start", "post", f"/api/exams/{ids['exam_code']}/start", student, {}),
+        ("POST /api/exams/{exam_code}/start (resume)", "post", f"/api/exams/{ids['exam_code']}/start", student, {}),
+        ("GET /api/exams/student/active", "get", "/api/exams/student/active", student, {}),
+        ("GET /api/exams/student/submissions", "get", "/api/exams/student/submissions", student, {}),
+        ("GET /api/admin/dashboard-stats", "get", "/api/admin/dashboard-stats", admin, {}),
+        ("GET /api/admin/users", "get", "/api/admin/users", admin, {"params": {"role": "student"}}),
+        ("GET /api/admin/users?search", "get", "/api/admin/users", admin, {"params": {"search": "student1"}}),
+        ("GET /api/admin/exams", "get", "/api/admin/exams", admin, {}),
+        ("GET /api/admin/exams?teacher_id", "get", "/api/admin/exams", admin,
+         {"params": {"teacher_id": ids["teacher"]}}),
+        ("GET /api/admin/cheating-cases", "get", "/api/admin/cheating-cases", admin, {}),
+        ("GET /api/admin/cheating-cases?exam_id", "get", "/api/admin/cheating-cases", admin,
+         {"params": {"exam_id": ids["exam"], "sort": "cheating_count"}}),
+        ("GET /api/admin/events/export?submission_id", "get", "/api/admin/events/export", admin,
+         {"params": {"submission_id": 20}}),
+        ("GET /api/admin/cheating-cases/export", "get", "/api/admin/cheating-cases/export", admin, {}),
+        ("GET /api/admin/events/{id}/media/{kind}", "get", "/api/admin/events/1/media/frame", admin, {}),
+        ("GET /api/admin/reports/system-usage", "get", "/api/admin/reports/system-usage", admin, {}),
+    ]
+    submission_id = None
+    for label, method, path, headers, kwargs in calls:
+        recorder.route = label
+        response = getattr(client, method)(path, headers=headers, **kwargs)
+        if response.status_code >= 500:
+            print(f"⚠️ {label}: HTTP {response.status_code}")
+        if label.startswith("POST /api/exams/{exam_code}/start") and response.status_code == 200:
+            submission_id = response.json()["submission_id"]
+
+    # Monitoring hot path: submission lookup at connect, event sink flush
+    recorder.route = "WS resolve_submission"
+    ConnectionContext(str(ids["student"]), str(ids["exam"])).resolve_submission()
+    recorder.route = "event_sink.flush"
+    event_sink._write(
+        [{"submission_id": submission_id, "event_type": "tab_switch", "severity": "medium",
+          "confidence": 1.0, "timestamp": datetime.utcnow()}],
+        {submission_id: {"warnings": [{"type": "tab_switch"}], "cheating_count": 1}},
+    )
+    recorder.route = "dashboard_stats.reconcile"
+    dashboard_stats.reconcile()
+
+    # Cursor pages, then the destructive routes last
+    recorder.route = "GET /api/admin/users"
+    first = client.get("/api/admin/users", headers=admin, params={"role": "student", "limit": 50})
+    client.get("/api/admin/users", headers=admin,
+               params={"role": "student", "limit": 50, "cursor": first.headers.get("X-Next-Cursor")})
+    recorder.route = "GET /api/admin/cheating-cases"
+    first = client.get("/api/admin/cheating-cases", headers=admin, params={"limit": 20})
+    client.get("/api/admin/cheating-cases", headers=admin,
+               params={"limit": 20, "cursor": first.headers.get("X-Next-Cursor")})
+    recorder.route = "POST /api/exams/submit/{submission_id}"
+    client.post(f"/api/exams/submit/{submission_id}", headers=student,
+                json={"answers": [{"question_index": 0, "answer": 1}]})
+    for label, path, headers in (
+        ("DELETE /api/exams/{exam_id}", f"/api/exams/{ids['exam'] + 1}", admin),
+        ("DELETE /api/admin/exam/{exam_id}", f"/api/admin/exam/{ids['exam'] + 2}", admin),
+        ("DELETE /api/admin/user/{user_id}", f"/api/admin/user/{ids['other_student']}", admin),
+    ):
+        recorder.route = label
+        response = client.delete(path, headers=headers)
+        if response.status_code >= 500:
+            print(f"⚠️ {label}: HTTP {response.status_code}")
+    recorder.route = None
+
+
+# ===================== EXPLAIN =====================
+def full_scans(plan):
+    """Large tables a plan reads in full: plain SCAN, or SCAN of a non-partial index"""
+    partial = {
+        index.name for model in (User, Exam, Submission, CheatingEvent, SystemLog)
+        for index in model.__table__.indexes
+        if index.dialect_options["sqlite"].get("where") is not None
+    }
+    scanned = []
+    for detail in plan:
+        match = SCAN.match(detail)
+        if not match:
+            continue
+        table = re.sub(r"_\d+$", "", match.group(1))  # ORM aliases: users_1
+        if table in LARGE_TABLES and match.group(2) not in partial:
+            scanned.append(table)
+    return scanned
+
+
+def explain(statements, verbose):
+    raw = engine.raw_connection()
+    failures, allowed = [], []
+    try:
+        cursor = raw.cursor()
+        for (route, sql), parameters in sorted(statements.items()):
+            cursor.execute("EXPLAIN QUERY PLAN " + sql, parameters)
+            plan = [row[-1] for row in cursor.fetchall()]
+            scans = full_scans(plan)
+            if verbose:
+                print(f"\n{route}\n  {' '.join(sql.split())[:300]}")
+                for detail in plan:
+                    print(f"    {detail}")
+            for table in scans:
+                reason = ALLOWED_SCANS.get((route, table))
+                (allowed if reason else failures).append((route, table, reason, sql, plan))
+    finally:
+        raw.close()
+    return failures, allowed
+
+
+def main_check(args):
+    started = time.perf_counter()
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+    ids = seed(args.students, args.teachers, args.exams, args.submissions_per_student)
+    print(f"🌱 Seeded {args.students} students, {args.exams} exams, "
+          f"{args.students * args.submissions_per_student} submissions in {time.perf_counter() - started:.1f}s")
+
+    recorder = StatementRecorder()
+    event.listen(engine, "before_cursor_execute", recorder)
+    drive_routes(recorder, ids)
+    event.remove(engine, "before_cursor_execute", recorder)
+
+    routes = {route for route, _ in recorder.statements}
+    print(f"🔎 {len(recorder.statements)} statements from {len(routes)} routes")
+    failures, allowed = explain(recorder.statements, args.verbose)
+
+    for route, table, reason, _, _ in allowed:
+        print(f"  ➖ {route}: full scan of {table} (allowed: {reason})")
+    for route, table, _, sql, plan in failures:
+        print(f"  ❌ {route}: full scan of {table}")
+        print(f"     {' '.join(sql.split())[:300]}")
+        print(f"     plan: {' | '.join(plan)}")
+    if failures:
+        print(f"❌ {len(failures)} full scan(s) of large tables")
+        return 1
+    print("✅ No unexpected full scans of large tables")
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        code = main_check(parse_args())
+    finally:
+        engine.dispose()
+        shutil.rmtree(SCRATCH_DIR, ignore_errors=True)
+    sys.exit(code)
@@ -0,0 +1,95 @@
+"""
+Schema migrations for existing databases
+
+create_all() only creates missing tables; changes to tables that already
+exist are applied here, once each and in order, at startup. The applied
+version is kept in the schema_version table. Every step checks the live
+schema first, so it is a no-op on a database create_all() just built.
+"""
+
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateIndex
+
+from database.models import CheatingEvent, Exam, Submission, SystemLog, User
+
+
+def _add_columns(connection, table, columns):
+    existing = {column["name"] for column in inspect(connection).get_columns(table)}
+    for name, ddl in columns:
+        if name not in existing:
+            connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}"))
+
+
+def add_evidence_keys(connection):
+    """Blob store keys for evidence frames / audio (see services/blob_store.py)"""
+    _add_columns(connection, "cheating_events", (
+        ("frame_key", "VARCHAR(64)"),
+        ("audio_key", "VARCHAR(64)"),
+    ))
+
+
+# Indexes for the hot query predicates, declared on the models (so create_all
+# builds them on new databases) and created here on existing ones
+QUERY_INDEXES = (
+    "ix_submissions_student_exam_status",
+    "ix_submissions_exam_id",
+    "ix_submissions_cheating_count",  # partial: cheating_count > 0
+    "ix_cheating_events_submission_id",
+    "ix_exams_teacher_id",
+    "ix_system_logs_timestamp",
+)
+
+
+def _create_indexes(connection, names):
+    """Create the named indexes declared on the models, where missing"""
+    for model in (User, Exam, Submission, CheatingEvent, SystemLog):
+        for index in model.__table__.indexes:
+            if index.name in names:
+                # IF NOT EXISTS: checkfirst does not see expression indexes on SQLite
+                connection.execute(CreateIndex(index, if_not_exists=True))
+
+
+def add_query_indexes(connection):
+    """Composite / partial indexes for the route queries (see check_query_plans.py)"""
+    _create_indexes(connection, QUERY_INDEXES)
+
+
+# Admin user search (prefix ranges on lower(...)) and the system usage report
+SEARCH_REPORT_INDEXES = (
+    "ix_users_name_lower",  # expression: lower(name)
+    "ix_users_email_lower",  # expression: lower(email)
+    "ix_users_created_at",
+    "ix_submissions_started_at",
+)
+
+
+def add_search_report_indexes(connection):
+    """Indexes that keep user search and the usage report off full table scans"""
+    _create_indexes(connection, SEARCH_REPORT_INDEXES)
+
+
+# (version, step) in the order they were introduced; never renumber
+MIGRATIONS = [
+    (1, add_evidence_keys),
+    (2, add_query_indexes),
+    (3, add_search_report_indexes),
+]
+
+
+def current_version(connection):
+    connection.execute(text("CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL)"))
+    return connection.execute(text("SELECT MAX(version) FROM schema_version")).scalar() or 0
+
+
+def run_migrations(engine):
+    """Apply pending migrations; returns the versions applied"""
+    applied = []
+    with engine.begin() as connection:
+        version = current_version(connection)
+        for number, step in MIGRATIONS:
+            if number <= version:
+                continue
+            step(connection)
+            connection.execute(text("INSERT INTO schema_version (version) VALUES (:v)"), {"v": number})
+            applied.append(number)
+    return applied
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Float, Text, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Float, Text, ForeignKey, JSON, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database.database import Base
@@ -18,6 +18,14 @@ class User(Base):
     # Relationships
     exams_created = relationship("Exam", back_populates="teacher")
     submissions = relationship("Submission", back_populates="student")
+    
+    __table_args__ = (
+        # admin user search: case-insensitive prefix ranges on lower(name) / lower(email)
+        Index("ix_users_name_lower", func.lower(name)),
+        Index("ix_users_email_lower", func.lower(email)),
+        # system usage report: registrations in a date range
+        Index("ix_users_created_at", "created_at"),
+    )
 
 class Exam(Base):
     __tablename__ = "exams"
@@ -28,7 +36,7 @@ class Exam(Base):
     description = Column(Text, nullable=True)
     duration = Column(Integer, nullable=False)  # in minutes
     questions = Column(JSON, nullable=False)  # Store questions as JSON
-    teacher_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    teacher_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     is_active = Column(Boolean, default=True)
     access_type = Column(String, default="link")  # link, specific
     allowed_students = Column(JSON, default=[])  # List of student IDs if access_type is specific
@@ -42,7 +50,7 @@ class Submission(Base):
     __tablename__ = "submissions"
     
     id = Column(Integer, primary_key=True, index=True)
-    exam_id = Column(Integer, ForeignKey("exams.id"), nullable=False)
+    exam_id = Column(Integer, ForeignKey("exams.id"), nullable=False, index=True)
     student_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     answers = Column(JSON, nullable=False)  # Store answers as JSON
     score = Column(Float, nullable=True)
@@ -59,6 +67,19 @@ class Submission(Base):
     # Relationships
     exam = relationship("Exam", back_populates="submissions")
     student = relationship("User", back_populates="submissions")
+    
+    __table_args__ = (
+        # start_exam / WebSocket resolve_submission; student_id alone uses the prefix
+        Index("ix_submissions_student_exam_status", "student_id", "exam_id", "status"),
+        # cheating cases: only the few submissions with warnings are indexed;
+        # queries must repeat "cheating_count > 0" for the planner to use it
+        Index(
+            "ix_submissions_cheating_count", "cheating_count",
+            sqlite_where=cheating_count > 0, postgresql_where=cheating_count > 0
+        ),
+        # system usage report: submissions started in a date range
+        Index("ix_submissions_started_at", "started_at"),
+    )
 
 class CheatingEvent(Base):
     __tablename__ = "cheating_events"
@@ -68,12 +89,19 @@ class CheatingEvent(Base):
     event_type = Column(String, nullable=False)  # face_not_visible, multiple_faces, etc.
     severity = Column(String, nullable=False)  # low, medium, high
     confidence = Column(Float, nullable=False)
-    frame_data = Column(Text, nullable=True)  # Base64 encoded frame
-    audio_data = Column(Text, nullable=True)  # Base64 encoded audio snippet
+    frame_key = Column(String(64), nullable=True)  # Evidence frame in the blob store (JPEG)
+    audio_key = Column(String(64), nullable=True)  # Evidence audio in the blob store (PCM)
+    frame_data = Column(Text, nullable=True)  # Legacy base64 frame, moved out by migrate_evidence.py
+    audio_data = Column(Text, nullable=True)  # Legacy base64 audio, moved out by migrate_evidence.py
     timestamp = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationship
     submission = relationship("Submission")
+    
+    __table_args__ = (
+        # events of a submission, in id order (cheating cases, exports, deletes)
+        Index("ix_cheating_events_submission_id", "submission_id", "id"),
+    )
 
 class SystemLog(Base):
     __tablename__ = "system_logs"
@@ -84,7 +112,7 @@ class SystemLog(Base):
     details = Column(JSON, nullable=True)
     ip_address = Column(String, nullable=True)
     user_agent = Column(String, nullable=True)
-    timestamp = Column(DateTime(timezone=True), server_default=func.now())
+    timestamp = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     
     # Relationship
     user = relationship("User")
\ No newline at end of file
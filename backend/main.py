@@ -1,36 +1,71 @@
+import time
+BOOT_STARTED = time.perf_counter()
+
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Request
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+import asyncio
 import os
 from dotenv import load_dotenv
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from starlette.middleware.base import BaseHTTPMiddleware
 from fastapi.staticfiles import StaticFiles
 
 from database.database import engine, Base
+from database.migrations import run_migrations
 from api.routes.auth import router as auth_router
 from api.routes.exams import router as exams_router
 from api.routes.monitoring import router as monitoring_router
 from api.routes.admin import router as admin_router
 from api.routes.websocket import manager
+from services.ai_monitoring import ai_monitor
+from services.inference_pool import inference_pool, monitoring_ready
+from services.event_sink import event_sink
+from services.metrics import metrics
+from services.dashboard_stats import dashboard_stats
 
 # Load environment variables
 load_dotenv()
 
+# Cold-start phases in seconds (model loading is reported by the pool / ai_monitor)
+startup_times = {"imports": round(time.perf_counter() - BOOT_STARTED, 3)}
+
 # ===================== LIFESPAN =====================
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     print("🚀 Starting Exam System Backend...")
     print("📊 Creating database tables...")
+    phase = time.perf_counter()
     Base.metadata.create_all(bind=engine)
+    applied = run_migrations(engine)
+    startup_times["database"] = round(time.perf_counter() - phase, 3)
     print("✅ Database tables created successfully!")
+    if applied:
+        print(f"🧱 Applied schema migrations: {', '.join(map(str, applied))}")
+
+    # Models load in the background; auth / exam routes serve meanwhile and
+    # monitoring answers "warming up" until monitoring_ready()
+    print("🧠 Starting inference worker pool...")
+    phase = time.perf_counter()
+    ai_monitor.load_in_background(("audio",))  # audio runs in this process
+    inference_pool.start()  # vision models load inside the workers
+    event_sink.start()
+    dashboard_stats.start()  # admin counters: ORM deltas + periodic reconcile
+    await manager.start()
+    startup_times["services"] = round(time.perf_counter() - phase, 3)
+    startup_times["serving"] = round(time.perf_counter() - BOOT_STARTED, 3)
 
+    print(f"⏱️ Cold start: {', '.join(f'{k} {v:.2f}s' for k, v in startup_times.items())}")
     print("\n" + "=" * 60)
     print("🌐 SERVER IS READY!")
     print("=" * 60)
 
     yield
     print("\n🛑 Shutting down backend...")
+    await manager.stop()
+    await event_sink.stop()
+    await dashboard_stats.stop()
+    inference_pool.shutdown()
 
 # ===================== APP =====================
 app = FastAPI(
@@ -47,6 +82,7 @@ app.add_middleware(
     allow_credentials=False,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # admin listing pagination
 )
 
 # ===================== GLOBAL ERROR HANDLER =====================
@@ -83,20 +119,60 @@ app.include_router(admin_router, prefix="/api/admin", tags=["Admin"])
 # ===================== WEBSOCKET =====================
 @app.websocket("/ws/monitoring/{student_id}/{exam_id}")
 async def websocket_endpoint(websocket: WebSocket, student_id: str, exam_id: str):
-    await manager.connect(websocket, student_id, exam_id)
+    binary = await manager.connect(websocket, student_id, exam_id)
+    # Receiving never waits on analysis: messages land in the mailbox and
+    # the analysis task always picks up the newest frame.
+    analysis = asyncio.create_task(manager.run_mailbox(student_id, exam_id))
     try:
         while True:
-            data = await websocket.receive_json()
-            await manager.process_data(student_id, exam_id, data)
+            try:
+                data = await manager.receive(websocket, binary)
+            except ValueError:
+                continue  # malformed message: skip it, keep the stream open
+            manager.enqueue(student_id, data)
     except WebSocketDisconnect:
-        manager.disconnect(student_id, exam_id)
+        pass
     except Exception:
-        manager.disconnect(student_id, exam_id)
+        pass
+    finally:
+        analysis.cancel()
+        manager.disconnect(student_id, websocket)
+
+@app.websocket("/ws/proctor/{exam_id}")
+async def proctor_websocket_endpoint(websocket: WebSocket, exam_id: str, token: str = ""):
+    # Live violation / heartbeat feed for teachers (own exams) and admins
+    subscriber = await manager.connect_proctor(websocket, exam_id, token)
+    if subscriber is None:
+        return
+    try:
+        while True:
+            await websocket.receive_text()  # proctors only listen; ignore input
+    except WebSocketDisconnect:
+        pass
+    except Exception:
+        pass
+    finally:
+        manager.disconnect_proctor(subscriber)
 
 # ===================== HEALTH =====================
 @app.get("/health")
 async def health():
-    return {"status": "healthy", "database": "connected"}
+    return {
+        "status": "healthy",
+        "database": "connected",
+        "monitoring": "ready" if monitoring_ready() else "warming_up",
+        "startup_s": startup_times,
+        "models": {
+            "server": ai_monitor.status(),
+            "workers": inference_pool.worker_load_times,
+            "warmup_s": inference_pool.warmup_time,
+        },
+    }
+
+# ===================== METRICS =====================
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
 
 # ===================== FRONTEND (LAST!) =====================
 app.mount(
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Move base64 evidence out of cheating_events into the blob store
+
+For every event that still has frame_data / audio_data: decode it, store the
+raw bytes (deduplicated by content hash), set frame_key / audio_key and clear
+the base64 column. Works in id order, one committed batch at a time, so it
+can be stopped and re-run at any point; the server can keep running.
+
+Run from backend/ with the server's DATABASE_URL and EVIDENCE_DIR:
+    python migrate_evidence.py --batch-size 500
+    python migrate_evidence.py --dry-run
+    python migrate_evidence.py --vacuum   # SQLite: give the freed pages back to the OS
+"""
+
+import argparse
+import base64
+import binascii
+import time
+
+from sqlalchemy import or_, text
+
+from database.database import Base, SessionLocal, engine
+from database.migrations import run_migrations
+from database.models import CheatingEvent
+from services.blob_store import blob_store
+
+
+def decode_evidence(value):
+    """Raw bytes of a base64 column value (plain or data URL); None if not base64"""
+    try:
+        return base64.b64decode(value.split(",")[-1], validate=True)
+    except (binascii.Error, ValueError):
+        return None
+
+
+def migrate_batch(db, after_id, batch_size, dry_run):
+    """Migrate events with id > after_id; returns (last id, counts) or (None, counts) when done"""
+    counts = {"events": 0, "blobs": 0, "bytes": 0, "skipped": 0}
+    rows = db.query(
+        CheatingEvent.id, CheatingEvent.frame_data, CheatingEvent.audio_data
+    ).filter(
+        CheatingEvent.id > after_id,
+        or_(CheatingEvent.frame_data.isnot(None), CheatingEvent.audio_data.isnot(None))
+    ).order_by(CheatingEvent.id).limit(batch_size).all()
+    if not rows:
+        return None, counts
+
+    updates = []
+    for event_id, frame_data, audio_data in rows:
+        update = {"id": event_id}
+        for kind, value in (("frame", frame_data), ("audio", audio_data)):
+            if value is None:
+                continue
+            data = decode_evidence(value)
+            if data is None:
+                counts["skipped"] += 1  # left in place for a look by hand
+                continue
+            counts["blobs"] += 1
+            counts["bytes"] += len(data)
+            if not dry_run:
+                update[f"{kind}_key"] = blob_store.put(data)
+                update[f"{kind}_data"] = None
+        counts["events"] += 1
+        if len(update) > 1:
+            updates.append(update)
+
+    if updates:
+        db.bulk_update_mappings(CheatingEvent, updates)
+        db.commit()
+    return rows[-1][0], counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--after-id", type=int, default=0, help="resume after this event id")
+    parser.add_argument("--dry-run", action="store_true", help="decode and count only; write nothing")
+    parser.add_argument("--vacuum", action="store_true", help="VACUUM the SQLite database afterwards")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)  # frame_key / audio_key columns
+
+    print(f"📦 Blob store: {blob_store.root}{' (dry run)' if args.dry_run else ''}")
+    totals = {"events": 0, "blobs": 0, "bytes": 0, "skipped": 0}
+    last_id = args.after_id
+    started = time.perf_counter()
+    while True:
+        db = SessionLocal()
+        try:
+            next_id, counts = migrate_batch(db, last_id, args.batch_size, args.dry_run)
+        finally:
+            db.close()
+        if next_id is None:
+            break
+        last_id = next_id
+        for name, value in counts.items():
+            totals[name] += value
+        print(f"  ✓ up to event {last_id}: {totals['events']} events, "
+              f"{totals['blobs']} blobs, {totals['bytes'] / 1e6:.1f} MB")
+
+    stats = blob_store.stats()
+    print(f"✅ {totals['events']} events, {totals['blobs']} blobs ({totals['bytes'] / 1e6:.1f} MB) "
+          f"in {time.perf_counter() - started:.1f}s")
+    print(f"   written {stats['written']}, deduplicated {stats['deduplicated']}, "
+          f"skipped (not base64) {totals['skipped']}")
+
+    if args.vacuum and not args.dry_run and engine.dialect.name == "sqlite":
+        print("🧹 VACUUM...")
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            connection.execute(text("VACUUM"))
+        print("✅ Done")
+
+
+if __name__ == "__main__":
+    main()
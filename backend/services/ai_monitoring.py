@@ -3,8 +3,9 @@ ProctorVision AI Monitoring System
 Stable backend-safe implementation
 
 NOTE:
+- Importing this module is cheap: models load on first use or via load()
 - MediaPipe is optional
-- YOLO is conditionally enabled
+- YOLO is conditionally enabled (PyTorch or ONNX Runtime, see PHONE_BACKEND)
 - Prevents PyTorch 2.6 crashes
 """
 
@@ -12,21 +13,26 @@ import cv2
 import numpy as np
 import base64
 from datetime import datetime
-from collections import deque
+from collections import OrderedDict
 import time
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
-# ===================== MEDIAPIPE (OPTIONAL) =====================
-FACE_DETECTION = None
-FACE_MESH = None
+from services.metrics import AUDIO_CHUNKS, FRAMES, STAGE_SECONDS, SUPPRESSED, VIOLATIONS
 
-try:
-    import mediapipe as mp
-    if hasattr(mp, "solutions"):
-        FACE_DETECTION = mp.solutions.face_detection
-        FACE_MESH = mp.solutions.face_mesh
-except Exception:
-    pass
+# ===================== MEDIAPIPE (OPTIONAL) =====================
+@lru_cache(maxsize=None)
+def _mediapipe_solutions():
+    """(face_detection, face_mesh) solution modules, or (None, None); imported on first use"""
+    try:
+        import mediapipe as mp
+        if hasattr(mp, "solutions"):
+            return mp.solutions.face_detection, mp.solutions.face_mesh
+    except Exception:
+        pass
+    return None, None
 
 
 # ===================== AUDIO =====================
@@ -45,11 +51,85 @@ class DetectionConfig:
     PHONE_CONFIDENCE_THRESHOLD = 0.75
     PHONE_MAX_OBJECT_SIZE = 0.15
 
+    # Phone model backend: "torch" (ultralytics), "onnx" (onnxruntime, no PyTorch) or "none"
+    PHONE_BACKEND = os.getenv("PHONE_BACKEND", "torch")
+    PHONE_TORCH_MODEL = os.getenv("PHONE_TORCH_MODEL", "yolov8n.pt")
+    PHONE_ONNX_MODEL = os.getenv("PHONE_ONNX_MODEL", "yolov8n.onnx")
+    PHONE_INTRA_OP_THREADS = int(os.getenv("PHONE_INTRA_OP_THREADS", "1"))  # per inference worker
+    PHONE_ONNX_PROVIDERS = os.getenv("PHONE_ONNX_PROVIDERS", "CPUExecutionProvider").split(",")
+
     AUDIO_CONFIDENCE_THRESHOLD = 0.65
 
+    # 16-bit mono PCM; webrtcvad accepts 8/16/32/48 kHz and 10/20/30 ms frames
+    AUDIO_SAMPLE_RATE = int(os.getenv("AUDIO_SAMPLE_RATE", "16000"))
+    AUDIO_FRAME_MS = int(os.getenv("AUDIO_FRAME_MS", "30"))
+    AUDIO_ENERGY_THRESHOLD = float(os.getenv("AUDIO_ENERGY_THRESHOLD", "300"))  # frame RMS, int16 units
+    AUDIO_WINDOW_MS = int(os.getenv("AUDIO_WINDOW_MS", "3000"))  # span of the sliding speech ratio
+
+    # Matches frontend/js/detection-config.js
+    SEVERITY = {
+        "multiple_faces": "high",
+        "phone_detected": "high",
+        "voice_detected": "medium",
+        "tab_switch": "medium",
+        "looking_away": "low",
+    }
+
+    # Adaptive scheduling: face count runs on every frame, the expensive
+    # models run every N frames unless the student is escalated.
+    POSE_EVERY_N_FRAMES = int(os.getenv("POSE_EVERY_N_FRAMES", "3"))
+    PHONE_EVERY_N_FRAMES = int(os.getenv("PHONE_EVERY_N_FRAMES", "5"))
+    ESCALATION_PERIOD = 10  # seconds of every-frame analysis after a suspicion signal
+    MOTION_SPIKE_THRESHOLD = 25.0  # mean abs diff of the 32x24 grayscale thumbnail
+
+    # Motion gate: frames that differ from the last analysed frame by less than
+    # the threshold reuse its results; 0 disables the gate
+    MOTION_GATE_THRESHOLD = float(os.getenv("MOTION_GATE_THRESHOLD", "4.0"))
+    MOTION_GATE_FULL_INTERVAL = float(os.getenv("MOTION_GATE_FULL_INTERVAL", "5"))  # seconds
+
+    # Frames are decoded no wider than needed (YOLO runs at 640, FaceDetection at 128)
+    FRAME_TARGET_WIDTH = int(os.getenv("FRAME_TARGET_WIDTH", "640"))
+
+    TAB_SWITCH_COOLDOWN = 5  # seconds between tab_switch violations for one session
+
+    # Temporal filter: a frame-level signal becomes a violation only after it
+    # held for MIN_CONSECUTIVE_FRAMES analysed frames, then not again for its
+    # cooldown (seconds). Yaw and confidences are exponentially smoothed; once
+    # looking away, the smoothed yaw must fall below HEAD_VIOLATION_THRESHOLD
+    # to clear.
+    SMOOTHING_ALPHA = float(os.getenv("VIOLATION_SMOOTHING_ALPHA", "0.5"))  # weight of the newest frame
+    MIN_CONSECUTIVE_FRAMES = {
+        "multiple_faces": FACE_MIN_CONSECUTIVE_FRAMES,
+        "looking_away": FACE_MIN_CONSECUTIVE_FRAMES,
+        "phone_detected": 2,
+    }
+    COOLDOWN_PERIOD = {
+        "multiple_faces": FACE_COOLDOWN_PERIOD,
+        "looking_away": FACE_COOLDOWN_PERIOD,
+        "phone_detected": FACE_COOLDOWN_PERIOD,
+        "voice_detected": 15,
+    }
+
+    # Per-session state (one context per submission)
+    MAX_SESSIONS = int(os.getenv("MONITOR_MAX_SESSIONS", "5000"))
+    SESSION_IDLE_TIMEOUT = float(os.getenv("MONITOR_SESSION_IDLE_TIMEOUT", "900"))
+
+
+def make_violation(kind, confidence=1.0):
+    """Violation dict with everything CheatingEvent needs (counted in VIOLATIONS)"""
+    VIOLATIONS.inc(type=kind)
+    return {
+        "type": kind,
+        "severity": DetectionConfig.SEVERITY.get(kind, "medium"),
+        "confidence": float(confidence),
+        "timestamp": datetime.now().isoformat()
+    }
+
 
 # ===================== TRACKER =====================
 class ViolationTracker:
+    __slots__ = ("last", "counts")
+
     def __init__(self):
         self.last = {}
         self.counts = {}
@@ -70,9 +150,10 @@ class ViolationTracker:
 # ===================== FACE =====================
 class FaceDetector:
     def __init__(self):
-        self.enabled = FACE_DETECTION is not None
+        face_detection, _ = _mediapipe_solutions()
+        self.enabled = face_detection is not None
         if self.enabled:
-            self.detector = FACE_DETECTION.FaceDetection(
+            self.detector = face_detection.FaceDetection(
                 model_selection=0,
                 min_detection_confidence=DetectionConfig.FACE_CONFIDENCE_THRESHOLD
             )
@@ -80,19 +161,30 @@ class FaceDetector:
     def detect(self, frame):
         if not self.enabled:
             return 0, 0.0
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        res = self.detector.process(rgb)
-        if res.detections:
-            return len(res.detections), max(d.score[0] for d in res.detections)
+        detections = self.detect_rgb(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        if detections:
+            return len(detections), max(d.score[0] for d in detections)
         return 0, 0.0
 
+    def detect_rgb(self, rgb):
+        """Raw MediaPipe detections for an already converted RGB frame"""
+        if not self.enabled:
+            return []
+        return self.detector.process(rgb).detections or []
+
 
 # ===================== HEAD =====================
 class HeadPoseEstimator:
+    ROI_MARGIN = 0.25  # fraction of the face box added on every side
+
     def __init__(self):
-        self.enabled = FACE_MESH is not None
+        _, face_mesh = _mediapipe_solutions()
+        self.enabled = face_mesh is not None
         if self.enabled:
-            self.mesh = FACE_MESH.FaceMesh(
+            # Frames from different students are interleaved on one model, so
+            # cross-frame tracking is meaningless: treat every crop as a still.
+            self.mesh = face_mesh.FaceMesh(
+                static_image_mode=True,
                 max_num_faces=1,
                 refine_landmarks=True,
                 min_detection_confidence=0.5,
@@ -102,93 +194,948 @@ class HeadPoseEstimator:
     def estimate(self, frame):
         if not self.enabled:
             return None
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        res = self.mesh.process(rgb)
+        return self.estimate_rgb(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+
+    def estimate_rgb(self, rgb, box=None):
+        """
+        Yaw for an RGB frame. With a MediaPipe relative bounding box, FaceMesh only
+        sees the (padded) face ROI and the landmarks are mapped back to frame space.
+        """
+        if not self.enabled:
+            return None
+
+        h, w = rgb.shape[:2]
+        x0, x1, y0, y1 = 0, w, 0, h
+        if box is not None:
+            mx, my = box.width * self.ROI_MARGIN, box.height * self.ROI_MARGIN
+            x0 = max(0, int((box.xmin - mx) * w))
+            x1 = min(w, int((box.xmin + box.width + mx) * w))
+            y0 = max(0, int((box.ymin - my) * h))
+            y1 = min(h, int((box.ymin + box.height + my) * h))
+            if x1 - x0 < 8 or y1 - y0 < 8:
+                x0, x1, y0, y1 = 0, w, 0, h
+
+        roi = rgb if (x1 - x0, y1 - y0) == (w, h) else np.ascontiguousarray(rgb[y0:y1, x0:x1])
+        res = self.mesh.process(roi)
         if not res.multi_face_landmarks:
             return None
         lm = res.multi_face_landmarks[0].landmark
         left, right, nose = lm[33], lm[263], lm[1]
-        return (nose.x - ((left.x + right.x) / 2)) * 180
+        # ROI-normalised x -> frame-normalised x is a pure scale of the offset
+        return (nose.x - ((left.x + right.x) / 2)) * 180 * (x1 - x0) / w
+
+
+# ===================== DECODE =====================
+_JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def _jpeg_size(buf):
+    """(width, height) from a JPEG's SOF header without decoding, or None"""
+    if len(buf) < 4 or buf[0] != 0xFF or buf[1] != 0xD8:
+        return None
+    i, n = 2, len(buf)
+    while i + 9 < n:
+        if buf[i] != 0xFF:
+            return None
+        marker = buf[i + 1]
+        if marker == 0xFF:  # fill byte
+            i += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD7:  # no length field
+            i += 2
+            continue
+        if marker in _JPEG_SOF_MARKERS:
+            return (buf[i + 7] << 8) | buf[i + 8], (buf[i + 5] << 8) | buf[i + 6]
+        i += 2 + ((buf[i + 2] << 8) | buf[i + 3])
+    return None
+
+
+class FrameDecoder:
+    """
+    Decodes JPEG frames straight to the smallest power-of-two reduction that
+    is still at least target_width wide (libjpeg DCT scaling, so most of the
+    full-size work is never done). Owns reusable RGB and thumbnail buffers;
+    one decoder per process, used by one thread.
+    """
+    REDUCED = ((8, cv2.IMREAD_REDUCED_COLOR_8), (4, cv2.IMREAD_REDUCED_COLOR_4), (2, cv2.IMREAD_REDUCED_COLOR_2))
+
+    def __init__(self, target_width=DetectionConfig.FRAME_TARGET_WIDTH):
+        self.target_width = target_width
+        self._rgb = None
+        self._small = np.empty((24, 32, 3), np.uint8)
+        self._gray = np.empty((24, 32), np.uint8)
+
+        self.frames = 0
+        self.reduced = 0
+
+    def decode_flag(self, buf):
+        size = _jpeg_size(buf) if self.target_width > 0 else None
+        if size is not None:
+            for factor, flag in self.REDUCED:
+                if size[0] // factor >= self.target_width:
+                    self.reduced += 1
+                    return flag
+        return cv2.IMREAD_COLOR
+
+    def decode(self, frame_data):
+        """
+        BGR frame from a base64 (data URL) string or raw JPEG bytes from the
+        binary WebSocket protocol (no copy before imdecode); None if unreadable.
+        """
+        try:
+            if isinstance(frame_data, str):
+                frame_data = base64.b64decode(frame_data.split(",")[-1])
+            flag = self.decode_flag(memoryview(frame_data))
+            frame = cv2.imdecode(np.frombuffer(frame_data, np.uint8), flag)
+        except Exception:
+            return None
+        if frame is not None:
+            self.frames += 1
+        return frame
+
+    def rgb(self, frame):
+        """RGB copy in a reused buffer, valid until the next call"""
+        if self._rgb is None or self._rgb.shape != frame.shape:
+            self._rgb = np.empty_like(frame)
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._rgb)
+
+    def thumb(self, frame):
+        """32x24 grayscale bytes for motion comparison"""
+        cv2.resize(frame, (32, 24), dst=self._small, interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(self._small, cv2.COLOR_BGR2GRAY, dst=self._gray).tobytes()
+
+    def stats(self):
+        return {"target_width": self.target_width, "frames": self.frames, "reduced": self.reduced}
+
+
+# ===================== FACE STAGE =====================
+class FaceAnalyzer:
+    """
+    Single face stage: one BGR->RGB conversion, one FaceDetection pass,
+    FaceMesh only on the ROI of the most confident face.
+    """
+    def __init__(self, face, pose):
+        self.face = face
+        self.pose = pose
+
+    def needs_rgb(self, with_pose=True):
+        return self.face.enabled or (with_pose and self.pose.enabled)
+
+    def analyze(self, frame, with_pose=True):
+        """Returns (face_count, best_confidence, yaw or None)"""
+        if not self.needs_rgb(with_pose):
+            return 0, 0.0, None
+        return self.analyze_rgb(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB), with_pose)
+
+    def analyze_rgb(self, rgb, with_pose=True, timings=None):
+        """
+        Same as analyze() for a frame the caller already converted.
+        Seconds spent in FaceDetection / FaceMesh go into `timings` if given.
+        """
+        with_pose = with_pose and self.pose.enabled
+        if not self.face.enabled and not with_pose:
+            return 0, 0.0, None
+        if not self.face.enabled:
+            start = time.perf_counter()
+            yaw = self.pose.estimate_rgb(rgb)
+            if timings is not None:
+                timings["pose"] = time.perf_counter() - start
+            return 0, 0.0, yaw
+
+        start = time.perf_counter()
+        detections = self.face.detect_rgb(rgb)
+        if timings is not None:
+            timings["face"] = time.perf_counter() - start
+        if not detections:
+            return 0, 0.0, None
+
+        best = max(detections, key=lambda d: d.score[0])
+        yaw = None
+        if with_pose:
+            start = time.perf_counter()
+            yaw = self.pose.estimate_rgb(rgb, best.location_data.relative_bounding_box)
+            if timings is not None:
+                timings["pose"] = time.perf_counter() - start
+        return len(detections), float(best.score[0]), yaw
 
 
 # ===================== PHONE (SAFE MODE) =====================
+COCO_PHONE_CLASS = 67
+
+
+class UltralyticsPhoneBackend:
+    """yolov8n.pt through ultralytics / PyTorch, NMS restricted to the phone class"""
+    name = "torch"
+
+    def __init__(self, weights=DetectionConfig.PHONE_TORCH_MODEL):
+        from ultralytics import YOLO
+        self.model = YOLO(weights)
+
+    def infer(self, frames):
+        results = self.model(frames, classes=[COCO_PHONE_CLASS], verbose=False)
+        return [self._parse(r, frame) for r, frame in zip(results, frames)]
+
+    def _parse(self, result, frame):
+        for box in result.boxes:
+            if int(box.cls[0]) == COCO_PHONE_CLASS:
+                conf = float(box.conf[0])
+                if conf >= DetectionConfig.PHONE_CONFIDENCE_THRESHOLD:
+                    x1, y1, x2, y2 = (float(v) for v in box.xyxy[0])
+                    area = (x2 - x1) * (y2 - y1)
+                    return True, conf, area / (frame.shape[0] * frame.shape[1])
+        return False, 0.0, 0.0
+
+
+class OnnxPhoneBackend:
+    """
+    YOLOv8 exported to ONNX (`yolo export model=yolov8n.pt format=onnx`) run
+    by onnxruntime without importing PyTorch. Only the phone class row of the
+    raw (N, 84, anchors) output is read, so no NMS is needed for "best phone
+    box". Batches are used when the model was exported with dynamic=True.
+    """
+    name = "onnx"
+
+    def __init__(
+        self,
+        model_path=DetectionConfig.PHONE_ONNX_MODEL,
+        intra_op_threads=DetectionConfig.PHONE_INTRA_OP_THREADS,
+        providers=DetectionConfig.PHONE_ONNX_PROVIDERS
+    ):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = intra_op_threads
+        options.inter_op_num_threads = 1
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        available = ort.get_available_providers()
+        self.session = ort.InferenceSession(
+            model_path, sess_options=options,
+            providers=[p for p in providers if p in available] or ["CPUExecutionProvider"]
+        )
+
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        batch, _, height, width = model_input.shape
+        self.size = height if isinstance(height, int) else 640
+        self.dynamic_batch = not isinstance(batch, int)
+        self._input = None
+
+    def _letterbox(self, frames):
+        """Frames -> (N, 3, size, size) float32 RGB in a reused buffer, plus scales"""
+        n = len(frames)
+        if self._input is None or self._input.shape[0] != n:
+            self._input = np.empty((n, 3, self.size, self.size), np.float32)
+        scales = []
+        canvas = np.full((self.size, self.size, 3), 114, np.uint8)
+        for i, frame in enumerate(frames):
+            h, w = frame.shape[:2]
+            scale = min(self.size / h, self.size / w)
+            nh, nw = int(round(h * scale)), int(round(w * scale))
+            canvas[:] = 114
+            canvas[:nh, :nw] = cv2.resize(frame, (nw, nh), interpolation=cv2.INTER_LINEAR)
+            # BGR -> RGB, HWC -> CHW, 0..1
+            np.multiply(canvas[:, :, ::-1].transpose(2, 0, 1), 1 / 255, out=self._input[i], casting="unsafe")
+            scales.append(scale)
+        return self._input, scales
+
+    def infer(self, frames):
+        if self.dynamic_batch:
+            groups = [frames]
+        else:
+            groups = [[frame] for frame in frames]
+
+        detections = []
+        for group in groups:
+            batch, scales = self._letterbox(group)
+            output = self.session.run(None, {self.input_name: batch})[0]
+            for row, scale, frame in zip(output, scales, group):
+                scores = row[4 + COCO_PHONE_CLASS]
+                best = int(scores.argmax())
+                conf = float(scores[best])
+                if conf < DetectionConfig.PHONE_CONFIDENCE_THRESHOLD:
+                    detections.append((False, 0.0, 0.0))
+                    continue
+                # box w/h in letterboxed pixels -> original frame pixels
+                bw, bh = float(row[2, best]) / scale, float(row[3, best]) / scale
+                detections.append((True, conf, bw * bh / (frame.shape[0] * frame.shape[1])))
+        return detections
+
+
+PHONE_BACKENDS = {
+    "torch": UltralyticsPhoneBackend,
+    "onnx": OnnxPhoneBackend,
+}
+
+
 class PhoneDetector:
-    def __init__(self):
+    def __init__(self, backend=DetectionConfig.PHONE_BACKEND):
         self.enabled = False
+        self.backend = None
+        self.load_time = 0.0
+        if backend == "none":
+            return
+        start = time.perf_counter()
         try:
-            from ultralytics import YOLO
-            self.model = YOLO("yolov8n.pt")
-            self.phone_class = 67
+            if backend not in PHONE_BACKENDS:
+                raise ValueError(f"unknown PHONE_BACKEND {backend!r}")
+            self.backend = PHONE_BACKENDS[backend]()
             self.enabled = True
         except Exception as e:
-            print("⚠️ Phone detection disabled (PyTorch/YOLO incompatibility)")
+            print(f"⚠️ Phone detection disabled ({backend} backend unavailable)")
             print(f"   Reason: {e}")
+        self.load_time = time.perf_counter() - start
 
     def detect(self, frame):
-        if not self.enabled:
-            return False, 0.0, 0.0
-
-        results = self.model(frame, verbose=False)
-        for r in results:
-            for box in r.boxes:
-                if int(box.cls[0]) == self.phone_class:
-                    conf = float(box.conf[0])
-                    if conf >= DetectionConfig.PHONE_CONFIDENCE_THRESHOLD:
-                        x1, y1, x2, y2 = box.xyxy[0]
-                        area = (x2 - x1) * (y2 - y1)
-                        return True, conf, area / (frame.shape[0] * frame.shape[1])
-        return False, 0.0, 0.0
+        return self.detect_batch([frame])[0]
+
+    def detect_batch(self, frames):
+        """One model call for many frames (possibly from different students)"""
+        if not self.enabled or not frames:
+            return [(False, 0.0, 0.0) for _ in frames]
+        return self.backend.infer(frames)
 
 
 # ===================== AUDIO =====================
+def _valid_frame_ms(frame_ms):
+    return frame_ms if frame_ms in (10, 20, 30) else 30
+
+
+AUDIO_WINDOW_FRAMES = max(1, DetectionConfig.AUDIO_WINDOW_MS // _valid_frame_ms(DetectionConfig.AUDIO_FRAME_MS))
+
+
 class AudioAnalyzer:
-    def __init__(self):
+    """
+    Shared VAD over whole chunks. Each chunk is cut into fixed 10/20/30 ms
+    frames, silent frames are dropped by one vectorised RMS pass, and only the
+    frames that pass the energy gate reach webrtcvad. The speech history
+    lives in each session's MonitoringContext.
+    """
+    def __init__(
+        self,
+        sample_rate=DetectionConfig.AUDIO_SAMPLE_RATE,
+        frame_ms=DetectionConfig.AUDIO_FRAME_MS,
+        energy_threshold=DetectionConfig.AUDIO_ENERGY_THRESHOLD
+    ):
         self.vad = webrtcvad.Vad(2)
-        self.buf = deque(maxlen=30)
+        self.sample_rate = sample_rate if sample_rate in (8000, 16000, 32000, 48000) else 16000
+        self.frame_ms = _valid_frame_ms(frame_ms)
+        self.frame_samples = self.sample_rate * self.frame_ms // 1000
+        self.frame_bytes = self.frame_samples * 2
+        self.energy_threshold = energy_threshold
 
-    def detect(self, audio):
-        speech = self.vad.is_speech(audio[:960], 16000)
-        self.buf.append(speech)
-        return speech, sum(self.buf) / len(self.buf)
+        self.chunks = 0
+        self.frames = 0
+        self.gated = 0  # silent frames that never reached the VAD
+        self.speech_frames = 0
+        self.busy = 0.0
 
+    def frame_flags(self, chunks):
+        """
+        Per-frame speech flags (bytes of 0/1) for each PCM chunk, with one
+        RMS pass over every frame of the batch. A trailing partial frame is
+        ignored.
+        """
+        start = time.perf_counter()
+        counts = [len(chunk) // self.frame_bytes for chunk in chunks]
+        total = sum(counts)
+        flags = bytearray(total)
+
+        if total:
+            pcm = b"".join(chunk[:n * self.frame_bytes] for chunk, n in zip(chunks, counts))
+            frames = np.frombuffer(pcm, dtype="<i2").reshape(total, self.frame_samples)
+            rms = np.sqrt(np.mean(np.square(frames, dtype=np.float32), axis=1))
+            loud = np.flatnonzero(rms >= self.energy_threshold).tolist()
+            view = memoryview(pcm)
+            for i in loud:
+                offset = i * self.frame_bytes
+                if self.vad.is_speech(view[offset:offset + self.frame_bytes], self.sample_rate):
+                    flags[i] = 1
+            self.gated += total - len(loud)
+
+        self.chunks += len(chunks)
+        self.frames += total
+        self.speech_frames += sum(flags)
+        self.busy += time.perf_counter() - start
+
+        out, offset = [], 0
+        for n in counts:
+            out.append(bytes(flags[offset:offset + n]))
+            offset += n
+        return out
+
+    def detect(self, chunks, context):
+        """Returns (any speech in the chunks, sliding speech ratio) for one session"""
+        flags = b"".join(self.frame_flags(chunks))
+        return any(flags), context.push_speech(flags)
+
+    def stats(self):
+        return {
+            "sample_rate": self.sample_rate,
+            "frame_ms": self.frame_ms,
+            "energy_threshold": self.energy_threshold,
+            "chunks": self.chunks,
+            "frames": self.frames,
+            "gated": self.gated,
+            "gated_ratio": round(self.gated / self.frames, 3) if self.frames else 0.0,
+            "speech_frames": self.speech_frames,
+            "frames_per_second": round(self.frames / self.busy) if self.busy else 0,
+        }
+
+
+# ===================== SESSIONS =====================
+class MonitoringContext:
+    """
+    Everything the monitor remembers about one exam session: schedule and
+    escalation, the speech ring buffer, violation counters / cooldowns and
+    focus state. Slotted and array-backed so thousands stay cheap.
+    """
+    __slots__ = (
+        "exam_id", "frames", "escalated_until", "thumb",
+        "last_analysis", "gate_thumb", "analysed_at", "gate_frames", "gate_skipped",
+        "speech", "speech_pos", "speech_len", "speech_sum",
+        "tracker", "yaw", "face_confidence", "phone_confidence",
+        "focused", "last_seen",
+    )
 
-# ===================== MAIN =====================
-class AIMonitoringSystem:
     def __init__(self):
-        print("🚀 Initializing AI Monitoring System...")
+        self.exam_id = None
+        self.frames = 0
+        self.escalated_until = 0.0
+        self.thumb = None  # 32x24 grayscale bytes of the previous frame
+
+        self.last_analysis = None  # detector results of the last analysed frame
+        self.gate_thumb = None  # ... and its thumbnail
+        self.analysed_at = 0.0
+        self.gate_frames = 0  # frames evaluated / served from last_analysis
+        self.gate_skipped = 0
+
+        self.speech = bytearray(AUDIO_WINDOW_FRAMES)
+        self.speech_pos = 0
+        self.speech_len = 0
+        self.speech_sum = 0
 
         self.tracker = ViolationTracker()
-        self.face = FaceDetector()
-        self.pose = HeadPoseEstimator()
-        self.phone = PhoneDetector()
-        self.audio = AudioAnalyzer()
-        self.head_time = {}
-
-        print("✅ Face detection:", "enabled" if self.face.enabled else "disabled")
-        print("✅ Head pose:", "enabled" if self.pose.enabled else "disabled")
-        print("✅ Phone detection:", "enabled" if self.phone.enabled else "disabled")
-        print("✅ Audio detection enabled")
-        print("✅ AI Monitoring System ready!")
-
-    def process_frame(self, frame_b64, student_id):
-        frame = cv2.imdecode(
-            np.frombuffer(base64.b64decode(frame_b64.split(",")[-1]), np.uint8),
-            cv2.IMREAD_COLOR
+        self.yaw = None  # smoothed signals for the temporal filter
+        self.face_confidence = None
+        self.phone_confidence = None
+        self.focused = True
+        self.last_seen = time.time()
+
+    def push_speech(self, flags):
+        """Record per-frame speech decisions; returns the speech ratio over the window"""
+        size = len(self.speech)
+        for flag in flags:
+            if self.speech_len == size:
+                self.speech_sum -= self.speech[self.speech_pos]
+            else:
+                self.speech_len += 1
+            self.speech[self.speech_pos] = flag
+            self.speech_sum += flag
+            self.speech_pos = (self.speech_pos + 1) % size
+        return self.speech_sum / self.speech_len if self.speech_len else 0.0
+
+
+class SessionRegistry:
+    """
+    Session key -> MonitoringContext, least recently used first. Sessions idle
+    for longer than idle_timeout are evicted, and the oldest one goes whenever
+    a new session would exceed max_sessions.
+    """
+    def __init__(
+        self,
+        max_sessions=DetectionConfig.MAX_SESSIONS,
+        idle_timeout=DetectionConfig.SESSION_IDLE_TIMEOUT
+    ):
+        self.max_sessions = max(1, max_sessions)
+        self.idle_timeout = idle_timeout
+        self.sessions = OrderedDict()
+        self.created = 0
+        self.evicted_idle = 0
+        self.evicted_capacity = 0
+
+    def get(self, key):
+        now = time.time()
+        context = self.sessions.get(key)
+        if context is None:
+            self.evict_idle(now)
+            while len(self.sessions) >= self.max_sessions:
+                self.sessions.popitem(last=False)
+                self.evicted_capacity += 1
+            context = self.sessions[key] = MonitoringContext()
+            self.created += 1
+        else:
+            self.sessions.move_to_end(key)
+        context.last_seen = now
+        return context
+
+    def peek(self, key):
+        return self.sessions.get(key)
+
+    def evict_idle(self, now=None):
+        cutoff = (now or time.time()) - self.idle_timeout
+        while self.sessions:
+            key, oldest = next(iter(self.sessions.items()))
+            if oldest.last_seen >= cutoff:
+                break
+            del self.sessions[key]
+            self.evicted_idle += 1
+
+    def discard(self, key):
+        self.sessions.pop(key, None)
+
+    def __len__(self):
+        return len(self.sessions)
+
+    def values(self):
+        return self.sessions.values()
+
+    def stats(self):
+        return {
+            "active": len(self.sessions),
+            "max_sessions": self.max_sessions,
+            "idle_timeout": self.idle_timeout,
+            "created": self.created,
+            "evicted_idle": self.evicted_idle,
+            "evicted_capacity": self.evicted_capacity,
+        }
+
+
+# ===================== SCHEDULER =====================
+class DetectorScheduler:
+    """
+    Per-session cadence for the expensive detectors. Head pose and phone
+    detection run every N frames, and on every frame while the session is
+    escalated (face missing / extra face, motion spike, recent violation).
+    The cadence state lives in each MonitoringContext. Runs are counted once
+    the frame is evaluated: planned stages of a motion-gated frame count as
+    "gated", not as runs.
+    """
+    STAGES = ("pose", "phone")
+
+    def __init__(
+        self,
+        pose_every=DetectionConfig.POSE_EVERY_N_FRAMES,
+        phone_every=DetectionConfig.PHONE_EVERY_N_FRAMES,
+        escalation_period=DetectionConfig.ESCALATION_PERIOD
+    ):
+        self.every = {"pose": max(1, pose_every), "phone": max(1, phone_every)}
+        self.escalation_period = escalation_period
+        self.runs = {stage: 0 for stage in self.STAGES}
+        self.skipped = {stage: 0 for stage in self.STAGES}  # not planned (cadence)
+        self.gated = {stage: 0 for stage in self.STAGES}  # planned, skipped by the motion gate
+        self.escalations = 0
+
+    def plan(self, context):
+        escalated = time.time() < context.escalated_until
+        plan = {
+            stage: escalated or context.frames % self.every[stage] == 0
+            for stage in self.STAGES
+        }
+        context.frames += 1
+        return plan
+
+    def record(self, analysis):
+        """Count what a raw analysis actually ran (its "plan" echo and "unchanged" flag)"""
+        planned = analysis.get("plan", {})
+        for stage in self.STAGES:
+            if not planned.get(stage, True):
+                self.skipped[stage] += 1
+            elif analysis.get("unchanged"):
+                self.gated[stage] += 1
+            else:
+                self.runs[stage] += 1
+
+    def observe(self, context, analysis, signals):
+        """`signals`: raw (not yet debounced) violation kinds seen in this frame"""
+        faces = analysis["faces"]  # None when face detection is unavailable
+        suspicious = bool(signals) or (faces is not None and faces != 1)
+        thumb = analysis.get("thumb")
+        if thumb is not None:
+            if context.thumb is not None and len(context.thumb) == len(thumb):
+                suspicious = suspicious or _thumb_diff(thumb, context.thumb) > DetectionConfig.MOTION_SPIKE_THRESHOLD
+            context.thumb = thumb
+
+        if suspicious:
+            if time.time() >= context.escalated_until:
+                self.escalations += 1
+            context.escalated_until = time.time() + self.escalation_period
+
+    def stats(self, contexts=()):
+        now = time.time()
+        return {
+            "escalated": sum(1 for c in contexts if now < c.escalated_until),
+            "escalations": self.escalations,
+            "cadence": dict(self.every),
+            "runs": dict(self.runs),
+            "skipped": dict(self.skipped),
+            "gated": dict(self.gated),
+        }
+
+
+# ===================== MOTION GATE =====================
+def _thumb_diff(a, b):
+    """Mean absolute difference of two grayscale thumbnails (bytes)"""
+    return float(np.abs(
+        np.frombuffer(a, np.uint8).astype(np.int16) - np.frombuffer(b, np.uint8)
+    ).mean())
+
+
+class MotionGate:
+    """
+    Skips the model stages for frames that look like the session's last
+    analysed frame and reuses that frame's results instead. The server puts
+    the reference thumbnail in the plan, the worker compares against it, and
+    evaluation fills skipped frames back in from the context. Escalated
+    sessions are never gated, and a full analysis is forced every
+    full_interval seconds. Per-exam skip rates are summed over the live
+    sessions, so they go away with them; the gate itself keeps only totals.
+    """
+    RESULT_KEYS = ("faces", "face_confidence", "yaw", "phone")
+
+    def __init__(
+        self,
+        threshold=DetectionConfig.MOTION_GATE_THRESHOLD,
+        full_interval=DetectionConfig.MOTION_GATE_FULL_INTERVAL
+    ):
+        self.threshold = threshold
+        self.full_interval = full_interval
+        self.frames = 0
+        self.skipped = 0
+
+    def reference(self, context):
+        """Thumbnail the next frame may be compared against, or None to force analysis"""
+        if self.threshold <= 0 or context.last_analysis is None:
+            return None
+        now = time.time()
+        if now < context.escalated_until or now - context.analysed_at >= self.full_interval:
+            return None
+        return context.gate_thumb
+
+    def unchanged(self, thumb, reference):
+        return (
+            reference is not None
+            and len(reference) == len(thumb)
+            and _thumb_diff(thumb, reference) < self.threshold
         )
 
-        violations = []
+    def resolve(self, context, analysis):
+        """Complete a gated analysis from the context, or remember a full one"""
+        self.frames += 1
+        context.gate_frames += 1
+        if analysis.get("unchanged"):
+            previous = context.last_analysis
+            if previous is None:  # session evicted in between
+                previous = {"faces": None, "face_confidence": 0.0, "yaw": None, "phone": None}
+            else:
+                self.skipped += 1
+                context.gate_skipped += 1
+            return {**previous, "thumb": analysis["thumb"], "unchanged": True}
+
+        context.last_analysis = {key: analysis[key] for key in self.RESULT_KEYS}
+        context.gate_thumb = analysis["thumb"]
+        context.analysed_at = time.time()
+        return analysis
+
+    def stats(self, contexts=()):
+        exams = {}
+        for context in contexts:
+            counts = exams.setdefault(context.exam_id or "unknown", [0, 0])
+            counts[0] += context.gate_frames
+            counts[1] += context.gate_skipped
+        return {
+            "threshold": self.threshold,
+            "full_interval": self.full_interval,
+            "frames": self.frames,
+            "skipped": self.skipped,
+            "skip_rate": round(self.skipped / self.frames, 3) if self.frames else 0.0,
+            "exams": {
+                exam_id: {
+                    "frames": frames,
+                    "skipped": skipped,
+                    "skip_rate": round(skipped / frames, 3) if frames else 0.0,
+                }
+                for exam_id, (frames, skipped) in exams.items()
+            },
+        }
+
+
+# ===================== TEMPORAL FILTER =====================
+def _smooth(previous, value, alpha):
+    return value if previous is None else alpha * value + (1 - alpha) * previous
+
+
+class TemporalFilter:
+    """
+    Debounces frame-level signals into violations. Consecutive counts and
+    cooldowns live in each session's ViolationTracker, smoothed yaw and
+    confidences in its MonitoringContext. A stage that did not run on a frame
+    (yaw / phone None) neither extends nor breaks a streak.
+    """
+    def __init__(
+        self,
+        alpha=DetectionConfig.SMOOTHING_ALPHA,
+        min_frames=DetectionConfig.MIN_CONSECUTIVE_FRAMES,
+        cooldowns=DetectionConfig.COOLDOWN_PERIOD
+    ):
+        self.alpha = min(1.0, alpha) if alpha > 0 else 1.0  # 1.0: no smoothing
+        self.min_frames = dict(min_frames)
+        self.cooldowns = dict(cooldowns)
+        self.signals = {}  # kind -> frames / chunks where the raw signal was present
+        self.emitted = {}
+
+    def update(self, context, kind, active, confidence=1.0):
+        """Feed one observation; returns a violation once it persisted, else None"""
+        tracker = context.tracker
+        if not active:
+            tracker.reset(kind)
+            return None
+        tracker.add(kind)
+        self.signals[kind] = self.signals.get(kind, 0) + 1
+        if tracker.counts[kind] < self.min_frames.get(kind, 1) or not tracker.ready(kind, self.cooldowns.get(kind, 0)):
+            SUPPRESSED.inc(type=kind)
+            return None
+        tracker.trigger(kind)
+        self.emitted[kind] = self.emitted.get(kind, 0) + 1
+        return make_violation(kind, confidence)
+
+    def frame(self, context, analysis):
+        """(violations, raw signal kinds) for one evaluated frame"""
+        signals, violations = [], []
+
+        faces = analysis["faces"]  # None when face detection is unavailable
+        if faces is not None:
+            crowded = faces > 1
+            context.face_confidence = (
+                _smooth(context.face_confidence, analysis["face_confidence"], self.alpha) if crowded else None
+            )
+            signals += ["multiple_faces"] if crowded else []
+            violations.append(self.update(context, "multiple_faces", crowded, context.face_confidence))
+
+        if analysis["yaw"] is not None:
+            context.yaw = _smooth(context.yaw, analysis["yaw"], self.alpha)
+            limit = (DetectionConfig.HEAD_VIOLATION_THRESHOLD if context.tracker.counts.get("looking_away")
+                     else DetectionConfig.HEAD_ALLOWED_ANGLE)
+            away = abs(context.yaw) > limit
+            signals += ["looking_away"] if abs(analysis["yaw"]) > DetectionConfig.HEAD_ALLOWED_ANGLE else []
+            violations.append(self.update(context, "looking_away", away, min(1.0, abs(context.yaw) / 90)))
+
+        if analysis["phone"] is not None:
+            detected, conf, size = analysis["phone"]
+            seen = bool(detected) and size <= DetectionConfig.PHONE_MAX_OBJECT_SIZE
+            context.phone_confidence = _smooth(context.phone_confidence, conf, self.alpha) if seen else None
+            signals += ["phone_detected"] if seen else []
+            violations.append(self.update(context, "phone_detected", seen, context.phone_confidence))
+
+        return [v for v in violations if v is not None], signals
+
+    def stats(self):
+        signals = sum(self.signals.values())
+        emitted = sum(self.emitted.values())
+        return {
+            "alpha": self.alpha,
+            "min_frames": dict(self.min_frames),
+            "cooldowns": dict(self.cooldowns),
+            "signals": dict(self.signals),
+            "emitted": dict(self.emitted),
+            "suppression_rate": round(1 - emitted / signals, 3) if signals else 0.0,
+        }
+
+
+# ===================== MAIN =====================
+class AIMonitoringSystem:
+    """
+    Model weights are shared and loaded lazily (see load()); everything per
+    student lives in self.sessions.
+    """
+    VISION_STAGES = ("face", "pose", "phone")
+    STAGES = VISION_STAGES + ("audio",)
+    LOADERS = {
+        "face": FaceDetector,
+        "pose": HeadPoseEstimator,
+        "phone": PhoneDetector,
+        "audio": AudioAnalyzer,
+    }
+
+    def __init__(self):
+        self.face = None
+        self.pose = None
+        self.faces = None
+        self.phone = None
+        self.audio = None
+        self.decoder = FrameDecoder()
+        self.scheduler = DetectorScheduler()
+        self.gate = MotionGate()
+        self.filter = TemporalFilter()
+        self.sessions = SessionRegistry()
+
+        self.loaded = set()
+        self.loading = set()
+        self.load_times = {}  # stage -> seconds
+        self._load_lock = threading.Lock()
+
+    # ---------- model loading ----------
+    def load(self, stages=STAGES):
+        """
+        Build the requested detectors, in parallel threads, if not built yet.
+        Blocks until they are ready; safe to call from several threads.
+        """
+        if self.loaded.issuperset(stages):
+            return
+        with self._load_lock:
+            todo = [stage for stage in stages if stage not in self.loaded]
+            if not todo:
+                return
+            self.loading.update(todo)
+            print(f"🚀 Loading AI models: {', '.join(todo)}")
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=len(todo), thread_name_prefix="model-load") as pool:
+                built = dict(zip(todo, pool.map(self._build, todo)))
+
+            for stage, (detector, seconds) in built.items():
+                setattr(self, stage, detector)
+                self.load_times[stage] = round(seconds, 3)
+            if self.face is not None and self.pose is not None:
+                self.faces = FaceAnalyzer(self.face, self.pose)
+            self.loaded.update(todo)
+            self.loading.difference_update(todo)
+            self._log_loaded(todo, time.perf_counter() - start)
+
+    def load_in_background(self, stages=STAGES):
+        thread = threading.Thread(target=self.load, args=(stages,), name="model-load", daemon=True)
+        thread.start()
+        return thread
 
-        faces, conf = self.face.detect(frame)
-        if faces > 1:
-            violations.append({"type": "multiple_faces", "confidence": conf})
+    def is_loaded(self, stages=STAGES):
+        return self.loaded.issuperset(stages)
 
-        yaw = self.pose.estimate(frame)
-        if yaw and abs(yaw) > DetectionConfig.HEAD_ALLOWED_ANGLE:
-            violations.append({"type": "looking_away"})
+    def _build(self, stage):
+        start = time.perf_counter()
+        detector = self.LOADERS[stage]()
+        return detector, time.perf_counter() - start
 
-        detected, conf, size = self.phone.detect(frame)
-        if detected and size <= DetectionConfig.PHONE_MAX_OBJECT_SIZE:
-            violations.append({"type": "phone_detected", "confidence": conf})
+    def _log_loaded(self, stages, seconds):
+        for stage in stages:
+            detector = getattr(self, stage)
+            took = f"{self.load_times[stage]:.2f}s"
+            if stage == "face":
+                print("✅ Face detection:", f"enabled ({took})" if detector.enabled else "disabled")
+            elif stage == "pose":
+                print("✅ Head pose:", f"enabled ({took})" if detector.enabled else "disabled")
+            elif stage == "phone":
+                print("✅ Phone detection:", f"enabled ({detector.backend.name}, {took})"
+                      if detector.enabled else "disabled")
+            elif stage == "audio":
+                print(f"✅ Audio detection enabled ({detector.frame_ms} ms frames, "
+                      f"energy gate {detector.energy_threshold:g}, {took})")
+        print(f"✅ AI models ready in {seconds:.2f}s")
+
+    def status(self):
+        if self.loading:
+            state = "warming_up"
+        elif self.loaded:
+            state = "ready"
+        else:
+            state = "cold"
+        return {
+            "state": state,
+            "loaded": sorted(self.loaded),
+            "enabled": {stage: getattr(getattr(self, stage), "enabled", True) for stage in sorted(self.loaded)},
+            "load_times": dict(self.load_times),
+        }
+
+    def process_frame(self, frame_data, session_key, exam_id=None):
+        """Plan, analyse and evaluate one frame in-process"""
+        plan = self.plan_frame(session_key, exam_id)
+        analysis = self.analyse_frames([(frame_data, plan)])[0]
+        return self.evaluate_frame(session_key, analysis)
+
+    def plan_frame(self, session_key, exam_id=None):
+        context = self.sessions.get(session_key)
+        if exam_id is not None:
+            context.exam_id = str(exam_id)
+        plan = self.scheduler.plan(context)
+        plan["reference"] = self.gate.reference(context)
+        return plan
+
+    def analyse_frames(self, items):
+        """
+        Stateless model pass over a batch of (frame_data, plan) pairs.
+        Frames matching the plan's motion-gate reference skip the models.
+        Otherwise face count runs per frame, head pose only where planned, and
+        phone detection as one batched call over the frames that asked for it.
+        Safe to run in a worker process: no session state is touched.
+        Each analysis carries its per-stage seconds ("timings") back to the
+        server process, where evaluate_frame() records them.
+        """
+        self.load(self.VISION_STAGES)
+        frames, thumbs, timings = [], [], []
+        for frame_data, _ in items:
+            start = time.perf_counter()
+            frame = self.decoder.decode(frame_data)
+            frames.append(frame)
+            thumbs.append(self.decoder.thumb(frame) if frame is not None else None)
+            timings.append({"decode": time.perf_counter() - start})
+        unchanged = [
+            thumb is not None and self.gate.unchanged(thumb, plan.get("reference"))
+            for thumb, (_, plan) in zip(thumbs, items)
+        ]
+
+        phone_idx = [i for i, (frame, (_, plan)) in enumerate(zip(frames, items))
+                     if frame is not None and not unchanged[i] and plan.get("phone", True)]
+        start = time.perf_counter()
+        phones = dict(zip(phone_idx, self.phone.detect_batch([frames[i] for i in phone_idx])))
+        if phone_idx and self.phone.enabled:
+            per_frame = (time.perf_counter() - start) / len(phone_idx)
+            for i in phone_idx:
+                timings[i]["phone"] = per_frame
+
+        analyses = []
+        for i, (frame, (_, plan)) in enumerate(zip(frames, items)):
+            if frame is None:
+                analyses.append({"error": "Could not decode frame"})
+                continue
+            planned = {stage: plan.get(stage, True) for stage in DetectorScheduler.STAGES}
+            if unchanged[i]:
+                analyses.append({"unchanged": True, "plan": planned, "thumb": thumbs[i], "timings": timings[i]})
+                continue
+
+            # one RGB conversion shared by FaceDetection and FaceMesh
+            with_pose = plan.get("pose", True)
+            if self.faces.needs_rgb(with_pose):
+                faces, conf, yaw = self.faces.analyze_rgb(self.decoder.rgb(frame), with_pose, timings[i])
+            else:
+                faces, conf, yaw = 0, 0.0, None
+            analyses.append({
+                "faces": faces if self.face.enabled else None,
+                "face_confidence": conf,
+                "yaw": yaw,
+                "phone": phones.get(i),
+                "plan": planned,
+                "thumb": thumbs[i],
+                "timings": timings[i],
+            })
+        return analyses
+
+    def evaluate_frame(self, session_key, analysis):
+        """Turn a raw analysis into violations and update the session's schedule"""
+        for stage, seconds in analysis.get("timings", {}).items():
+            STAGE_SECONDS.observe(seconds, stage=stage)
+        if "error" in analysis:
+            FRAMES.inc(outcome="error")
+            return {
+                "status": "error",
+                "error": analysis["error"],
+                "timestamp": datetime.now().isoformat(),
+                "violations": []
+            }
+
+        context = self.sessions.get(session_key)
+        FRAMES.inc(outcome="unchanged" if analysis.get("unchanged") else "analysed")
+        self.scheduler.record(analysis)
+        analysis = self.gate.resolve(context, analysis)
+        violations, signals = self.filter.frame(context, analysis)
+        self.scheduler.observe(context, analysis, signals)
 
         return {
             "status": "success",
@@ -196,18 +1143,57 @@ class AIMonitoringSystem:
             "violations": violations
         }
 
-    def process_audio(self, audio_b64, student_id):
-        audio = base64.b64decode(audio_b64.split(",")[-1])
-        speech, conf = self.audio.detect(audio)
-        if speech and conf >= DetectionConfig.AUDIO_CONFIDENCE_THRESHOLD:
-            return {"violations": [{"type": "voice_detected", "confidence": conf}]}
-        return {"violations": []}
-
+    def forget(self, session_key):
+        """Drop a session's state once it can no longer produce violations"""
+        self.sessions.discard(session_key)
 
-# ===================== GLOBAL =====================
-ai_monitor = AIMonitoringSystem()
+    def stats(self):
+        return {
+            "sessions": self.sessions.stats(),
+            "scheduler": self.scheduler.stats(self.sessions.values()),
+            "motion_gate": self.gate.stats(self.sessions.values()),
+            "temporal_filter": self.filter.stats(),
+            "audio": self.audio.stats() if self.audio is not None else None,
+            "models": self.status(),
+        }
 
+    def process_audio(self, audio_data, session_key):
+        """Audio is a base64 string or raw 16-bit mono PCM bytes (AUDIO_SAMPLE_RATE)"""
+        return self.process_audio_batch([audio_data], session_key)
 
+    def process_audio_batch(self, chunks, session_key):
+        """
+        Several chunks of one session in a single VAD pass; at most one
+        voice_detected violation per call, and none during its cooldown.
+        """
+        audio = [
+            base64.b64decode(chunk.split(",")[-1]) if isinstance(chunk, str) else bytes(chunk)
+            for chunk in chunks
+        ]
+        self.load(("audio",))
+        start = time.perf_counter()
+        context = self.sessions.get(session_key)
+        speech, conf = self.audio.detect(audio, context)
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage="audio")
+        AUDIO_CHUNKS.inc(len(audio))
+        # the speech ratio is already a sliding window: only the cooldown applies
+        violation = self.filter.update(
+            context, "voice_detected", speech and conf >= DetectionConfig.AUDIO_CONFIDENCE_THRESHOLD, conf
+        )
+        return {"violations": [violation] if violation else []}
 
+    def check_tab_switch(self, session_key, is_focused):
+        """A violation when the exam tab loses focus (at most once per cooldown)"""
+        context = self.sessions.get(session_key)
+        was_focused, context.focused = context.focused, bool(is_focused)
+        if was_focused and not context.focused:
+            tracker = context.tracker
+            tracker.add("tab_switch")
+            if tracker.ready("tab_switch", DetectionConfig.TAB_SWITCH_COOLDOWN):
+                tracker.trigger("tab_switch")
+                return {"violations": [make_violation("tab_switch")]}
+        return {"violations": []}
 
 
+# ===================== GLOBAL =====================
+ai_monitor = AIMonitoringSystem()
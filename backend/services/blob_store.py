@@ -0,0 +1,110 @@
+"""
+ProctorVision Evidence Blob Store
+Content-addressed files for evidence frames and audio
+
+NOTE:
+- The key is the SHA-256 of the content, so identical snapshots are stored once
+- Files live in two levels of sharded directories: <root>/ab/cd/abcd...
+- Writes go to a temp file first and are renamed into place, so readers never
+  see a partial blob and concurrent writers of the same content are harmless
+- Blobs are immutable; the DB keeps only the key (CheatingEvent.frame_key / audio_key)
+"""
+
+import hashlib
+import os
+import re
+import tempfile
+
+
+# ===================== CONFIG =====================
+EVIDENCE_DIR = os.getenv("EVIDENCE_DIR", "./evidence")
+KEY_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+
+def sniff_media_type(head: bytes) -> str:
+    """Media type from the first bytes of a blob"""
+    if head.startswith(b"\xff\xd8"):
+        return "image/jpeg"
+    if head.startswith(b"\x89PNG"):
+        return "image/png"
+    if head.startswith(b"RIFF") and head[8:12] == b"WAVE":
+        return "audio/wav"
+    return "application/octet-stream"  # e.g. raw 16-bit PCM
+
+
+class BlobStore:
+    def __init__(self, root=EVIDENCE_DIR):
+        self.root = os.path.abspath(root)
+        self.written = 0
+        self.deduplicated = 0
+        self.bytes_written = 0
+
+    def path(self, key: str) -> str:
+        if not KEY_PATTERN.match(key or ""):
+            raise ValueError("Invalid blob key")
+        return os.path.join(self.root, key[:2], key[2:4], key)
+
+    def put(self, data: bytes) -> str:
+        """Store bytes (if not stored yet); returns the key"""
+        data = bytes(data)
+        key = hashlib.sha256(data).hexdigest()
+        path = self.path(key)
+        if os.path.exists(path):
+            self.deduplicated += 1
+            return key
+
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except Exception:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        self.written += 1
+        self.bytes_written += len(data)
+        return key
+
+    def exists(self, key: str) -> bool:
+        try:
+            return os.path.exists(self.path(key))
+        except ValueError:
+            return False
+
+    def size(self, key: str) -> int:
+        return os.path.getsize(self.path(key))
+
+    def read(self, key: str) -> bytes:
+        with open(self.path(key), "rb") as f:
+            return f.read()
+
+    def iter_range(self, key: str, start: int, end: int, chunk_size=64 * 1024):
+        """Yield bytes start..end (inclusive) of a blob in chunks"""
+        with open(self.path(key), "rb") as f:
+            f.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = f.read(min(chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+    def media_type(self, key: str) -> str:
+        with open(self.path(key), "rb") as f:
+            return sniff_media_type(f.read(12))
+
+    def stats(self):
+        return {
+            "root": self.root,
+            "written": self.written,
+            "deduplicated": self.deduplicated,
+            "bytes_written": self.bytes_written,
+        }
+
+
+# ===================== GLOBAL =====================
+blob_store = BlobStore()
@@ -0,0 +1,285 @@
+"""
+ProctorVision Connection Backend
+Shared state and pub/sub for ConnectionManager across uvicorn workers
+
+NOTE:
+- CONNECTION_BACKEND=memory (default): single process, everything in dicts
+- CONNECTION_BACKEND=sqlite:///./ws_bus.db: any number of local worker processes
+  share counters and route messages through one SQLite file (WAL mode)
+- publish() reaches the *other* workers; the caller handles its own sockets.
+  Channels: "broadcast", "student:<id>"; each worker only delivers messages for
+  channels it has subscribed to (i.e. sockets it holds)
+- has_remote_subscribers(channel) tells publishers whether another worker
+  listens on an "exam:<id>" channel, so events nobody watches are not written
+  to the bus. The SQLite backend advertises its exam channels in bus_workers
+  when they change (and every BUS_INTEREST_INTERVAL_MS as a liveness beat) and
+  reads the other workers' on every poll
+"""
+
+import asyncio
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+
+
+# ===================== CONFIG =====================
+CONNECTION_BACKEND = os.getenv("CONNECTION_BACKEND", "memory")
+BUS_POLL_INTERVAL_MS = float(os.getenv("BUS_POLL_INTERVAL_MS", "50"))
+BUS_INTEREST_INTERVAL_MS = float(os.getenv("BUS_INTEREST_INTERVAL_MS", "1000"))
+BUS_MESSAGE_TTL = 60  # seconds a routed message is kept before cleanup
+BUS_WORKER_TTL = 10  # seconds without an advertisement before a worker's channels are ignored
+ADVERTISED_PREFIX = "exam:"  # channels whose publishers check for remote subscribers
+
+
+# ===================== IN-PROCESS =====================
+class InProcessBackend:
+    """
+    Single-worker backend: counters in a dict. There are no other workers,
+    so publish() has nobody to reach and is a no-op.
+    """
+
+    def __init__(self):
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}"
+        self.counters = {}
+        self.channels = set()
+
+    async def start(self, deliver):
+        pass
+
+    async def stop(self):
+        pass
+
+    def subscribe(self, channel):
+        self.channels.add(channel)
+
+    def unsubscribe(self, channel):
+        self.channels.discard(channel)
+
+    async def publish(self, channel, message):
+        pass
+
+    def has_remote_subscribers(self, channel):
+        return False
+
+    async def incr_counter(self, key, amount=1):
+        self.counters[key] = self.counters.get(key, 0) + amount
+        return self.counters[key]
+
+    async def init_counter(self, key, value):
+        """Seed a counter without moving it backwards; returns the current value"""
+        self.counters[key] = max(self.counters.get(key, 0), value)
+        return self.counters[key]
+
+    async def set_counter(self, key, value):
+        self.counters[key] = value
+
+    def stats(self):
+        return {"backend": "memory", "worker_id": self.worker_id, "channels": len(self.channels)}
+
+
+# ===================== SQLITE (MULTI-PROCESS) =====================
+class SQLiteBackend:
+    """
+    Multi-process backend for workers on one host. Counters live in a shared
+    table; published messages are appended to a log table that every other
+    worker polls, delivering only rows for its own subscribed channels.
+    """
+
+    def __init__(self, path, poll_interval_ms=BUS_POLL_INTERVAL_MS, interest_interval_ms=BUS_INTEREST_INTERVAL_MS):
+        self.path = path
+        self.poll_interval = poll_interval_ms / 1000
+        self.interest_interval = interest_interval_ms / 1000
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.channels = set()
+        self.remote_channels = set()  # advertised channels of the other live workers
+        self.advertised_at = 0.0  # 0: advertise on the next poll
+        self.deliver = None
+        self.task = None
+        self.last_id = 0
+        self.published = 0
+        self.received = 0
+
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS bus_counters (
+                key TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS bus_messages (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                channel TEXT NOT NULL,
+                origin TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                created_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS bus_workers (
+                worker_id TEXT PRIMARY KEY,
+                channels TEXT NOT NULL,
+                seen_at REAL NOT NULL
+            );
+        """)
+
+    def _execute(self, sql, params=(), fetch=False):
+        with self.lock:
+            cur = self.conn.execute(sql, params)
+            return cur.fetchall() if fetch else None
+
+    def _transaction(self, statements):
+        """Run (sql, params) pairs atomically; returns rows of the last statement"""
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = None
+                for sql, params in statements:
+                    rows = self.conn.execute(sql, params).fetchall()
+                self.conn.execute("COMMIT")
+                return rows
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    async def start(self, deliver):
+        self.deliver = deliver
+        rows = await asyncio.to_thread(
+            self._execute, "SELECT COALESCE(MAX(id), 0) FROM bus_messages", (), True
+        )
+        self.last_id = rows[0][0]
+        await asyncio.to_thread(self._sync_interest)
+        if self.task is None:
+            self.task = asyncio.get_running_loop().create_task(self._poll())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        self.deliver = None
+        await asyncio.to_thread(self._execute, "DELETE FROM bus_workers WHERE worker_id = ?", (self.worker_id,))
+
+    def subscribe(self, channel):
+        if channel.startswith(ADVERTISED_PREFIX) and channel not in self.channels:
+            self.advertised_at = 0.0
+        self.channels.add(channel)
+
+    def unsubscribe(self, channel):
+        if channel in self.channels and channel.startswith(ADVERTISED_PREFIX):
+            self.advertised_at = 0.0
+        self.channels.discard(channel)
+
+    def has_remote_subscribers(self, channel):
+        return channel in self.remote_channels
+
+    def _advertise(self):
+        """Publish our exam channels; doubles as a liveness beat"""
+        now = time.time()
+        self.advertised_at = now
+        channels = sorted(c for c in self.channels if c.startswith(ADVERTISED_PREFIX))
+        self._execute(
+            "INSERT INTO bus_workers (worker_id, channels, seen_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(worker_id) DO UPDATE SET channels = excluded.channels, seen_at = excluded.seen_at",
+            (self.worker_id, json.dumps(channels), now)
+        )
+
+    def _sync_interest(self):
+        """Advertise if due, then read the other live workers' exam channels"""
+        if time.time() - self.advertised_at >= self.interest_interval:
+            self._advertise()
+        rows = self._execute(
+            "SELECT channels FROM bus_workers WHERE worker_id != ? AND seen_at > ?",
+            (self.worker_id, time.time() - BUS_WORKER_TTL), True
+        )
+        self.remote_channels = {channel for (text,) in rows for channel in json.loads(text)}
+
+    async def publish(self, channel, message):
+        self.published += 1
+        await asyncio.to_thread(
+            self._execute,
+            "INSERT INTO bus_messages (channel, origin, payload, created_at) VALUES (?, ?, ?, ?)",
+            (channel, self.worker_id, json.dumps(message), time.time())
+        )
+
+    async def _poll(self):
+        last_cleanup = time.time()
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                rows = await asyncio.to_thread(
+                    self._execute,
+                    "SELECT id, channel, origin, payload FROM bus_messages WHERE id > ? ORDER BY id",
+                    (self.last_id,), True
+                )
+                for row_id, channel, origin, payload in rows:
+                    self.last_id = row_id
+                    if origin == self.worker_id or channel not in self.channels:
+                        continue
+                    self.received += 1
+                    if self.deliver is not None:
+                        await self.deliver(channel, json.loads(payload))
+
+                await asyncio.to_thread(self._sync_interest)
+
+                if time.time() - last_cleanup > BUS_MESSAGE_TTL:
+                    last_cleanup = time.time()
+                    await asyncio.to_thread(self._transaction, [
+                        ("DELETE FROM bus_messages WHERE created_at < ?", (last_cleanup - BUS_MESSAGE_TTL,)),
+                        ("DELETE FROM bus_workers WHERE seen_at < ?", (last_cleanup - BUS_MESSAGE_TTL,)),
+                    ])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Error polling connection bus: {e}")
+
+    async def incr_counter(self, key, amount=1):
+        rows = await asyncio.to_thread(self._transaction, [
+            ("INSERT INTO bus_counters (key, value) VALUES (?, ?) "
+             "ON CONFLICT(key) DO UPDATE SET value = value + excluded.value", (key, amount)),
+            ("SELECT value FROM bus_counters WHERE key = ?", (key,)),
+        ])
+        return rows[0][0]
+
+    async def init_counter(self, key, value):
+        rows = await asyncio.to_thread(self._transaction, [
+            ("INSERT INTO bus_counters (key, value) VALUES (?, ?) "
+             "ON CONFLICT(key) DO UPDATE SET value = MAX(value, excluded.value)", (key, value)),
+            ("SELECT value FROM bus_counters WHERE key = ?", (key,)),
+        ])
+        return rows[0][0]
+
+    async def set_counter(self, key, value):
+        await asyncio.to_thread(
+            self._execute,
+            "INSERT INTO bus_counters (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, value)
+        )
+
+    def stats(self):
+        return {
+            "backend": "sqlite",
+            "path": self.path,
+            "worker_id": self.worker_id,
+            "channels": len(self.channels),
+            "remote_channels": len(self.remote_channels),
+            "published": self.published,
+            "received": self.received,
+            "last_message_id": self.last_id,
+        }
+
+
+# ===================== FACTORY =====================
+def create_backend(url=CONNECTION_BACKEND):
+    if url.startswith("sqlite:///"):
+        return SQLiteBackend(url[len("sqlite:///"):])
+    if url == "memory":
+        return InProcessBackend()
+    raise ValueError(f"Unknown CONNECTION_BACKEND: {url}")
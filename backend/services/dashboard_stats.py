@@ -0,0 +1,268 @@
+"""
+ProctorVision Dashboard Stats
+In-memory counters behind /api/admin/dashboard-stats
+
+NOTE:
+- reconcile() rebuilds every counter with one grouped query; the dashboard
+  itself only reads memory
+- ORM flush events keep the counters current in between: inserts, deletes
+  and changes of the counted columns (role, is_active, status,
+  cheating_count, started_at) become deltas, applied when the transaction
+  commits and dropped on rollback
+- Writes the ORM cannot attribute (bulk Query.delete / update) mark the
+  counters stale, so the next read reconciles; a periodic reconcile every
+  STATS_RECONCILE_INTERVAL seconds catches anything else (raw SQL)
+- Deltas committed while reconcile() is querying are buffered and reapplied
+  over the fresh counts, so none is lost. One that committed just before the
+  query ran is then counted twice until the next reconcile (never lost)
+- The counters are per process: with several uvicorn workers (any
+  CONNECTION_BACKEND but "memory") each only sees its own commits, so reads
+  reconcile every time instead (STATS_RECONCILE_ON_READ)
+"""
+
+import asyncio
+import os
+import threading
+from datetime import datetime
+
+from sqlalchemy import case, event, func, inspect, select, true
+
+from database.database import SessionLocal
+from database.models import Exam, Submission, User
+
+
+# ===================== CONFIG =====================
+STATS_RECONCILE_INTERVAL = float(os.getenv("STATS_RECONCILE_INTERVAL", "300"))
+STATS_RECONCILE_ON_READ = os.getenv(
+    "STATS_RECONCILE_ON_READ", "0" if os.getenv("CONNECTION_BACKEND", "memory") == "memory" else "1"
+) == "1"
+
+COUNTERS = (
+    "users", "students", "teachers", "admins",
+    "exams", "active_exams",
+    "submissions", "completed", "cheating", "today",
+)
+# model -> (row counter, counted columns)
+TRACKED = {
+    User: ("users", ("role",)),
+    Exam: ("exams", ("is_active",)),
+    Submission: ("submissions", ("status", "cheating_count", "started_at")),
+}
+ROLE_COUNTERS = {"student": "students", "teacher": "teachers", "admin": "admins"}
+_PENDING = "dashboard_stats"  # session.info key for deltas of the open transaction
+_MISSING = object()
+
+
+def _column_counts(column, value, today):
+    """Counters one column value contributes to (each 0 or 1)"""
+    if column == "role":
+        return {ROLE_COUNTERS[value]: 1} if value in ROLE_COUNTERS else {}
+    if column == "is_active":
+        return {"active_exams": 1} if value else {}
+    if column == "status":
+        return {"completed": 1} if value == "completed" else {}
+    if column == "cheating_count":
+        return {"cheating": 1} if (value or 0) > 0 else {}
+    if column == "started_at":
+        return {"today": 1} if value is not None and value.date() == today else {}
+    return {}
+
+
+class DashboardStats:
+    def __init__(self, reconcile_interval=STATS_RECONCILE_INTERVAL, reconcile_on_read=STATS_RECONCILE_ON_READ):
+        self.reconcile_interval = reconcile_interval
+        self.reconcile_on_read = reconcile_on_read
+        self.counts = dict.fromkeys(COUNTERS, 0)
+        self.day = datetime.utcnow().date()
+        self.stale = True  # nothing computed yet
+        self.reconciled_at = None
+        self.reconciles = 0
+        self.applied = 0  # committed transactions that moved a counter
+        self.in_flight = []  # one delta buffer per reconcile() currently querying
+        self.raced = 0  # reconciles that had deltas commit during the query
+        self.lock = threading.Lock()
+        self.installed = False
+        self.task = None
+
+    # ---------- reconciliation ----------
+    def compute(self, db):
+        """Every counter in one statement: one aggregate row per table, cross-joined"""
+        today = datetime.utcnow().date()
+
+        def flag(condition):
+            return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+        users = select(
+            func.count(User.id).label("users"),
+            flag(User.role == "student").label("students"),
+            flag(User.role == "teacher").label("teachers"),
+            flag(User.role == "admin").label("admins"),
+        ).subquery()
+        exams = select(
+            func.count(Exam.id).label("exams"),
+            flag(Exam.is_active == True).label("active_exams"),
+        ).subquery()
+        submissions = select(
+            func.count(Submission.id).label("submissions"),
+            flag(Submission.status == "completed").label("completed"),
+            flag(Submission.cheating_count > 0).label("cheating"),
+            flag(func.date(Submission.started_at) == today).label("today"),
+        ).subquery()
+
+        joined = users.join(exams, true()).join(submissions, true())
+        row = db.execute(select(users, exams, submissions).select_from(joined)).one()
+        return today, {name: int(row._mapping[name]) for name in COUNTERS}
+
+    def reconcile(self, db=None):
+        own = db is None
+        db = db or SessionLocal()
+        buffered = {}
+        with self.lock:
+            self.in_flight.append(buffered)
+        try:
+            today, counts = self.compute(db)
+        finally:
+            with self.lock:
+                self.in_flight.remove(buffered)
+            if own:
+                db.close()
+        with self.lock:
+            # commits that landed while compute() ran may be missing from its row
+            for name, delta in buffered.items():
+                counts[name] += delta
+            self.raced += bool(buffered)
+            self.counts = counts
+            self.day = today
+            self.stale = False
+            self.reconciled_at = datetime.utcnow()
+            self.reconciles += 1
+        return counts
+
+    def _roll_day(self):
+        """At midnight (UTC) nothing has started today yet"""
+        today = datetime.utcnow().date()
+        if today != self.day:
+            self.day = today
+            self.counts["today"] = 0
+
+    # ---------- reads ----------
+    def snapshot(self, db=None):
+        """Current counters; reconciles first only if they are stale (or on every read with several workers)"""
+        if self.stale or self.reconcile_on_read:
+            self.reconcile(db)
+        with self.lock:
+            self._roll_day()
+            return dict(self.counts)
+
+    def stats(self):
+        return {
+            "reconcile_interval_s": self.reconcile_interval,
+            "reconcile_on_read": self.reconcile_on_read,
+            "reconciles": self.reconciles,
+            "raced_reconciles": self.raced,
+            "reconciled_at": self.reconciled_at.isoformat() if self.reconciled_at else None,
+            "applied_transactions": self.applied,
+            "stale": self.stale,
+        }
+
+    # ---------- ORM events ----------
+    def install(self):
+        if self.installed:
+            return
+        event.listen(SessionLocal, "after_flush", self._after_flush)
+        event.listen(SessionLocal, "do_orm_execute", self._on_execute)
+        event.listen(SessionLocal, "after_commit", self._after_commit)
+        event.listen(SessionLocal, "after_rollback", self._after_rollback)
+        self.installed = True
+
+    def _after_flush(self, session, flush_context):
+        pending = session.info.setdefault(_PENDING, {})
+        today = datetime.utcnow().date()
+
+        def add(counts, sign):
+            for name, value in counts.items():
+                pending[name] = pending.get(name, 0) + sign * value
+
+        for objects, sign in ((session.new, 1), (session.deleted, -1)):
+            for obj in objects:
+                tracked = TRACKED.get(type(obj))
+                if tracked is None:
+                    continue
+                row_counter, columns = tracked
+                values = inspect(obj).dict
+                add({row_counter: 1}, sign)
+                for column in columns:
+                    if column not in values:
+                        pending["_stale"] = 1  # value unknown without a query
+                        continue
+                    add(_column_counts(column, values[column], today), sign)
+
+        for obj in session.dirty:
+            tracked = TRACKED.get(type(obj))
+            if tracked is None:
+                continue
+            state = inspect(obj)
+            for column in tracked[1]:
+                history = state.attrs[column].history
+                if not history.has_changes():
+                    continue
+                old = history.deleted[0] if history.deleted else _MISSING
+                if old is _MISSING:
+                    pending["_stale"] = 1
+                    continue
+                new = history.added[0] if history.added else None
+                add(_column_counts(column, old, today), -1)
+                add(_column_counts(column, new, today), 1)
+
+    def _on_execute(self, orm_execute_state):
+        if orm_execute_state.is_delete or orm_execute_state.is_update:
+            mapper = orm_execute_state.bind_mapper
+            if mapper is not None and mapper.class_ in TRACKED:
+                orm_execute_state.session.info.setdefault(_PENDING, {})["_stale"] = 1
+
+    def _after_commit(self, session):
+        pending = session.info.pop(_PENDING, None)
+        if not pending:
+            return
+        with self.lock:
+            if pending.pop("_stale", 0):
+                self.stale = True
+            self._roll_day()
+            moved = False
+            for name, delta in pending.items():
+                if delta:
+                    self.counts[name] += delta
+                    for buffered in self.in_flight:
+                        buffered[name] = buffered.get(name, 0) + delta
+                    moved = True
+            self.applied += moved
+
+    def _after_rollback(self, session):
+        session.info.pop(_PENDING, None)
+
+    # ---------- lifecycle ----------
+    def start(self):
+        self.install()
+        if self.task is None and self.reconcile_interval > 0:
+            self.task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.to_thread(self.reconcile)
+            except Exception as e:
+                print(f"Error reconciling dashboard stats: {e}")
+            await asyncio.sleep(self.reconcile_interval)
+
+
+# ===================== GLOBAL =====================
+dashboard_stats = DashboardStats()
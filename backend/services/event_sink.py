@@ -0,0 +1,243 @@
+"""
+ProctorVision Cheating Event Sink
+Write-behind persistence for CheatingEvent rows
+
+NOTE:
+- Violations are queued in memory and bulk-inserted every EVENT_FLUSH_INTERVAL_MS
+  or as soon as EVENT_FLUSH_MAX_EVENTS are waiting
+- Submission counters / warnings / auto-submit status go in the same transaction
+- Auto-submit and shutdown flush immediately so nothing is lost
+- Evidence bytes (frame / audio) go to the blob store during the flush; the
+  row only gets the blob key
+- When a flush fails the batch is kept and retried with exponential backoff
+  (EVENT_RETRY_BACKOFF_MS doubling up to EVENT_RETRY_MAX_BACKOFF_MS). At most
+  EVENT_RETRY_MAX_EVENTS wait; beyond that the oldest are dropped and counted
+  (proctorvision_db_events_dropped_total), so a DB outage cannot exhaust memory
+"""
+
+import asyncio
+import os
+import time
+from collections import deque
+from datetime import datetime
+
+from database.database import SessionLocal
+from database.models import CheatingEvent, Submission
+from services.blob_store import blob_store
+from services.metrics import DB_DROPPED, DB_ERRORS, DB_EVENTS, DB_FLUSH_SECONDS
+from utils.helpers import summarize_ms
+
+
+# ===================== CONFIG =====================
+EVENT_FLUSH_INTERVAL_MS = float(os.getenv("EVENT_FLUSH_INTERVAL_MS", "500"))
+EVENT_FLUSH_MAX_EVENTS = int(os.getenv("EVENT_FLUSH_MAX_EVENTS", "200"))
+EVENT_RETRY_MAX_EVENTS = int(os.getenv("EVENT_RETRY_MAX_EVENTS", "10000"))
+EVENT_RETRY_BACKOFF_MS = float(os.getenv("EVENT_RETRY_BACKOFF_MS", "500"))
+EVENT_RETRY_MAX_BACKOFF_MS = float(os.getenv("EVENT_RETRY_MAX_BACKOFF_MS", "30000"))
+LATENCY_WINDOW = 1000
+# violation type -> which evidence it is stored with
+EVIDENCE_KINDS = {
+    "multiple_faces": "frame",
+    "looking_away": "frame",
+    "phone_detected": "frame",
+    "voice_detected": "audio",
+}
+
+
+class EventSink:
+    def __init__(
+        self,
+        flush_interval_ms=EVENT_FLUSH_INTERVAL_MS,
+        flush_max_events=EVENT_FLUSH_MAX_EVENTS,
+        retry_max_events=EVENT_RETRY_MAX_EVENTS,
+        retry_backoff_ms=EVENT_RETRY_BACKOFF_MS,
+        retry_max_backoff_ms=EVENT_RETRY_MAX_BACKOFF_MS,
+    ):
+        self.flush_interval = flush_interval_ms / 1000
+        self.flush_max_events = flush_max_events
+        self.retry_max_events = retry_max_events
+        self.retry_backoff = retry_backoff_ms / 1000
+        self.retry_max_backoff = retry_max_backoff_ms / 1000
+
+        self.events = []  # CheatingEvent row mappings
+        self.updates = {}  # submission_id -> pending column changes
+        self.wakeup = asyncio.Event()
+        self.lock = asyncio.Lock()
+        self.task = None
+
+        self.flushes = 0
+        self.flushed_events = 0
+        self.errors = 0
+        self.failures = 0  # consecutive failed flushes
+        self.retry_at = 0.0  # monotonic time the next periodic flush may run
+        self.dropped = 0
+        self.flush_times = deque(maxlen=LATENCY_WINDOW)
+
+    # ---------- producers ----------
+    def record(self, submission_id, violations, cheating_count, evidence=None):
+        """
+        Queue violations for a submission along with its new cheating_count.
+        evidence: optional {"frame": JPEG bytes, "audio": PCM bytes} they were raised on
+        """
+        evidence = evidence or {}
+        for violation in violations:
+            event = {
+                "submission_id": submission_id,
+                "event_type": violation["type"],
+                "severity": violation.get("severity", "medium"),
+                "confidence": violation.get("confidence", 1.0),
+                "timestamp": datetime.fromisoformat(violation["timestamp"])
+                if "timestamp" in violation else datetime.now()
+            }
+            kind = EVIDENCE_KINDS.get(violation["type"])
+            if evidence.get(kind):
+                event[f"_{kind}"] = evidence[kind]  # replaced by {kind}_key on flush
+            self.events.append(event)
+
+        update = self.updates.setdefault(submission_id, {"warnings": []})
+        update["cheating_count"] = cheating_count
+        update["warnings"].extend(violations)
+        self._trim(update)
+
+        if len(self.events) >= self.flush_max_events:
+            self.wakeup.set()
+
+    async def auto_submit(self, submission_id, reason):
+        """Mark a submission auto-submitted and flush right away"""
+        update = self.updates.setdefault(submission_id, {"warnings": []})
+        update.update({
+            "status": "completed",
+            "auto_submitted": True,
+            "auto_submit_reason": reason,
+            "submitted_at": datetime.now()
+        })
+        await self.flush()
+
+    # ---------- lifecycle ----------
+    def start(self):
+        if self.task is None:
+            self.task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        await self.flush()
+
+    async def _run(self):
+        while True:
+            backoff = self.retry_at - time.monotonic()
+            if backoff > 0:
+                await asyncio.sleep(backoff)  # DB failing: a full queue does not retry sooner
+            else:
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+            self.wakeup.clear()
+            await self.flush()
+
+    # ---------- flushing ----------
+    async def flush(self):
+        async with self.lock:
+            if not self.events and not self.updates:
+                return
+            events, self.events = self.events, []
+            updates, self.updates = self.updates, {}
+
+            start = time.perf_counter()
+            try:
+                await asyncio.to_thread(self._write, events, updates)
+            except Exception as e:
+                # Keep the batch for the next attempt
+                self.errors += 1
+                DB_ERRORS.inc()
+                self.events = events + self.events
+                for submission_id, update in updates.items():
+                    merged = self.updates.setdefault(submission_id, {"warnings": []})
+                    merged["warnings"][:0] = update.pop("warnings")
+                    for key, value in update.items():
+                        merged.setdefault(key, value)
+                    self._trim(merged)
+                self.failures += 1
+                delay = min(self.retry_backoff * 2 ** (self.failures - 1), self.retry_max_backoff)
+                self.retry_at = time.monotonic() + delay
+                print(f"Error flushing cheating events ({len(self.events)} waiting, {self.dropped} dropped, "
+                      f"retry in {delay:.1f}s): {e}")
+                return
+
+            self.failures = 0
+            self.retry_at = 0.0
+            elapsed = time.perf_counter() - start
+            self.flushes += 1
+            self.flushed_events += len(events)
+            self.flush_times.append(elapsed)
+            DB_FLUSH_SECONDS.observe(elapsed)
+            DB_EVENTS.inc(len(events))
+
+    def _trim(self, update):
+        """Drop the oldest queued events, and the update's oldest warnings, beyond retry_max_events"""
+        excess = len(self.events) - self.retry_max_events
+        if excess > 0:
+            del self.events[:excess]
+            self.dropped += excess
+            DB_DROPPED.inc(excess)
+        if len(update["warnings"]) > self.retry_max_events:
+            del update["warnings"][:-self.retry_max_events]
+
+    def _write(self, events, updates):
+        for event in events:
+            for kind in ("frame", "audio"):
+                data = event.pop(f"_{kind}", None)
+                if data is not None:
+                    event[f"{kind}_key"] = blob_store.put(data)
+
+        db = SessionLocal()
+        try:
+            if events:
+                db.bulk_insert_mappings(CheatingEvent, events)
+
+            if updates:
+                submissions = db.query(Submission).filter(
+                    Submission.id.in_(list(updates.keys()))
+                ).all()
+                for submission in submissions:
+                    update = updates[submission.id]
+                    warnings = update.get("warnings", [])
+                    if warnings:
+                        # reassign: in-place JSON mutation is not tracked
+                        submission.warnings = (submission.warnings or []) + warnings
+                    for key, value in update.items():
+                        if key != "warnings":
+                            setattr(submission, key, value)
+
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def stats(self):
+        return {
+            "queue_depth": len(self.events),
+            "pending_submissions": len(self.updates),
+            "flush_interval_ms": self.flush_interval * 1000,
+            "flush_max_events": self.flush_max_events,
+            "flushes": self.flushes,
+            "flushed_events": self.flushed_events,
+            "errors": self.errors,
+            "consecutive_failures": self.failures,
+            "retry_in_s": round(max(0.0, self.retry_at - time.monotonic()), 3),
+            "retry_max_events": self.retry_max_events,
+            "dropped_events": self.dropped,
+            "flush_latency_ms": summarize_ms(self.flush_times),
+        }
+
+
+# ===================== GLOBAL =====================
+event_sink = EventSink()
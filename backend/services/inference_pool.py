@@ -0,0 +1,336 @@
+"""
+ProctorVision Inference Worker Pool
+Runs the CPU-bound AI monitoring models off the asyncio event loop
+
+NOTE:
+- Each worker process owns its own FaceDetector / HeadPoseEstimator / PhoneDetector
+- Workers only run the stateless model pass; per-session scheduling and
+  violation decisions stay in the server process (ai_monitor.sessions)
+- Submissions are bounded by INFERENCE_QUEUE_DEPTH; extra work is rejected, not queued
+- Frames from concurrent students are micro-batched (up to INFERENCE_BATCH_SIZE frames
+  or INFERENCE_BATCH_MAX_WAIT_MS) so YOLO runs one batched call per job
+- INFERENCE_WORKERS=0 falls back to a single in-process thread (dev / debugging)
+- Every uvicorn worker runs its own pool, each with a full set of models in
+  RAM. The default INFERENCE_WORKERS shares the spare cores among them:
+  (cpu_count - 1) // WEB_CONCURRENCY, at least 1. Set WEB_CONCURRENCY to the
+  uvicorn --workers count (uvicorn reads it too), or set INFERENCE_WORKERS
+  per process explicitly
+- start() returns immediately: every worker loads its models in the background
+  and reports in; `ready` is set once all of them have
+- A worker that dies (e.g. a native crash in MediaPipe / OpenCV) breaks the whole
+  ProcessPoolExecutor; the broken pool is dropped and a new one started after
+  INFERENCE_RESTART_BACKOFF_S, doubling per consecutive crash up to
+  INFERENCE_RESTART_MAX_BACKOFF_S
+"""
+
+import asyncio
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from services.ai_monitoring import ai_monitor
+from services.metrics import INFERENCE_RESTARTS, INFERENCE_SECONDS
+from utils.helpers import summarize_ms
+
+
+# ===================== CONFIG =====================
+WEB_CONCURRENCY = max(1, int(os.getenv("WEB_CONCURRENCY", "1")))  # uvicorn worker processes on this host
+INFERENCE_WORKERS = int(os.getenv(
+    "INFERENCE_WORKERS", max(1, ((os.cpu_count() or 2) - 1) // WEB_CONCURRENCY)
+))
+INFERENCE_QUEUE_DEPTH = int(os.getenv("INFERENCE_QUEUE_DEPTH", "64"))
+INFERENCE_BATCH_SIZE = int(os.getenv("INFERENCE_BATCH_SIZE", "8"))
+INFERENCE_BATCH_MAX_WAIT_MS = float(os.getenv("INFERENCE_BATCH_MAX_WAIT_MS", "15"))
+INFERENCE_RESTART_BACKOFF_S = float(os.getenv("INFERENCE_RESTART_BACKOFF_S", "1"))
+INFERENCE_RESTART_MAX_BACKOFF_S = float(os.getenv("INFERENCE_RESTART_MAX_BACKOFF_S", "30"))
+LATENCY_WINDOW = 1000
+
+
+class InferenceQueueFull(Exception):
+    """Raised when the pool already holds INFERENCE_QUEUE_DEPTH pending frames"""
+
+
+# ===================== WORKER SIDE =====================
+_worker_monitor = None
+
+
+def _init_worker(ready_queue=None):
+    """Load this worker's own vision models; report load times and what is enabled"""
+    global _worker_monitor
+    _worker_monitor = ai_monitor
+    start = time.perf_counter()
+    ai_monitor.load(ai_monitor.VISION_STAGES)
+    if ready_queue is not None:
+        total = time.perf_counter() - start
+        ready_queue.put((os.getpid(), total, dict(ai_monitor.load_times), ai_monitor.status()["enabled"]))
+
+
+def _ping():
+    return os.getpid()
+
+
+def _run_frame_batch(items):
+    start = time.perf_counter()
+    analyses = _worker_monitor.analyse_frames(items)
+    return analyses, time.perf_counter() - start
+
+
+# ===================== EXECUTOR =====================
+class InferenceExecutor:
+    def __init__(
+        self,
+        workers=INFERENCE_WORKERS,
+        queue_depth=INFERENCE_QUEUE_DEPTH,
+        batch_size=INFERENCE_BATCH_SIZE,
+        batch_max_wait_ms=INFERENCE_BATCH_MAX_WAIT_MS,
+        restart_backoff_s=INFERENCE_RESTART_BACKOFF_S,
+        restart_max_backoff_s=INFERENCE_RESTART_MAX_BACKOFF_S
+    ):
+        self.workers = workers
+        self.queue_depth = queue_depth
+        self.batch_size = max(1, batch_size)
+        self.batch_max_wait = batch_max_wait_ms / 1000
+        self.restart_backoff = restart_backoff_s
+        self.restart_max_backoff = restart_max_backoff_s
+        self.pool = None
+        self.restart_handle = None  # pending start() after a crash
+        self.crashes = 0  # consecutive, reset by the next successful batch
+        self.restarts = 0
+        self.last_crash = None
+        self.ready = threading.Event()
+        self.started_at = 0.0
+        self.warmup_time = None  # seconds from start() until every worker had its models
+        self.worker_load_times = {}  # pid -> {"total": s, stage: s}
+        self.detectors = {}  # stage -> enabled, as reported by the workers
+
+        # frames collected for the next batch: (frame_data, plan, future)
+        self.batch = []
+        self.batch_timer = None
+        self.batch_tasks = set()
+
+        self.pending = 0
+        self.peak_pending = 0
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self.failed = 0
+        self.batches = 0
+        self.batched_frames = 0
+
+        # end-to-end (queue wait + inference) per frame and pure inference per batch, seconds
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.inference_times = deque(maxlen=LATENCY_WINDOW)
+        self.batch_sizes = deque(maxlen=LATENCY_WINDOW)
+
+    def start(self):
+        if self.pool is not None:
+            return
+        self.ready.clear()
+        self.started_at = time.perf_counter()
+        if self.workers > 0:
+            context = multiprocessing.get_context("spawn")
+            ready_queue = context.Queue()
+            self.pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(ready_queue,)
+            )
+        else:
+            # MediaPipe graphs are not thread-safe, so one thread only
+            ready_queue = queue.Queue()
+            self.pool = ThreadPoolExecutor(max_workers=1, initializer=_init_worker, initargs=(ready_queue,))
+
+        # workers are spawned on demand: one ping each brings them all up now
+        for _ in range(max(1, self.workers)):
+            self.pool.submit(_ping)
+        threading.Thread(
+            target=self._await_workers, args=(self.pool, ready_queue), name="inference-warmup", daemon=True
+        ).start()
+        print(f"✅ Inference pool started ({self.workers or 'in-process'} workers, "
+              f"queue depth {self.queue_depth}, batch {self.batch_size}/{self.batch_max_wait * 1000:g}ms), "
+              f"loading models in the background")
+
+    def _await_workers(self, pool, ready_queue):
+        """Collect each worker's ready report; sets `ready` once all are in"""
+        expected = max(1, self.workers)
+        while len(self.worker_load_times) < expected and self.pool is pool:
+            try:
+                pid, total, stages, enabled = ready_queue.get(timeout=1)
+            except queue.Empty:
+                continue
+            if self.pool is not pool:
+                break
+            self.worker_load_times[pid] = {"total": round(total, 3), **stages}
+            self.detectors = enabled
+            print(f"✅ Inference worker {pid} ready (models loaded in {total:.2f}s)")
+        if self.pool is pool:
+            self.warmup_time = time.perf_counter() - self.started_at
+            self.ready.set()
+            print(f"✅ Inference pool warm: {expected} worker(s) in {self.warmup_time:.2f}s")
+
+    def shutdown(self):
+        if self.restart_handle is not None:
+            self.restart_handle.cancel()
+            self.restart_handle = None
+        if self.batch_timer is not None:
+            self.batch_timer.cancel()
+            self.batch_timer = None
+        for _, _, future in self.batch:
+            if not future.done():
+                future.cancel()
+        self.batch = []
+        if self.pool is not None:
+            pool, self.pool = self.pool, None
+            pool.shutdown(wait=True, cancel_futures=True)
+        self.ready.clear()
+        self.worker_load_times = {}
+
+    async def process_frame(self, frame_data, session_key, exam_id=None):
+        if self.pending >= self.queue_depth:
+            self.rejected += 1
+            raise InferenceQueueFull(f"Inference queue full ({self.queue_depth} pending)")
+
+        if self.restart_handle is not None:
+            self.rejected += 1
+            raise InferenceQueueFull("Inference pool restarting after a worker crash")
+        self.start()
+        plan = ai_monitor.plan_frame(session_key, exam_id)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.pending += 1
+        self.peak_pending = max(self.peak_pending, self.pending)
+        self.submitted += 1
+        start = time.perf_counter()
+
+        self.batch.append((frame_data, plan, future))
+        if len(self.batch) >= self.batch_size:
+            self._flush_batch()
+        elif self.batch_timer is None:
+            self.batch_timer = loop.call_later(self.batch_max_wait, self._flush_batch)
+
+        try:
+            analysis = await future
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.pending -= 1
+
+        self.completed += 1
+        elapsed = time.perf_counter() - start
+        self.latencies.append(elapsed)
+        INFERENCE_SECONDS.observe(elapsed)
+        return ai_monitor.evaluate_frame(session_key, analysis)
+
+    def _flush_batch(self):
+        if self.batch_timer is not None:
+            self.batch_timer.cancel()
+            self.batch_timer = None
+        batch, self.batch = self.batch, []
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._run_batch(batch))
+            self.batch_tasks.add(task)
+            task.add_done_callback(self.batch_tasks.discard)
+
+    async def _run_batch(self, batch):
+        self.batches += 1
+        self.batched_frames += len(batch)
+        self.batch_sizes.append(len(batch))
+
+        items = [(frame_data, plan) for frame_data, plan, _ in batch]
+        if self.workers > 0:
+            # binary-protocol frames arrive as memoryviews, which cannot be pickled
+            items = [(bytes(f) if isinstance(f, memoryview) else f, plan) for f, plan in items]
+        pool = self.pool
+        try:
+            loop = asyncio.get_running_loop()
+            results, busy = await loop.run_in_executor(pool, _run_frame_batch, items)
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            if isinstance(e, BrokenExecutor):
+                self._restart(pool, e)
+            return
+
+        self.crashes = 0
+        self.inference_times.append(busy)
+        for (_, _, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def _restart(self, pool, error):
+        """Drop a broken pool and start a fresh one after the backoff"""
+        if self.pool is not pool or pool is None:
+            return  # another batch already handled this crash
+        self.pool = None
+        self.ready.clear()
+        self.worker_load_times = {}
+        pool.shutdown(wait=False, cancel_futures=True)
+
+        self.crashes += 1
+        self.restarts += 1
+        self.last_crash = str(error) or type(error).__name__
+        INFERENCE_RESTARTS.inc()
+        delay = min(self.restart_backoff * 2 ** (self.crashes - 1), self.restart_max_backoff)
+        print(f"⚠️ Inference pool broken ({self.last_crash}); restarting in {delay:g}s")
+        self.restart_handle = asyncio.get_running_loop().call_later(delay, self._restart_now)
+
+    def _restart_now(self):
+        self.restart_handle = None
+        self.start()
+
+    def stats(self):
+        in_flight = min(self.pending, max(self.workers, 1) * self.batch_size)
+        avg_batch = self.batched_frames / self.batches if self.batches else 0.0
+        return {
+            "workers": self.workers,
+            "running": self.pool is not None,
+            "ready": self.ready.is_set(),
+            "warmup_s": round(self.warmup_time, 3) if self.warmup_time is not None else None,
+            "worker_load_times": dict(self.worker_load_times),
+            "detectors": dict(self.detectors),
+            "restarts": {
+                "total": self.restarts,
+                "consecutive_crashes": self.crashes,
+                "pending": self.restart_handle is not None,
+                "last_error": self.last_crash,
+            },
+            "queue": {
+                "max_depth": self.queue_depth,
+                "pending": self.pending,
+                "in_flight": in_flight,
+                "waiting": self.pending - in_flight,
+                "peak": self.peak_pending,
+            },
+            "jobs": {
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "failed": self.failed,
+            },
+            "batching": {
+                "batch_size": self.batch_size,
+                "max_wait_ms": self.batch_max_wait * 1000,
+                "batches": self.batches,
+                "avg_batch_size": round(avg_batch, 2),
+                "occupancy": round(avg_batch / self.batch_size, 3),
+                "recent_max_batch": max(self.batch_sizes) if self.batch_sizes else 0,
+            },
+            "latency_ms": summarize_ms(self.latencies),
+            "inference_ms": summarize_ms(self.inference_times),
+        }
+
+
+# ===================== GLOBAL =====================
+inference_pool = InferenceExecutor()
+
+
+def monitoring_ready():
+    """Vision models are up in every worker and audio in this process"""
+    return inference_pool.ready.is_set() and ai_monitor.is_loaded(("audio",))
@@ -0,0 +1,229 @@
+"""
+ProctorVision Metrics
+Counters, gauges and histograms for the monitoring hot path, rendered in the
+Prometheus text exposition format at /metrics
+
+NOTE:
+- Updating a metric is a dict update under a lock: cheap enough for per-frame use
+- Model stages run in inference worker processes; their timings travel back
+  in each analysis and are observed here, in the server process
+- Gauges backed by a function are only evaluated when /metrics is scraped
+"""
+
+import threading
+from bisect import bisect_left
+
+
+# ===================== CONFIG =====================
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=""):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+# ===================== METRICS =====================
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.values = {}  # label values tuple -> value
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, "")) for name in self.labels)
+
+    def samples(self):
+        """(suffix, label values, extra label, value) tuples for rendering"""
+        with self._lock:
+            return [("", key, "", value) for key, value in self.values.items()]
+
+    def snapshot(self):
+        with self._lock:
+            if not self.labels:
+                return self.values.get((), 0)
+            return {",".join(key): value for key, value in self.values.items()}
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def __init__(self, name, help, labels=(), fn=None):
+        super().__init__(name, help, labels)
+        self.fn = fn  # unlabelled gauge read at scrape time
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self.values[key] = value
+
+    def samples(self):
+        if self.fn is not None:
+            return [("", (), "", self.fn())]
+        return super().samples()
+
+    def snapshot(self):
+        if self.fn is not None:
+            return self.fn()
+        return super().snapshot()
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self.values.get(key)
+            if series is None:
+                # per-bucket counts (last one is +Inf), sum, count
+                series = self.values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def samples(self):
+        out = []
+        with self._lock:
+            for key, (counts, total, count) in self.values.items():
+                cumulative = 0
+                for bound, n in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += n
+                    out.append(("_bucket", key, f'le="{_format_value(bound)}"', cumulative))
+                out.append(("_sum", key, "", total))
+                out.append(("_count", key, "", count))
+        return out
+
+    def snapshot(self):
+        """count and average in ms per label set"""
+        with self._lock:
+            summary = {
+                ",".join(key): {
+                    "count": count,
+                    "avg_ms": round(total / count * 1000, 3) if count else 0.0,
+                }
+                for key, (_, total, count) in self.values.items()
+            }
+        if not self.labels:
+            return summary.get("", {"count": 0, "avg_ms": 0.0})
+        return summary
+
+
+# ===================== REGISTRY =====================
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics = {}
+
+    def _register(self, metric):
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help, labels=()):
+        return self._register(Counter(name, help, labels))
+
+    def gauge(self, name, help, labels=(), fn=None):
+        return self._register(Gauge(name, help, labels, fn))
+
+    def histogram(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, help, labels, buckets))
+
+    def render(self):
+        """Text exposition format (version 0.0.4)"""
+        lines = []
+        for metric in self.metrics.values():
+            try:
+                samples = metric.samples()
+            except Exception:
+                continue  # a failing gauge callback must not break the scrape
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for suffix, key, extra, value in samples:
+                labels = _format_labels(metric.labels, key, extra)
+                lines.append(f"{metric.name}{suffix}{labels} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self):
+        """Plain dict of every metric, for JSON status endpoints"""
+        out = {}
+        for name, metric in self.metrics.items():
+            try:
+                out[name] = metric.snapshot()
+            except Exception:
+                out[name] = None
+        return out
+
+
+# ===================== GLOBAL =====================
+metrics = MetricsRegistry()
+
+FRAMES = metrics.counter(
+    "proctorvision_frames_total", "Frames evaluated, by outcome (analysed, unchanged, error)", ("outcome",)
+)
+FRAMES_DROPPED = metrics.counter(
+    "proctorvision_frames_dropped_total", "Frames never analysed (coalesced, queue_full, warming_up)", ("reason",)
+)
+AUDIO_CHUNKS = metrics.counter("proctorvision_audio_chunks_total", "Audio chunks run through VAD")
+VIOLATIONS = metrics.counter("proctorvision_violations_total", "Violations raised, by type", ("type",))
+SUPPRESSED = metrics.counter(
+    "proctorvision_violations_suppressed_total", "Raw signals held back by the temporal filter, by type", ("type",)
+)
+MESSAGES = metrics.counter(
+    "proctorvision_ws_messages_total", "Monitoring WebSocket messages received, by content", ("kind",)
+)
+STAGE_SECONDS = metrics.histogram(
+    "proctorvision_stage_seconds",
+    "Time per frame / chunk in each pipeline stage (decode, face, pose, phone, audio)",
+    ("stage",),
+)
+INFERENCE_SECONDS = metrics.histogram(
+    "proctorvision_inference_seconds", "Frame queue wait plus model pass in the inference pool"
+)
+INFERENCE_RESTARTS = metrics.counter(
+    "proctorvision_inference_pool_restarts_total", "Inference pools rebuilt after a worker crash"
+)
+PROCESS_SECONDS = metrics.histogram(
+    "proctorvision_ws_process_seconds", "One analysis pass of a monitoring connection, up to the feedback send"
+)
+WS_SEND_SECONDS = metrics.histogram(
+    "proctorvision_ws_send_seconds", "WebSocket send to a student, by message type", ("type",)
+)
+DB_FLUSH_SECONDS = metrics.histogram(
+    "proctorvision_db_flush_seconds", "Cheating event sink flush (bulk insert + submission updates)"
+)
+DB_EVENTS = metrics.counter("proctorvision_db_events_written_total", "Cheating events persisted")
+DB_ERRORS = metrics.counter("proctorvision_db_flush_errors_total", "Failed cheating event flushes")
+DB_DROPPED = metrics.counter(
+    "proctorvision_db_events_dropped_total", "Cheating events dropped from a full retry buffer while the DB was failing"
+)
@@ -0,0 +1,147 @@
+"""
+ProctorVision Proctor Hub
+Live violation / heartbeat fan-out to proctors watching an exam
+
+NOTE:
+- Every subscriber has its own bounded send queue and sender task, so one
+  slow proctor never blocks the monitoring pipeline or other proctors
+- Heartbeats are coalesced per student (only the newest is sent)
+- Other events drop the oldest queued message when the queue is full
+- A send that takes longer than PROCTOR_SEND_TIMEOUT closes the subscriber
+- The hub holds the connection backend's "exam:<id>" subscription while the
+  exam has local subscribers; every removal goes through unsubscribe()
+"""
+
+import asyncio
+import json
+import os
+from collections import deque
+from typing import Dict, Set
+
+
+# ===================== CONFIG =====================
+PROCTOR_QUEUE_SIZE = int(os.getenv("PROCTOR_QUEUE_SIZE", "256"))
+PROCTOR_SEND_TIMEOUT = float(os.getenv("PROCTOR_SEND_TIMEOUT", "5"))
+
+
+# ===================== SUBSCRIBER =====================
+class ProctorSubscriber:
+    def __init__(self, websocket, exam_id: str, max_queue: int = PROCTOR_QUEUE_SIZE):
+        self.websocket = websocket
+        self.exam_id = exam_id
+        self.max_queue = max_queue
+        self.events = deque()  # serialized non-heartbeat messages
+        self.heartbeats: Dict[str, str] = {}  # student_id -> newest serialized heartbeat
+        self.ready = asyncio.Event()
+        self.task = None
+        self.closed = False
+
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+
+    def push(self, message: dict, text: str):
+        if self.closed:
+            return
+        if message.get("type") == "heartbeat":
+            key = str(message.get("student_id"))
+            if key in self.heartbeats:
+                self.coalesced += 1
+            self.heartbeats[key] = text
+        else:
+            if message.get("type") == "student_disconnected":
+                # a stale heartbeat must not follow the disconnect
+                self.heartbeats.pop(str(message.get("student_id")), None)
+            if len(self.events) >= self.max_queue:
+                self.events.popleft()
+                self.dropped += 1
+            self.events.append(text)
+        self.ready.set()
+
+    def _next(self):
+        if self.events:
+            return self.events.popleft()
+        if self.heartbeats:
+            return self.heartbeats.pop(next(iter(self.heartbeats)))
+        return None
+
+    async def run(self):
+        try:
+            while not self.closed:
+                await self.ready.wait()
+                self.ready.clear()
+                text = self._next()
+                while text is not None and not self.closed:
+                    await asyncio.wait_for(self.websocket.send_text(text), timeout=PROCTOR_SEND_TIMEOUT)
+                    self.sent += 1
+                    text = self._next()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # too slow or gone: stop feeding this proctor
+            self.closed = True
+            try:
+                await self.websocket.close()
+            except Exception:
+                pass
+
+    def close(self):
+        self.closed = True
+        self.ready.set()
+        if self.task is not None:
+            self.task.cancel()
+
+
+# ===================== HUB =====================
+class ProctorHub:
+    def __init__(self, backend=None):
+        self.exams: Dict[str, Set[ProctorSubscriber]] = {}
+        self.backend = backend  # connection backend: exam channel subscriptions
+
+    def subscribe(self, exam_id: str, websocket) -> ProctorSubscriber:
+        subscriber = ProctorSubscriber(websocket, exam_id)
+        subscriber.task = asyncio.get_running_loop().create_task(subscriber.run())
+        if exam_id not in self.exams and self.backend is not None:
+            self.backend.subscribe(f"exam:{exam_id}")
+        self.exams.setdefault(exam_id, set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: ProctorSubscriber) -> bool:
+        """Close and remove a subscriber; returns True when that was the exam's last local one"""
+        subscriber.close()
+        watchers = self.exams.get(subscriber.exam_id)
+        if watchers is None or subscriber not in watchers:
+            return False
+        watchers.discard(subscriber)
+        if not watchers:
+            del self.exams[subscriber.exam_id]
+            if self.backend is not None:
+                self.backend.unsubscribe(f"exam:{subscriber.exam_id}")
+            return True
+        return False
+
+    def has_subscribers(self, exam_id: str) -> bool:
+        return bool(self.exams.get(exam_id))
+
+    def publish(self, exam_id: str, message: dict):
+        """Queue a message for every local proctor of the exam (never blocks)"""
+        watchers = self.exams.get(exam_id)
+        if not watchers:
+            return
+        text = json.dumps(message)
+        for subscriber in list(watchers):
+            if subscriber.closed:
+                self.unsubscribe(subscriber)
+            else:
+                subscriber.push(message, text)
+
+    def stats(self):
+        subscribers = [s for watchers in self.exams.values() for s in watchers]
+        return {
+            "exams": len(self.exams),
+            "subscribers": len(subscribers),
+            "queued": sum(len(s.events) + len(s.heartbeats) for s in subscribers),
+            "sent": sum(s.sent for s in subscribers),
+            "dropped": sum(s.dropped for s in subscribers),
+            "coalesced": sum(s.coalesced for s in subscribers),
+        }
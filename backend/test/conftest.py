@@ -0,0 +1,21 @@
+"""
+pytest setup for the backend tests
+Run from backend/:  python -m pytest test
+"""
+
+import os
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+# The engine and blob store bind at import time: point them at scratch space first
+SCRATCH_DIR = tempfile.mkdtemp(prefix="pv-test-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(SCRATCH_DIR, 'test.db')}"
+os.environ["EVIDENCE_DIR"] = os.path.join(SCRATCH_DIR, "evidence")
+os.environ["INFERENCE_WORKERS"] = "0"
+
+# script-style checks, run directly rather than collected
+collect_ignore = ["test_ai_detection.py"]
@@ -0,0 +1,130 @@
+from services.ai_monitoring import AIMonitoringSystem
+
+THUMB = bytes(32 * 24)
+
+
+def analysed(pose=True, phone=True, faces=1, yaw=0.0):
+    return {
+        "faces": faces, "face_confidence": 0.9, "yaw": yaw if pose else None, "phone": None,
+        "plan": {"pose": pose, "phone": phone}, "thumb": THUMB, "timings": {},
+    }
+
+
+def gated(pose=True, phone=True):
+    return {"unchanged": True, "plan": {"pose": pose, "phone": phone}, "thumb": THUMB, "timings": {}}
+
+
+def test_scheduler_counts_runs_after_the_motion_gate():
+    monitor = AIMonitoringSystem()
+    scheduler = monitor.scheduler
+
+    monitor.plan_frame("s:1", exam_id=1)
+    assert scheduler.stats()["runs"] == {"pose": 0, "phone": 0}  # planning alone runs nothing
+
+    monitor.evaluate_frame("s:1", analysed(pose=True, phone=True))
+    monitor.evaluate_frame("s:1", gated(pose=True, phone=False))
+    monitor.evaluate_frame("s:1", analysed(pose=False, phone=True))
+
+    stats = scheduler.stats()
+    assert stats["runs"] == {"pose": 1, "phone": 2}
+    assert stats["gated"] == {"pose": 1, "phone": 0}
+    assert stats["skipped"] == {"pose": 1, "phone": 1}
+
+
+def test_motion_gate_exam_counts_leave_with_their_sessions():
+    monitor = AIMonitoringSystem()
+    for exam_id in range(3):
+        key = f"s:{exam_id}"
+        monitor.plan_frame(key, exam_id=exam_id)
+        monitor.evaluate_frame(key, analysed())
+        monitor.evaluate_frame(key, gated())
+
+    stats = monitor.gate.stats(monitor.sessions.values())
+    assert stats["exams"]["1"] == {"frames": 2, "skipped": 1, "skip_rate": 0.5}
+
+    for exam_id in range(3):
+        monitor.forget(f"s:{exam_id}")
+    stats = monitor.stats()["motion_gate"]
+    assert stats["exams"] == {}
+    assert (stats["frames"], stats["skipped"]) == (6, 3)  # totals outlive the sessions
+
+
+# ---------- audio ----------
+class SpeechVad:
+    """webrtcvad double: every frame it is asked about is speech"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def is_speech(self, frame, sample_rate):
+        self.calls += 1
+        return True
+
+
+def pcm(amplitude, seconds=1.0, sample_rate=16000):
+    import numpy as np
+
+    t = np.arange(int(sample_rate * seconds)) / sample_rate
+    return (amplitude * np.sin(2 * np.pi * 220 * t)).astype("<i2").tobytes()
+
+
+def test_audio_energy_gate_keeps_silence_from_the_vad():
+    monitor = AIMonitoringSystem()
+    monitor.load(("audio",))
+    analyzer = monitor.audio
+    analyzer.vad = SpeechVad()
+    floor = analyzer.energy_threshold
+
+    # a quiet room: below the RMS floor (sine RMS = amplitude / sqrt(2))
+    result = monitor.process_audio_batch([bytes(3200), pcm(floor)], "s:audio")
+    assert result["violations"] == []
+    assert analyzer.vad.calls == 0
+    assert analyzer.gated == analyzer.frames > 0 and analyzer.speech_frames == 0
+
+    monitor.forget("s:audio")  # fresh speech window
+    result = monitor.process_audio_batch([pcm(floor * 20)], "s:audio")
+    assert [v["type"] for v in result["violations"]] == ["voice_detected"]
+    assert analyzer.vad.calls == analyzer.speech_frames == analyzer.frames - analyzer.gated > 0
+
+
+# ---------- temporal filter ----------
+def phone_frame(seen):
+    """Analysis where only the phone stage ran"""
+    return {"faces": None, "yaw": None, "phone": (seen, 0.8, 0.1) if seen is not None else None}
+
+
+def phone_violations(temporal, context, pattern):
+    """Violations emitted per frame for a pattern like "x.x" (x: phone seen, .: clear, -: stage skipped)"""
+    seen = {"x": True, ".": False, "-": None}
+    return [len(temporal.frame(context, phone_frame(seen[c]))[0]) for c in pattern]
+
+
+def test_temporal_filter_ignores_a_single_spurious_frame():
+    from services.ai_monitoring import MonitoringContext, TemporalFilter
+
+    temporal = TemporalFilter(alpha=1.0, min_frames={"phone_detected": 3}, cooldowns={"phone_detected": 0})
+    assert phone_violations(temporal, MonitoringContext(), ".x..x.x.") == [0] * 8
+    assert temporal.stats()["signals"] == {"phone_detected": 3}
+    assert temporal.stats()["emitted"] == {}
+
+
+def test_temporal_filter_emits_once_per_streak_within_the_cooldown():
+    from services.ai_monitoring import MonitoringContext, TemporalFilter
+
+    temporal = TemporalFilter(alpha=1.0, min_frames={"phone_detected": 3}, cooldowns={"phone_detected": 60})
+    context = MonitoringContext()
+    # a skipped stage neither extends nor breaks the streak
+    assert phone_violations(temporal, context, "x-x-xxxxx") == [0, 0, 0, 0, 1, 0, 0, 0, 0]
+    assert phone_violations(temporal, context, ".xxxx") == [0] * 5  # still cooling down
+    assert temporal.stats()["emitted"] == {"phone_detected": 1}
+
+
+def test_temporal_filter_clears_after_a_quiet_frame():
+    from services.ai_monitoring import MonitoringContext, TemporalFilter
+
+    temporal = TemporalFilter(alpha=1.0, min_frames={"phone_detected": 3}, cooldowns={"phone_detected": 0})
+    context = MonitoringContext()
+    assert phone_violations(temporal, context, "xx.xx.xxx") == [0, 0, 0, 0, 0, 0, 0, 0, 1]
+    assert phone_violations(temporal, context, ".") == [0]
+    assert context.tracker.counts["phone_detected"] == 0 and context.phone_confidence is None
+    assert phone_violations(temporal, context, "xxx") == [0, 0, 1]  # a new streak, counted from zero
@@ -0,0 +1,47 @@
+import uuid
+
+from database.database import Base, SessionLocal, engine
+from database.models import User
+from services.dashboard_stats import DashboardStats
+
+
+def add_student():
+    db = SessionLocal()
+    try:
+        db.add(User(email=f"{uuid.uuid4().hex}@example.com", name="Student",
+                    hashed_password="x", role="student"))
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_commit_during_reconcile_is_not_lost():
+    Base.metadata.create_all(bind=engine)
+    stats = DashboardStats(reconcile_interval=0, reconcile_on_read=False)
+    stats.install()
+    before = dict(stats.reconcile())
+
+    compute = stats.compute
+
+    def racing_compute(db):
+        result = compute(db)
+        add_student()  # commits after the counting query already ran
+        return result
+
+    stats.compute = racing_compute
+    counts = stats.reconcile()
+    assert counts["users"] == before["users"] + 1
+    assert counts["students"] == before["students"] + 1
+    assert stats.raced == 1
+
+    stats.compute = compute
+    assert stats.reconcile() == stats.snapshot()
+
+
+def test_reconcile_on_read():
+    Base.metadata.create_all(bind=engine)
+    stats = DashboardStats(reconcile_interval=0, reconcile_on_read=True)
+    first = stats.snapshot()
+    add_student()  # not installed: only a reconcile can see it
+    assert stats.snapshot()["users"] == first["users"] + 1
+    assert stats.reconciles == 2
@@ -0,0 +1,64 @@
+import asyncio
+import time
+
+from services.event_sink import EventSink
+
+
+def violation(n):
+    return {"type": "looking_away", "severity": "medium", "confidence": 0.9, "n": n}
+
+
+def test_failing_flush_is_capped_and_backs_off():
+    async def scenario():
+        sink = EventSink(retry_max_events=3, retry_backoff_ms=100, retry_max_backoff_ms=250)
+        written = []
+
+        def failing_write(events, updates):
+            raise RuntimeError("database is locked")
+
+        sink._write = failing_write
+        for n in range(2):
+            sink.record(7, [violation(n)], cheating_count=n + 1)
+        await sink.flush()
+        assert sink.failures == 1 and 0 < sink.stats()["retry_in_s"] <= 0.1
+
+        for n in range(2, 5):
+            sink.record(7, [violation(n)], cheating_count=n + 1)
+        assert len(sink.events) == 3 and sink.dropped == 2
+        assert [w["n"] for w in sink.updates[7]["warnings"]] == [2, 3, 4]
+
+        await sink.flush()
+        await sink.flush()
+        assert sink.failures == 3 and sink.retry_at - time.monotonic() <= 0.25
+        assert len(sink.events) == 3
+
+        sink._write = lambda events, updates: written.append((events, updates))
+        await sink.flush()
+        assert sink.failures == 0 and sink.retry_at == 0.0
+        events, updates = written[0]
+        assert len(events) == 3 and updates[7]["cheating_count"] == 5
+
+    asyncio.run(scenario())
+
+
+def test_run_waits_out_the_backoff():
+    async def scenario():
+        sink = EventSink(flush_interval_ms=10, retry_backoff_ms=300)
+        attempts = []
+
+        def failing_write(events, updates):
+            attempts.append(len(events))
+            raise RuntimeError("database is locked")
+
+        sink._write = failing_write
+        sink.record(7, [violation(0)], cheating_count=1)
+        sink.start()
+        await asyncio.sleep(0.2)
+        for n in range(1, 5):
+            sink.record(7, [violation(n)], cheating_count=n + 1)
+        sink.wakeup.set()  # a full queue does not cut the backoff short
+        await asyncio.sleep(0.05)
+        assert len(attempts) == 1
+        sink.task.cancel()
+
+    asyncio.run(scenario())
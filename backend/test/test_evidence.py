@@ -0,0 +1,55 @@
+import pytest
+from fastapi import HTTPException
+
+from api.routes.admin import byte_range
+from services.blob_store import BlobStore
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ("bytes=0-99", (0, 99)),
+    ("bytes=10-", (10, 99)),
+    ("bytes=90-500", (90, 99)),  # end clamped to the blob
+    ("bytes=-10", (90, 99)),  # last 10 bytes
+    ("bytes=-500", (0, 99)),
+    ("bytes=10-5", None),  # invalid: ignored, full response
+    ("bytes=5", None),
+    ("bytes=-", None),
+    ("bytes=a-b", None),
+    ("bytes=--5", None),
+    ("bytes=0-1,5-6", None),  # multiple ranges: full response
+    ("items=0-5", None),
+])
+def test_byte_range(header, expected):
+    assert byte_range(header, 100) == expected
+
+
+@pytest.mark.parametrize("header, size", [
+    ("bytes=100-", 100),
+    ("bytes=150-200", 100),
+    ("bytes=-0", 100),
+    ("bytes=0-10", 0),
+])
+def test_byte_range_not_satisfiable(header, size):
+    with pytest.raises(HTTPException) as error:
+        byte_range(header, size)
+    assert error.value.status_code == 416
+    assert error.value.headers["Content-Range"] == f"bytes */{size}"
+
+
+def test_blob_store_roundtrip_and_dedup(tmp_path):
+    store = BlobStore(tmp_path)
+    key = store.put(b"\xff\xd8frame")
+    assert store.put(b"\xff\xd8frame") == key
+    assert store.stats()["written"] == 1 and store.stats()["deduplicated"] == 1
+    assert store.path(key) == str(tmp_path / key[:2] / key[2:4] / key)
+    assert store.read(key) == b"\xff\xd8frame" and store.media_type(key) == "image/jpeg"
+    assert b"".join(store.iter_range(key, 2, 4, chunk_size=2)) == b"fra"
+
+
+@pytest.mark.parametrize("key", ["", None, "../../etc/passwd", "A" * 64, "0" * 63, "0" * 64 + "/x"])
+def test_blob_store_rejects_bad_keys(tmp_path, key):
+    store = BlobStore(tmp_path)
+    with pytest.raises(ValueError):
+        store.path(key)
+    assert store.exists(key) is False
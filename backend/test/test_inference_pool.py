@@ -0,0 +1,35 @@
+import asyncio
+import os
+import signal
+
+import pytest
+
+from services.inference_pool import InferenceExecutor, InferenceQueueFull
+
+
+def test_pool_restarts_after_worker_crash():
+    async def scenario():
+        pool = InferenceExecutor(workers=1, batch_size=1, restart_backoff_s=0.1)
+        try:
+            pool.start()
+            assert await asyncio.to_thread(pool.ready.wait, 120)
+            broken = pool.pool
+            for pid in list(pool.worker_load_times):
+                os.kill(pid, signal.SIGKILL)  # what a native segfault looks like to the pool
+
+            with pytest.raises(Exception):
+                await pool.process_frame(b"not a jpeg", "crash-test")
+            assert pool.pool is None and not pool.ready.is_set()
+            assert pool.stats()["restarts"]["total"] == 1
+            with pytest.raises(InferenceQueueFull):
+                await pool.process_frame(b"not a jpeg", "crash-test")  # still backing off
+
+            await asyncio.sleep(0.3)
+            assert pool.pool is not None and pool.pool is not broken
+            assert await asyncio.to_thread(pool.ready.wait, 120)
+            await pool.process_frame(b"not a jpeg", "crash-test")  # served again
+            assert pool.stats()["restarts"]["consecutive_crashes"] == 0
+        finally:
+            pool.shutdown()
+
+    asyncio.run(scenario())
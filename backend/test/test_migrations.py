@@ -0,0 +1,70 @@
+from sqlalchemy import create_engine, inspect, text
+
+from database.migrations import MIGRATIONS, QUERY_INDEXES, SEARCH_REPORT_INDEXES, run_migrations
+
+# cheating_events as it was before the blob store, plus the tables the index step touches
+LEGACY_SCHEMA = (
+    "CREATE TABLE users (id INTEGER PRIMARY KEY, email VARCHAR, name VARCHAR, hashed_password VARCHAR, "
+    "role VARCHAR, status VARCHAR, created_at DATETIME, last_login DATETIME)",
+    "CREATE TABLE exams (id INTEGER PRIMARY KEY, exam_code VARCHAR, title VARCHAR, description TEXT, "
+    "duration INTEGER, questions JSON, teacher_id INTEGER, is_active BOOLEAN, access_type VARCHAR, "
+    "allowed_students JSON, created_at DATETIME)",
+    "CREATE TABLE submissions (id INTEGER PRIMARY KEY, exam_id INTEGER, student_id INTEGER, answers JSON, "
+    "score FLOAT, total_marks FLOAT, percentage FLOAT, cheating_count INTEGER, warnings JSON, "
+    "started_at DATETIME, submitted_at DATETIME, status VARCHAR, auto_submitted BOOLEAN, "
+    "auto_submit_reason VARCHAR)",
+    "CREATE TABLE cheating_events (id INTEGER PRIMARY KEY, submission_id INTEGER, event_type VARCHAR, "
+    "severity VARCHAR, confidence FLOAT, timestamp DATETIME, frame_data TEXT, audio_data TEXT)",
+    "CREATE TABLE system_logs (id INTEGER PRIMARY KEY, user_id INTEGER, action VARCHAR, details JSON, "
+    "ip_address VARCHAR, user_agent VARCHAR, timestamp DATETIME)",
+    "INSERT INTO cheating_events (id, submission_id, event_type, frame_data) VALUES (1, 1, 'phone_detected', 'aGk=')",
+)
+
+
+def legacy_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as connection:
+        for statement in LEGACY_SCHEMA:
+            connection.execute(text(statement))
+    return engine
+
+
+def test_evidence_keys_added_to_legacy_schema(tmp_path):
+    engine = legacy_engine(tmp_path)
+    assert run_migrations(engine) == [number for number, _ in MIGRATIONS]
+
+    columns = {column["name"] for column in inspect(engine).get_columns("cheating_events")}
+    assert {"frame_key", "audio_key", "frame_data"} <= columns
+    with engine.connect() as connection:
+        row = connection.execute(text("SELECT frame_data, frame_key FROM cheating_events")).one()
+    assert tuple(row) == ("aGk=", None)  # existing rows keep their data
+
+
+def test_migrations_run_once(tmp_path):
+    engine = legacy_engine(tmp_path)
+    run_migrations(engine)
+    assert run_migrations(engine) == []
+    with engine.connect() as connection:
+        versions = connection.execute(text("SELECT version FROM schema_version ORDER BY version")).scalars().all()
+    assert versions == [number for number, _ in MIGRATIONS]
+
+
+def test_query_indexes_added_to_legacy_schema(tmp_path):
+    engine = legacy_engine(tmp_path)
+    run_migrations(engine)
+
+    with engine.connect() as connection:
+        indexes = dict(connection.execute(
+            text("SELECT name, sql FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL")
+        ).all())
+    assert set(QUERY_INDEXES) | set(SEARCH_REPORT_INDEXES) <= set(indexes)
+    assert "WHERE cheating_count > 0" in indexes["ix_submissions_cheating_count"]
+    assert "lower(name)" in indexes["ix_users_name_lower"]
+
+
+def test_index_steps_tolerate_existing_indexes(tmp_path):
+    from database.database import Base
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+    Base.metadata.create_all(bind=engine)  # already has every index, expression ones included
+    assert run_migrations(engine) == [number for number, _ in MIGRATIONS]
@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import Column, DateTime, Integer, String, create_engine
+from sqlalchemy.orm import declarative_base, sessionmaker
+
+from utils.pagination import decode_cursor, encode_cursor, keyset_page
+
+Base = declarative_base()
+
+
+class Row(Base):
+    __tablename__ = "rows"
+    id = Column(Integer, primary_key=True)
+    created_at = Column(DateTime, nullable=False)
+    name = Column(String, nullable=False)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    start = datetime(2026, 1, 1)
+    # sort value ties (three rows per timestamp) exercise the id tie-breaker
+    session.add_all(Row(id=i, created_at=start + timedelta(minutes=i // 3), name=f"n{i % 4}")
+                    for i in range(1, 24))
+    session.commit()
+    yield session
+    session.close()
+
+
+@pytest.mark.parametrize("value", [datetime(2026, 5, 1, 12, 30, 15, 250), 42, "Alice"])
+def test_cursor_roundtrip(value):
+    cursor = encode_cursor(value, 17)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (value, 17)
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", encode_cursor(1, 2)[:-3], "eyJ2IjogMX0"])
+def test_invalid_cursor(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+@pytest.mark.parametrize("column, descending", [
+    (Row.created_at, True), (Row.created_at, False), (Row.name, False), (Row.name, True),
+])
+def test_pages_cover_every_row_once(db, column, descending):
+    key = lambda row: (getattr(row, column.key), row.id)
+    expected = [row.id for row in sorted(db.query(Row).all(), key=key, reverse=descending)]
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        rows, cursor = keyset_page(db.query(Row), column, Row.id, cursor, descending, 5, key)
+        seen += [row.id for row in rows]
+        pages += 1
+        if cursor is None:
+            break
+    assert seen == expected
+    assert pages == 5  # 23 rows, 5 per page; no empty trailing page
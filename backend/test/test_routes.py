@@ -0,0 +1,70 @@
+from fastapi.testclient import TestClient
+
+import main
+
+
+def test_monitoring_routes_mounted_once():
+    paths = {route.path for route in main.app.routes}
+    assert "/api/monitoring/status" in paths
+    assert "/api/monitoring/inference" in paths
+    assert not any(path.startswith("/api/monitoring/monitoring") for path in paths)
+
+
+def test_monitoring_status_served():
+    client = TestClient(main.app)
+    assert client.get("/api/monitoring/inference").status_code == 200
+    assert client.get("/api/monitoring/monitoring/status").status_code == 404
+
+
+def admin_client():
+    import uuid
+    from database.database import Base, SessionLocal, engine
+    from database.models import Exam, User
+    from services.auth_service import create_access_token
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        tag = uuid.uuid4().hex[:8]
+        admin = User(email=f"admin-{tag}@example.com", name="Admin", hashed_password="x", role="admin")
+        teacher = User(email=f"teacher-{tag}@example.com", name="Teacher", hashed_password="x", role="teacher")
+        db.add_all([admin, teacher])
+        db.flush()
+        db.add_all(User(email=f"s{n}-{tag}@example.com", name=f"S{n}", hashed_password="x", role="student")
+                   for n in range(3))
+        db.add_all(Exam(exam_code=f"{tag}{n}", title=f"Exam {n}", duration=30, questions=[],
+                        teacher_id=teacher.id) for n in range(3))
+        db.commit()
+        counts = {"users": db.query(User).count(), "exams": db.query(Exam).count()}
+        token = create_access_token({"sub": admin.email, "user_id": admin.id, "role": "admin"})
+    finally:
+        db.close()
+    client = TestClient(main.app)
+    client.headers["Authorization"] = f"Bearer {token}"
+    return client, counts
+
+
+def test_admin_listings_unpaged_without_limit_or_cursor(monkeypatch):
+    from api.routes import admin
+    monkeypatch.setattr(admin, "ADMIN_PAGE_SIZE", 2)
+    client, counts = admin_client()
+
+    for listing in ("users", "exams"):
+        response = client.get(f"/api/admin/{listing}")
+        assert response.status_code == 200
+        assert len(response.json()) == counts[listing] > 2  # the admin UI loads the whole list
+        assert "X-Next-Cursor" not in response.headers
+
+        page = client.get(f"/api/admin/{listing}", params={"limit": 2})
+        assert len(page.json()) == 2
+        rest = client.get(f"/api/admin/{listing}", params={"cursor": page.headers["X-Next-Cursor"]})
+        assert len(rest.json()) == min(2, counts[listing] - 2)  # cursor alone pages at ADMIN_PAGE_SIZE
+        assert not {row["id"] for row in rest.json()} & {row["id"] for row in page.json()}
+
+
+def test_admin_user_search_matches_name_or_email_prefix():
+    client, _ = admin_client()
+    names = {user["name"] for user in client.get("/api/admin/users", params={"search": "s1"}).json()}
+    assert names == {"S1"}  # name prefix, case-insensitive; "S0", "S2" and other emails do not match
+    emails = [user["email"] for user in client.get("/api/admin/users", params={"search": "TEACHER-"}).json()]
+    assert emails and all(email.startswith("teacher-") for email in emails)
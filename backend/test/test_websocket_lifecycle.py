@@ -0,0 +1,290 @@
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from api.routes.websocket import StreamMailbox, manager
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_mailbox_keeps_newest_frame_and_drains():
+    async def scenario():
+        mailbox = StreamMailbox(audio_size=2)
+        mailbox.put({"frame": b"old", "sequence": 1})
+        mailbox.put({"frame": b"new", "audio": b"a1", "sequence": 2})
+        mailbox.put({"audio": b"a2", "is_focused": False})
+        mailbox.put({"audio": b"a3"})
+        data = await mailbox.take()
+        assert data["frame"] == b"new" and data["sequence"] == 2
+        assert data["audio"] == [b"a2", b"a3"] and data["focus_events"] == [False]
+        assert mailbox.dropped_frames == 1 and mailbox.dropped_audio == 1
+
+        mailbox.close()
+        assert await mailbox.take() is None
+
+    asyncio.run(scenario())
+
+
+def test_reconnect_keeps_the_new_connection():
+    calls = []
+    original = manager.disconnect
+
+    def recording_disconnect(student_id, websocket):
+        original(student_id, websocket)
+        calls.append(websocket)
+
+    manager.disconnect = recording_disconnect
+    try:
+        with TestClient(main.app) as client:
+            first = client.websocket_connect("/ws/monitoring/501/9")
+            first.__enter__()
+            assert wait_for(lambda: "501" in manager.contexts)
+            old_context = manager.contexts["501"]
+
+            with client.websocket_connect("/ws/monitoring/501/9"):
+                assert wait_for(lambda: manager.contexts.get("501") is not old_context)
+                new_context = manager.contexts["501"]
+
+                first.__exit__(None, None, None)  # the old socket's cleanup runs last
+                assert wait_for(lambda: len(calls) == 1)
+                assert manager.contexts.get("501") is new_context
+                assert manager.active_connections.get("501") is new_context.websocket
+                assert not new_context.mailbox.closed
+                assert "student:501" in manager.backend.channels
+
+            assert wait_for(lambda: len(calls) == 2)
+            assert "501" not in manager.contexts and "501" not in manager.active_connections
+            assert new_context.mailbox.closed
+            assert "student:501" not in manager.backend.channels
+    finally:
+        manager.disconnect = original
+
+
+def test_session_key_survives_resolving_the_submission():
+    from datetime import datetime
+
+    from api.routes.websocket import ConnectionContext
+    from database.database import Base, SessionLocal, engine
+    from database.models import Submission
+    from services.ai_monitoring import ai_monitor
+
+    Base.metadata.create_all(bind=engine)
+    context = ConnectionContext("611", "12")
+    assert context.resolve_submission() is None  # not started yet
+    key = context.session_key
+    ai_monitor.sessions.get(key).yaw = 25.0  # detector state built up mid-stream
+
+    db = SessionLocal()
+    db.add(Submission(exam_id=12, student_id=611, answers=[], started_at=datetime.utcnow()))
+    db.commit()
+    db.close()
+
+    assert context.resolve_submission() is not None
+    assert context.session_key == key
+    assert ai_monitor.sessions.peek(key).yaw == 25.0
+
+
+class RecordingBackend:
+    """Connection backend double: records subscriptions and bus messages"""
+
+    def __init__(self, remote=()):
+        self.channels = set()
+        self.remote = set(remote)
+        self.published = []
+
+    def subscribe(self, channel):
+        self.channels.add(channel)
+
+    def unsubscribe(self, channel):
+        self.channels.discard(channel)
+
+    def has_remote_subscribers(self, channel):
+        return channel in self.remote
+
+    async def publish(self, channel, message):
+        self.published.append((channel, message))
+
+
+class SilentSocket:
+    async def send_text(self, text):
+        pass
+
+    async def close(self):
+        pass
+
+
+def test_dropped_proctor_releases_the_exam_channel():
+    from services.proctor_hub import ProctorHub
+
+    async def scenario():
+        backend = RecordingBackend()
+        hub = ProctorHub(backend)
+        first = hub.subscribe("12", SilentSocket())
+        second = hub.subscribe("12", SilentSocket())
+        assert backend.channels == {"exam:12"}
+
+        first.closed = True  # send failed / timed out
+        hub.publish("12", {"type": "violation"})
+        assert "exam:12" in backend.channels
+
+        second.closed = True
+        hub.publish("12", {"type": "violation"})
+        assert backend.channels == set() and not hub.has_subscribers("12")
+        assert hub.unsubscribe(second) is False  # already removed: no double unsubscribe
+
+    asyncio.run(scenario())
+
+
+def test_exam_events_reach_the_bus_only_when_watched(monkeypatch):
+    from api.routes import websocket as ws_module
+    from api.routes.websocket import ConnectionManager
+
+    monkeypatch.setattr(ws_module, "PROCTOR_HEARTBEAT_INTERVAL", 0.05)
+
+    def heartbeat(student_id, warnings):
+        return {"type": "heartbeat", "student_id": student_id, "total_warnings": warnings}
+
+    async def scenario():
+        backend = RecordingBackend(remote={"exam:12"})
+        manager = ConnectionManager(backend)
+
+        manager.publish_exam_event("99", {"type": "violation", "student_id": "1"})
+        manager.publish_exam_event("99", heartbeat("1", 0))
+        await asyncio.sleep(0.1)
+        assert backend.published == []  # nobody watches exam 99 anywhere
+
+        for warnings in range(3):
+            manager.publish_exam_event("12", heartbeat("1", warnings))
+            manager.publish_exam_event("12", heartbeat("2", warnings))
+        manager.publish_exam_event("12", heartbeat("3", 0))
+        manager.publish_exam_event("12", {"type": "student_disconnected", "student_id": "3"})
+        await asyncio.sleep(0)
+        assert backend.published == [
+            ("exam:12", {"kind": "proctor", "event": {"type": "student_disconnected", "student_id": "3"}})
+        ]
+
+        await asyncio.sleep(0.1)
+        channel, batch = backend.published[1]
+        assert channel == "exam:12" and batch["kind"] == "heartbeats"
+        assert batch["events"] == [heartbeat("1", 2), heartbeat("2", 2)]  # newest per student, one write
+        assert len(backend.published) == 2
+
+    asyncio.run(scenario())
+
+
+# ---------- binary protocol ----------
+def binary_message(msg_type, payload=b"", sequence=0, timestamp=0):
+    from api.routes.websocket import BINARY_HEADER
+    return BINARY_HEADER.pack(msg_type, sequence, timestamp) + payload
+
+
+def test_decode_binary_message_types():
+    from api.routes.websocket import MSG_AUDIO, MSG_FOCUS, MSG_FRAME, decode_binary_message
+
+    data = decode_binary_message(binary_message(MSG_FRAME, b"\xff\xd8jpeg", 2**32 - 1, 1_700_000_000_123))
+    assert (data["sequence"], data["timestamp"]) == (2**32 - 1, 1_700_000_000_123)
+    assert isinstance(data["frame"], memoryview) and bytes(data["frame"]) == b"\xff\xd8jpeg"
+
+    assert bytes(decode_binary_message(binary_message(MSG_AUDIO, b"\x01\x00" * 4, 5))["audio"]) == b"\x01\x00" * 4
+    assert decode_binary_message(binary_message(MSG_FOCUS, b"\x00"))["is_focused"] is False
+    assert decode_binary_message(binary_message(MSG_FOCUS, b"\x01"))["is_focused"] is True
+    assert decode_binary_message(binary_message(MSG_FOCUS))["is_focused"] is True  # empty payload
+    assert bytes(decode_binary_message(binary_message(MSG_FRAME))["frame"]) == b""  # header only
+
+
+@pytest.mark.parametrize("message", [b"", b"\x01", binary_message(1)[:-1]])
+def test_decode_binary_message_rejects_truncated_header(message):
+    from api.routes.websocket import decode_binary_message
+
+    with pytest.raises(ValueError, match="shorter than header"):
+        decode_binary_message(message)
+
+
+@pytest.mark.parametrize("msg_type", [0, 4, 255])
+def test_decode_binary_message_rejects_unknown_type(msg_type):
+    from api.routes.websocket import decode_binary_message
+
+    with pytest.raises(ValueError, match="Unknown binary message type"):
+        decode_binary_message(binary_message(msg_type, b"payload"))
+
+
+def test_mailbox_keeps_newest_binary_sequence():
+    from api.routes.websocket import MSG_FOCUS, MSG_FRAME, decode_binary_message
+
+    async def scenario():
+        mailbox = StreamMailbox()
+        mailbox.put(decode_binary_message(binary_message(MSG_FRAME, b"a", 10, 1000)))
+        mailbox.put(decode_binary_message(binary_message(MSG_FRAME, b"b", 11, 1033)))
+        mailbox.put(decode_binary_message(binary_message(MSG_FOCUS, b"\x00", 12, 1040)))
+        data = await mailbox.take()
+        assert bytes(data["frame"]) == b"b" and data["focus_events"] == [False]
+        assert (data["sequence"], data["timestamp"]) == (12, 1040)
+        assert mailbox.dropped_frames == 1
+
+    asyncio.run(scenario())
+
+
+def test_binary_stream_survives_malformed_messages():
+    from api.routes.websocket import BINARY_SUBPROTOCOL, MSG_FOCUS
+
+    client = TestClient(main.app)  # no lifespan needed: the in-process backend is always ready
+    with client.websocket_connect("/ws/monitoring/606/9", subprotocols=[BINARY_SUBPROTOCOL]) as ws:
+        assert wait_for(lambda: "606" in manager.contexts)
+        context = manager.contexts["606"]
+        ws.send_bytes(b"\x01\x02")  # truncated header
+        ws.send_bytes(binary_message(9, b"x", 6))  # unknown type
+        ws.send_bytes(binary_message(MSG_FOCUS, b"\x01", 7, 1234))
+        assert wait_for(lambda: context.mailbox.sequence == 7)
+        assert manager.contexts.get("606") is context  # still connected
+
+
+# ---------- frame decoding ----------
+def jpeg(width, height):
+    import cv2
+    import numpy as np
+
+    ok, buf = cv2.imencode(".jpg", np.full((height, width, 3), 128, np.uint8))
+    assert ok
+    return buf.tobytes()
+
+
+@pytest.mark.parametrize("width, target, flag_name, decoded_width", [
+    (1280, 320, "IMREAD_REDUCED_COLOR_4", 320),
+    (1280, 640, "IMREAD_REDUCED_COLOR_2", 640),
+    (2560, 320, "IMREAD_REDUCED_COLOR_8", 320),
+    (1280, 400, "IMREAD_REDUCED_COLOR_2", 640),  # never below the target width
+    (300, 320, "IMREAD_COLOR", 300),
+    (1280, 0, "IMREAD_COLOR", 1280),  # reduction disabled
+])
+def test_frame_decoder_picks_the_reduction_by_width(width, target, flag_name, decoded_width):
+    import cv2
+    from services.ai_monitoring import FrameDecoder
+
+    decoder = FrameDecoder(target_width=target)
+    data = jpeg(width, width * 3 // 4)
+    assert decoder.decode_flag(memoryview(data)) == getattr(cv2, flag_name)
+    frame = decoder.decode(memoryview(data))  # binary payloads arrive as memoryviews
+    assert frame.shape[1] == decoded_width
+
+
+def test_frame_decoder_rejects_unreadable_frames():
+    import base64
+    from services.ai_monitoring import FrameDecoder
+
+    decoder = FrameDecoder(target_width=320)
+    data = jpeg(640, 480)
+    assert decoder.decode(b"not a jpeg") is None
+    assert decoder.decode(data[:20]) is None  # cut before the image data
+    assert decoder.decode("data:image/jpeg;base64,!!!") is None
+    assert decoder.decode("data:image/jpeg;base64," + base64.b64encode(data).decode()).shape[1] == 320
+    assert decoder.frames == 1
@@ -63,4 +63,18 @@ def image_to_base64(image_bytes):
     try:
         return base64.b64encode(image_bytes).decode('utf-8')
     except:
-        return None
\ No newline at end of file
+        return None
+
+def summarize_ms(samples):
+    """avg / p50 / p95 / p99 / max in milliseconds for a list of durations in seconds"""
+    if not samples:
+        return {"avg": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    ordered = sorted(samples)
+    last = len(ordered) - 1
+    return {
+        "avg": round(sum(ordered) / len(ordered) * 1000, 2),
+        "p50": round(ordered[int(last * 0.50)] * 1000, 2),
+        "p95": round(ordered[int(last * 0.95)] * 1000, 2),
+        "p99": round(ordered[int(last * 0.99)] * 1000, 2),
+        "max": round(ordered[-1] * 1000, 2),
+    }
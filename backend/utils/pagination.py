@@ -0,0 +1,51 @@
+import base64
+import json
+from datetime import datetime
+
+from sqlalchemy import Integer, literal, tuple_
+
+
+def encode_cursor(value, row_id):
+    """Opaque cursor for the position (sort value, id)"""
+    if isinstance(value, datetime):
+        payload = {"dt": value.isoformat(), "id": row_id}
+    else:
+        payload = {"v": value, "id": row_id}
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """(sort value, id) from a cursor; ValueError if it is not one of ours"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        value = datetime.fromisoformat(payload["dt"]) if "dt" in payload else payload["v"]
+        return value, int(payload["id"])
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def keyset_page(query, sort_column, id_column, cursor, descending, limit, key):
+    """
+    One page of `query` ordered by (sort_column, id_column), starting after
+    `cursor`. `key(row)` returns a result row's (sort value, id).
+    Returns (rows, next cursor or None). sort_column must not be NULL.
+    limit=None returns every remaining row.
+    """
+    if cursor:
+        value, last_id = decode_cursor(cursor)
+        position = tuple_(sort_column, id_column)
+        after = tuple_(literal(value, sort_column.type), literal(last_id, Integer))
+        query = query.filter(position < after if descending else position > after)
+
+    if descending:
+        query = query.order_by(sort_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(sort_column.asc(), id_column.asc())
+
+    if limit is None:
+        return query.all(), None
+    rows = query.limit(limit + 1).all()
+    if len(rows) > limit:
+        return rows[:limit], encode_cursor(*key(rows[limit - 1]))
+    return rows, None